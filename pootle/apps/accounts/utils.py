@@ -18,13 +18,14 @@ from allauth.account.models import EmailAddress
 from allauth.account.utils import sync_user_email_addresses
 
 from pootle.core.contextmanagers import keep_data
-from pootle.core.delegate import score_updater
+from pootle.core.delegate import score_updater, text_index
 from pootle.core.models import Revision
 from pootle.core.signals import update_data, update_revisions
 from pootle_app.models import Directory
+from pootle_log.models import Event
 from pootle_statistics.models import SubmissionFields
 from pootle_store.constants import FUZZY, UNTRANSLATED
-from pootle_store.models import SuggestionState
+from pootle_store.models import SuggestionState, Unit
 
 
 logger = logging.getLogger(__name__)
@@ -90,6 +91,7 @@ class UserMerger(object):
         - units: submitted_by, commented_by, reviewed_by
         - submissions: submitter
         - suggestions: user, reviewer
+        - log events: user
         """
         self.merge_submitted()
         self.merge_commented()
@@ -97,6 +99,14 @@ class UserMerger(object):
         self.merge_submissions()
         self.merge_suggestions()
         self.merge_reviews()
+        self.merge_events()
+
+    @write_stdout(" * Merging log events: "
+                  "%(src_user)s --> %(target_user)s... ")
+    def merge_events(self):
+        """Merge user attribute on log events
+        """
+        Event.objects.filter(user=self.src_user).update(user=self.target_user)
 
     @write_stdout(" * Merging units comments: "
                   "%(src_user)s --> %(target_user)s... ")
@@ -195,6 +205,12 @@ class UserPurger(object):
             object_list=Directory.objects.filter(
                 id__in=set(store.parent.id for store in stores)))
 
+    def reindex_units(self, unit_ids):
+        """Updates the search index of units updated in bulk."""
+        index = text_index.get()
+        if index is not None and unit_ids:
+            index.index_units(Unit.objects.filter(id__in=unit_ids))
+
     @write_stdout(" * Removing units created by: %(user)s... ")
     def remove_units_created(self):
         """Remove units created by user that have not had further
@@ -219,6 +235,7 @@ class UserPurger(object):
         just remove the comment.
         """
         stores = set()
+        unit_ids = set()
         # Revert unit comments where self.user is latest commenter.
         for unit_change in self.user.commented.select_related("unit").iterator():
             unit = unit_change.unit
@@ -245,6 +262,8 @@ class UserPurger(object):
             unit.__class__.objects.filter(id=unit.id).update(
                 translator_comment=translator_comment,
                 revision=Revision.incr())
+            unit_ids.add(unit.id)
+        self.reindex_units(unit_ids)
         return stores
 
     @write_stdout(" * Reverting units edited by: %(user)s... ")
@@ -252,6 +271,7 @@ class UserPurger(object):
         """Revert unit edits made by a user to previous edit.
         """
         stores = set()
+        unit_ids = set()
         # Revert unit target where user is the last submitter.
         for unit_change in self.user.submitted.select_related("unit").iterator():
             unit = unit_change.unit
@@ -282,6 +302,8 @@ class UserPurger(object):
             unit.__class__.objects.filter(id=unit.id).update(
                 revision=Revision.incr(),
                 **unit_updates)
+            unit_ids.add(unit.id)
+        self.reindex_units(unit_ids)
         return stores
 
     @write_stdout(" * Reverting units reviewed by: %(user)s... ")
@@ -290,6 +312,7 @@ class UserPurger(object):
         """
 
         stores = set()
+        unit_ids = set()
         pending = SuggestionState.objects.get(name="pending")
 
         # Revert reviews by this user.
@@ -342,6 +365,8 @@ class UserPurger(object):
             unit.__class__.objects.filter(id=unit.id).update(
                 revision=Revision.incr(),
                 **unit_updates)
+            unit_ids.add(unit.id)
+        self.reindex_units(unit_ids)
         return stores
 
     @write_stdout(" * Reverting unit state changes by: %(user)s... ")
@@ -349,6 +374,7 @@ class UserPurger(object):
         """Revert unit edits made by a user to previous edit.
         """
         stores = set()
+        unit_ids = set()
         # Delete orphaned submissions.
         self.user.submission_set.filter(unit__isnull=True).delete()
 
@@ -380,7 +406,9 @@ class UserPurger(object):
                 # Increment revision
                 unit.__class__.objects.filter(id=unit.id).update(
                     revision=Revision.incr())
+                unit_ids.add(unit.id)
                 logger.debug("Unit state reverted: %s", repr(unit))
+        self.reindex_units(unit_ids)
         return stores
 
 
@@ -119,7 +119,7 @@ class Command(PootleCommand):
         if stores.count() == 1:
             store = stores.get()
             with open(os.path.basename(store.pootle_path), "wb") as f:
-                f.write(store.serialize())
+                store.serialize_to(f)
 
             self.stdout.write("Created '%s'" % (f.name))
             return
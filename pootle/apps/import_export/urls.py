@@ -8,13 +8,16 @@
 
 from django.conf.urls import url
 
-from .views import TPOfflineTMView, export
+from .views import TPOfflineTMView, export, import_job
 
 
 urlpatterns = [
     url(r"^export/$",
         export,
         name="pootle-export"),
+    url(r"^import/jobs/(?P<job_id>[^/]+)/$",
+        import_job,
+        name="pootle-import-job"),
     url(r'^\+\+offline_tm/(?P<language_code>[^/]*)/(?P<project_code>[^/]*)/$',
         TPOfflineTMView.as_view(),
         name='pootle-offline-tm-tp'),
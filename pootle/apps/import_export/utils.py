@@ -8,6 +8,7 @@
 
 import logging
 import os
+import re
 from io import BytesIO
 from zipfile import ZipFile
 
@@ -24,6 +25,7 @@ from pootle_app.models.permissions import check_user_permission
 from pootle_statistics.models import SubmissionTypes
 from pootle_store.constants import TRANSLATED
 from pootle_store.models import Store
+from pootle_store.utils import enqueue_store_update, import_store_file
 
 from .exceptions import (FileImportError, MissingPootlePathError,
                          MissingPootleRevError, UnsupportedFiletypeError)
@@ -31,14 +33,32 @@ from .exceptions import (FileImportError, MissingPootlePathError,
 
 logger = logging.getLogger(__name__)
 
+#: Blank line ending the header entry of a PO file
+HEADER_END_RE = re.compile(br"\r?\n[ \t]*\r?\n")
 
-def import_file(f, user=None):
-    ttk = getclass(f)(f.read())
-    if not hasattr(ttk, "parseheader"):
+
+def parse_header(f, contents):
+    """Parses the header of the uploaded file `f` from the first entry of
+    its `contents`, without parsing the rest of its units.
+    """
+    store_class = getclass(f)
+    if not hasattr(store_class, "parseheader"):
         raise UnsupportedFiletypeError(_("Unsupported filetype '%s', only PO "
                                          "files are supported at this time\n",
                                          f.name))
-    header = ttk.parseheader()
+    header_entry = HEADER_END_RE.split(contents.lstrip(), 1)[0]
+    return store_class(header_entry).parseheader()
+
+
+def import_file(f, user=None, enqueue=False):
+    """Updates the store matching the X-Pootle-Path header of the uploaded
+    file `f`.
+
+    :param enqueue: queue the update as an RQ job rather than running it.
+    :return: the id of the queued job, when `enqueue` is set.
+    """
+    contents = f.read()
+    header = parse_header(f, contents)
     pootle_path = header.get("X-Pootle-Path")
     if not pootle_path:
         raise MissingPootlePathError(_("File '%s' missing X-Pootle-Path "
@@ -65,11 +85,18 @@ def import_file(f, user=None):
                               and check_user_permission(user,
                                                         'administrate',
                                                         tp.directory))
+    if enqueue:
+        return enqueue_store_update(
+            store, contents, f.name, user=user,
+            submission_type=SubmissionTypes.UPLOAD,
+            store_revision=rev,
+            allow_add_and_obsolete=allow_add_and_obsolete)
     try:
-        store.update(store=ttk, user=user,
-                     submission_type=SubmissionTypes.UPLOAD,
-                     store_revision=rev,
-                     allow_add_and_obsolete=allow_add_and_obsolete)
+        import_store_file(
+            store, contents, f.name, user=user,
+            submission_type=SubmissionTypes.UPLOAD,
+            store_revision=rev,
+            allow_add_and_obsolete=allow_add_and_obsolete)
     except Exception as e:
         # This should not happen!
         logger.error("Error importing file: %s", str(e))
@@ -11,22 +11,26 @@ import os
 from io import BytesIO
 from zipfile import ZipFile, is_zipfile
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.http import Http404, HttpResponse
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect
+from django.urls import reverse
 
 from pootle.core.delegate import language_team
+from pootle.core.http import JsonResponse
 from pootle.core.views.base import PootleDetailView
 from pootle_app.models.permissions import check_permission
 from pootle_store.models import Store
+from pootle_store.utils import get_store_update_job
 from pootle_translationproject.views import TPDirectoryMixin
 
 from .forms import UploadForm
 from .utils import TPTMXExporter, import_file
 
 
-def download(contents, name, content_type):
-    response = HttpResponse(contents, content_type=content_type)
+def download(contents, name, content_type, response_class=HttpResponse):
+    response = response_class(contents, content_type=content_type)
     response["Content-Disposition"] = "attachment; filename=%s" % (name)
     return response
 
@@ -48,10 +52,11 @@ def export(request):
 
     if num_items == 1:
         store = stores.get()
-        contents = BytesIO(store.serialize())
-        name = os.path.basename(store.pootle_path)
-        contents.seek(0)
-        return download(contents.read(), name, "application/octet-stream")
+        return download(
+            store.iterate_serialized(),
+            os.path.basename(store.pootle_path),
+            "application/octet-stream",
+            response_class=StreamingHttpResponse)
 
     # zip all the stores together
     f = BytesIO()
@@ -88,6 +93,8 @@ def handle_upload_form(request, tp):
             for user
             in (team.submitters | team.reviewers | team.admins | team.superusers)]
 
+    upload_jobs = []
+    enqueue = settings.POOTLE_ASYNC_UPLOADS
     if request.method == "POST" and "file" in request.FILES:
         upload_form = UploadForm(
             request.POST,
@@ -116,11 +123,15 @@ def handle_upload_form(request, tp):
                             if ext not in valid_extensions:
                                 continue
                             with zf.open(path, "r") as f:
-                                import_file(f, user=uploader)
+                                upload_jobs.append(
+                                    import_file(
+                                        f, user=uploader, enqueue=enqueue))
                 else:
                     # is_zipfile consumes the file buffer
                     django_file.seek(0)
-                    import_file(django_file, user=uploader)
+                    upload_jobs.append(
+                        import_file(
+                            django_file, user=uploader, enqueue=enqueue))
             except Exception as e:
                 upload_form.add_error("file", e)
                 return {
@@ -137,9 +148,36 @@ def handle_upload_form(request, tp):
             uploader_list=uploader_list,
             initial=dict(user_id=request.user.id)
         ),
+        "upload_jobs": [
+            dict(id=job_id,
+                 url=reverse("pootle-import-job", kwargs=dict(job_id=job_id)))
+            for job_id in upload_jobs
+            if job_id],
     }
 
 
+def import_job(request, job_id):
+    """Returns the status of a queued upload, and the changes made once it
+    has finished.
+    """
+    job = get_store_update_job(job_id)
+    if job is None:
+        raise Http404
+    is_uploader = (
+        request.user.is_authenticated
+        and job.kwargs.get("user_pk") == request.user.pk)
+    if not (request.user.is_superuser or is_uploader):
+        raise Http404
+    response = {
+        "id": job.id,
+        "status": job.get_status(),
+        "store": Store.objects.filter(
+            pk=job.args[0]).values_list("pootle_path", flat=True).first()}
+    if job.is_finished:
+        response.update(job.result)
+    return JsonResponse(response)
+
+
 class TPOfflineTMView(TPDirectoryMixin, PootleDetailView):
 
     @property
@@ -8,11 +8,18 @@
 
 import datetime
 import logging
+from multiprocessing import Pool
 
-from django.db import transaction
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.dispatch import receiver
 from django.core.management.base import BaseCommand, CommandError
 
+from pootle.core.contextmanagers import keep_data
+from pootle.core.delegate import revision_updater
+from pootle.core.signals import update_revisions, update_scores
 from pootle.runner import set_sync_mode
+from pootle_app.models import Directory
 from pootle_language.models import Language
 from pootle_project.models import Project
 from pootle_translationproject.models import TranslationProject
@@ -84,6 +91,14 @@ class PootleCommand(BaseCommand):
             help=(
                 u"Run commands using database atomic "
                 u"transactions"))
+        parser.add_argument(
+            "--workers",
+            action="store",
+            type=int,
+            default=None,
+            help=(
+                u"Number of processes to use for handling translation "
+                u"projects in parallel"))
 
     def __init__(self, *args, **kwargs):
         self.languages = []
@@ -120,6 +135,11 @@ class PootleCommand(BaseCommand):
                                unrecognized_languages)
 
     def handle(self, **options):
+        if options.get("workers") is not None and options["workers"] < 1:
+            raise CommandError("--workers must be a positive number")
+        if (options.get("workers") or 0) > 1 and options["atomic"] == "all":
+            raise CommandError(
+                "--workers can not be used with --atomic=all")
         if options["atomic"] == "all":
             with transaction.atomic():
                 return self._handle(**options)
@@ -161,7 +181,9 @@ class PootleCommand(BaseCommand):
         if options["no_rq"]:
             set_sync_mode(options['noinput'])
 
-        if options["atomic"] == "tp":
+        if (options.get("workers") or 0) > 1:
+            self._handle_parallel_tps(**options)
+        elif options["atomic"] == "tp":
             self._handle_atomic_tps(**options)
         else:
             self._handle_tps(**options)
@@ -185,7 +207,7 @@ class PootleCommand(BaseCommand):
             for tp in tps.iterator():
                 self.do_translation_project(tp, **options)
 
-    def _handle_atomic_tps(self, **options):
+    def get_translation_projects(self):
         related = [
             ("project__%s" % project_related)
             for project_related in self.project_related]
@@ -201,7 +223,101 @@ class PootleCommand(BaseCommand):
 
         if self.languages:
             tps = tps.filter(language__code__in=self.languages)
+        return tps
 
-        for tp in tps.iterator():
+    def _handle_atomic_tps(self, **options):
+        for tp in self.get_translation_projects().iterator():
             with transaction.atomic():
                 self.do_translation_project(tp, **options)
+
+    def _handle_parallel_tps(self, **options):
+        """Handles translation projects across a pool of processes.
+
+        Revision and user score updates, which are shared between
+        translation projects, are collected from the workers and made once
+        all of the translation projects have been handled.
+        """
+        job_options = {
+            k: v
+            for k, v
+            in options.items()
+            if k not in ["stdout", "stderr"]}
+        jobs = [
+            (self.__class__, self.name, tp_pk, job_options)
+            for tp_pk
+            in self.get_translation_projects().values_list("pk", flat=True)]
+        if not jobs:
+            return
+        # Workers must open their own DB connections
+        for connection in connections.all():
+            connection.close()
+        revisions = {}
+        users = set()
+        pool = Pool(min(options["workers"], len(jobs)))
+        try:
+            for tp_revisions, tp_users in pool.imap_unordered(
+                    handle_translation_project_job, jobs):
+                for keys, paths in tp_revisions.items():
+                    revisions[keys] = revisions.get(keys, set()) | paths
+                if users is not None:
+                    users = (
+                        users | tp_users
+                        if tp_users is not None
+                        else None)
+        finally:
+            pool.close()
+            pool.join()
+        for keys, paths in revisions.items():
+            update_revisions.send(
+                Directory,
+                paths=paths,
+                keys=list(keys) or None)
+        if users is None or users:
+            update_scores.send(
+                get_user_model(),
+                users=users)
+
+
+def handle_translation_project_job(job):
+    """Runs a ``PootleCommand`` for a translation project, collecting the
+    revision and user score updates that it would make.
+
+    This runs in the worker processes of ``PootleCommand --workers``.
+    """
+    command_class, name, tp_pk, options = job
+    command = command_class()
+    command.name = name
+    tp = TranslationProject.objects.select_related(
+        *command.tp_related).get(pk=tp_pk)
+    revisions = {}
+    scored = dict(users=set())
+    suppress_user_scores = keep_data(
+        signals=(update_scores, ),
+        suppress=(get_user_model(), ))
+
+    with keep_data(signals=(update_revisions, )), suppress_user_scores:
+
+        @receiver(update_revisions)
+        def handle_revisions(**kwargs):
+            paths = revision_updater.get(kwargs["sender"])(
+                context=kwargs.get("instance"),
+                object_list=kwargs.get("object_list"),
+                paths=kwargs.get("paths")).all_pootle_paths
+            keys = tuple(kwargs.get("keys") or ())
+            revisions[keys] = revisions.get(keys, set()) | set(paths)
+
+        @receiver(update_scores, sender=get_user_model())
+        def handle_user_scores(**kwargs):
+            if scored["users"] is None:
+                return
+            scored["users"] = (
+                scored["users"] | set(kwargs["users"])
+                if kwargs.get("users")
+                else None)
+
+        if options["atomic"] == "tp":
+            with transaction.atomic():
+                command.do_translation_project(tp, **options)
+        else:
+            command.do_translation_project(tp, **options)
+    return revisions, scored["users"]
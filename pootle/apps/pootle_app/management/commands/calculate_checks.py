@@ -45,7 +45,11 @@ class Command(PootleCommand):
         self.update_checks(options["check_names"], translation_project)
 
     def handle_all(self, **options):
-        if not self.projects and not self.languages:
+        handle_site = (
+            not self.projects
+            and not self.languages
+            and (options["workers"] or 0) <= 1)
+        if handle_site:
             self.stdout.write(u"Running %s (noargs)" % self.name)
             self.update_checks(options["check_names"])
         else:
@@ -52,7 +52,11 @@ class Command(PootleCommand):
             updater.refresh_scores(users)
 
     def handle_all(self, **options):
-        if not self.projects and not self.languages:
+        handle_site = (
+            not self.projects
+            and not self.languages
+            and (options["workers"] or 0) <= 1)
+        if handle_site:
             users = self.get_users(**options)
             if options["reset"]:
                 score_updater.get(get_user_model())(users=users).clear()
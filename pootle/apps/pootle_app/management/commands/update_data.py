@@ -13,7 +13,6 @@ os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
 from pootle.core.signals import update_data
 from pootle_app.management.commands import PootleCommand
 from pootle_store.models import Store
-from pootle_translationproject.models import TranslationProject
 
 
 logger = logging.getLogger(__name__)
@@ -21,6 +20,7 @@ logger = logging.getLogger(__name__)
 
 class Command(PootleCommand):
     help = "Update stats data"
+    process_disabled_projects = True
 
     def add_arguments(self, parser):
         super(Command, self).add_arguments(parser)
@@ -45,24 +45,20 @@ class Command(PootleCommand):
                 "Updated data for translation project: %s",
                 tp.pootle_path)
 
-    def handle(self, **options):
-        projects = options.get("projects")
-        languages = options.get("languages")
-        stores = options.get("stores")
-        tps = TranslationProject.objects.all()
-        if stores:
-            return self.handle_stores(stores)
-        if projects:
-            tps = tps.filter(project__code__in=projects)
-        if languages:
-            tps = tps.filter(language__code__in=languages)
-        for tp in tps:
-            for store in tp.stores.all():
-                update_data.send(store.__class__, instance=store)
-                logger.debug(
-                    "Updated data for store: %s",
-                    store.pootle_path)
-            update_data.send(tp.__class__, instance=tp)
+    def handle_all_stores(self, translation_project, **options):
+        for store in translation_project.stores.all():
+            update_data.send(store.__class__, instance=store)
             logger.debug(
-                "Updated data for translation project: %s",
-                tp.pootle_path)
+                "Updated data for store: %s",
+                store.pootle_path)
+        update_data.send(
+            translation_project.__class__,
+            instance=translation_project)
+        logger.debug(
+            "Updated data for translation project: %s",
+            translation_project.pootle_path)
+
+    def handle(self, **options):
+        if options.get("stores"):
+            return self.handle_stores(options["stores"])
+        super(Command, self).handle(**options)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import logging
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
+
+from pootle.core.delegate import text_index
+from pootle_app.management.commands import PootleCommand
+from pootle_store.models import Unit
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(PootleCommand):
+    help = "Build or refresh the word index used for searching units."
+    process_disabled_projects = True
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--batch-size',
+            action='store',
+            dest='batch_size',
+            type=int,
+            default=1000,
+            help='Number of units to index at a time')
+
+    @property
+    def text_index(self):
+        return text_index.get()
+
+    def handle_all_stores(self, translation_project, **options):
+        units = Unit.objects.filter(
+            store__translation_project=translation_project).order_by("id")
+        last_id = 0
+        indexed = 0
+        while True:
+            batch = list(
+                units.filter(id__gt=last_id)[:options["batch_size"]])
+            if not batch:
+                break
+            indexed += self.text_index.index_units(batch)
+            last_id = batch[-1].id
+        logger.info(
+            "Indexed %s units for translation project: %s",
+            indexed, translation_project.pootle_path)
+
+    def handle_all(self, **options):
+        super(Command, self).handle_all(**options)
+        if not (self.projects or self.languages):
+            self.text_index.set_ready()
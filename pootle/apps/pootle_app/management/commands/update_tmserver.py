@@ -8,18 +8,26 @@
 
 import os
 from hashlib import md5
+from multiprocessing import Pool
 
 # This must be run before importing Django.
 os.environ['DJANGO_SETTINGS_MODULE'] = 'pootle.settings'
 
-from elasticsearch import Elasticsearch, helpers
+try:
+    from elasticsearch import Elasticsearch, helpers
+except ImportError:
+    Elasticsearch = None
 from translate.storage import factory
 
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 from django.utils import dateparse
 from django.utils.encoding import force_bytes
 
+from pootle.core.cache import get_cache
+from pootle.core.search.backends import LocalTMBackend
+from pootle.core.search.cache import TMRevision
 from pootle.core.utils import dateformat
 from pootle_store.models import Unit
 from pootle_translationproject.models import TranslationProject
@@ -27,6 +35,8 @@ from pootle_translationproject.models import TranslationProject
 
 BULK_CHUNK_SIZE = 5000
 
+LOCAL_TM_ENGINE = 'pootle.core.search.backends.LocalTMBackend'
+
 
 class BaseParser(object):
 
@@ -52,8 +62,7 @@ class DBParser(BaseParser):
         self.exclude_disabled_projects = not kwargs.pop('disabled_projects')
         self.tp_pk = None
 
-    def get_units(self):
-        """Gets the units to import and its total count."""
+    def get_units_qs(self):
         units_qs = (
             Unit.objects.exclude(target_f__isnull=True)
                         .exclude(target_f__exact='')
@@ -83,9 +92,25 @@ class DBParser(BaseParser):
             'store__pootle_path',
             'store__translation_project__language__code'
         ).order_by()
+        return units_qs
 
+    def get_units(self):
+        """Gets the units to import and its total count."""
+        units_qs = self.get_units_qs()
         return units_qs.iterator(), units_qs.count()
 
+    def get_unit_batches(self, batch_size, after_id=0):
+        """Yields lists of `batch_size` units to import, ordered by id and
+        starting after unit `after_id`.
+        """
+        units_qs = self.get_units_qs().order_by("id")
+        while True:
+            batch = list(units_qs.filter(id__gt=after_id)[:batch_size])
+            if not batch:
+                return
+            yield batch
+            after_id = batch[-1]['id']
+
     def get_unit_data(self, unit):
         """Return dict with data to import for a single unit."""
         fullname = (unit['change__submitted_by__full_name'] or
@@ -189,6 +214,41 @@ class FileParser(BaseParser):
         }
 
 
+class IndexCheckpoint(object):
+    """Progress of a sharded DB indexing run, so it can be resumed if it
+    is interrupted.
+    """
+
+    def __init__(self, index_name):
+        self.cache = get_cache('redis')
+        self.key = "pootle:update_tmserver:%s" % index_name
+
+    def tp_key(self, tp_pk):
+        return "%s:tp:%s" % (self.key, tp_pk)
+
+    @property
+    def revision(self):
+        """The last indexed revision the interrupted run started from, or
+        `None` if there is no run to resume.
+        """
+        return self.cache.get(self.key)
+
+    def start(self, revision):
+        self.cache.set(self.key, revision)
+
+    def get_tp(self, tp_pk):
+        """Returns the last unit id indexed for TP `tp_pk`, or `True` if the
+        TP was completely indexed.
+        """
+        return self.cache.get(self.tp_key(tp_pk))
+
+    def set_tp(self, tp_pk, value):
+        self.cache.set(self.tp_key(tp_pk), value)
+
+    def clear(self):
+        self.cache.delete_pattern("%s*" % self.key)
+
+
 class Command(BaseCommand):
     help = "Load Translation Memory with translations"
 
@@ -227,6 +287,16 @@ class Command(BaseCommand):
             default=False,
             help='Add translations from disabled projects'
         )
+        local.add_argument(
+            '--jobs',
+            action='store',
+            dest='jobs',
+            type=int,
+            default=None,
+            help='Index translation projects in parallel with this number '
+                 'of processes. Progress is recorded, so an interrupted '
+                 'run resumes where it stopped'
+        )
 
         # External TM specific options.
         external = parser.add_argument_group('External TM', 'Pootle External '
@@ -287,28 +357,38 @@ class Command(BaseCommand):
         if i != total:
             self.stdout.write("Expected %d, loaded %d." % (total, i))
 
+    def _setup_tm_server(self, tm):
+        self.tm_settings = settings.POOTLE_TM_SERVER[tm]
+        self.INDEX_NAME = self.tm_settings['INDEX_NAME']
+
+        self.es = None
+        self.local_tm = None
+        if self.tm_settings.get('ENGINE') == LOCAL_TM_ENGINE:
+            self.local_tm = LocalTMBackend(tm)
+        elif Elasticsearch is None:
+            raise CommandError('You must install the elasticsearch package '
+                               'to use an Elasticsearch TM.')
+        else:
+            self.es = Elasticsearch([
+                {
+                    'host': self.tm_settings['HOST'],
+                    'port': self.tm_settings['PORT'],
+                }], retry_on_timeout=True
+            )
+
     def _initialize(self, **options):
         if not settings.POOTLE_TM_SERVER:
             raise CommandError('POOTLE_TM_SERVER setting is missing.')
 
-        try:
-            self.tm_settings = settings.POOTLE_TM_SERVER[options['tm']]
-        except KeyError:
+        if options['tm'] not in settings.POOTLE_TM_SERVER:
             raise CommandError("Translation Memory '%s' is not defined in the "
                                "POOTLE_TM_SERVER setting. Please ensure it "
                                "exists and double-check you typed it "
                                "correctly." % options['tm'])
 
-        self.INDEX_NAME = self.tm_settings['INDEX_NAME']
+        self._setup_tm_server(options['tm'])
         self.is_local_tm = options['tm'] == 'local'
 
-        self.es = Elasticsearch([
-            {
-                'host': self.tm_settings['HOST'],
-                'port': self.tm_settings['PORT'],
-            }], retry_on_timeout=True
-        )
-
         # If files to import have been provided.
         if options['files']:
             if self.is_local_tm:
@@ -330,60 +410,178 @@ class Command(BaseCommand):
                 stdout=self.stdout, index=self.INDEX_NAME,
                 disabled_projects=options['disabled_projects'])
 
+    def _index_exists(self):
+        if self.local_tm is not None:
+            return self.local_tm.index_exists()
+        return self.es.indices.exists(self.INDEX_NAME)
+
+    def _create_index(self):
+        if self.local_tm is not None:
+            self.local_tm.create_index()
+        else:
+            self.es.indices.create(index=self.INDEX_NAME)
+
+    def _delete_index(self):
+        if self.local_tm is not None:
+            self.local_tm.delete_index()
+        else:
+            self.es.indices.delete(index=self.INDEX_NAME)
+
+    def _bulk(self, docs, parallel=False):
+        if self.local_tm is not None:
+            self.local_tm.bulk_update(docs)
+        elif parallel and hasattr(helpers, "parallel_bulk"):
+            for ok, info in helpers.parallel_bulk(
+                    self.es, docs, chunk_size=BULK_CHUNK_SIZE):
+                if not ok:
+                    raise CommandError("Failed to index: %s" % info)
+        else:
+            helpers.bulk(self.es, docs)
+
+    def _get_latest_revision(self):
+        if self.local_tm is not None:
+            return self.local_tm.get_latest_revision()
+        result = self.es.search(
+            index=self.INDEX_NAME,
+            body={
+                'aggs': {
+                    'max_revision': {
+                        'max': {
+                            'field': 'revision'
+                        }
+                    }
+                }
+            }
+        )
+        return result['aggregations']['max_revision']['value']
+
     def _set_latest_indexed_revision(self, **options):
         self.last_indexed_revision = -1
 
         if (not options['rebuild'] and
             not options['refresh'] and
-            self.es.indices.exists(self.INDEX_NAME)):
-
-            result = self.es.search(
-                index=self.INDEX_NAME,
-                body={
-                    'aggs': {
-                        'max_revision': {
-                            'max': {
-                                'field': 'revision'
-                            }
-                        }
-                    }
-                }
-            )
-            self.last_indexed_revision = \
-                result['aggregations']['max_revision']['value'] or -1
+            self._index_exists()):
+
+            self.last_indexed_revision = self._get_latest_revision() or -1
+
+        resumed_revision = self.checkpoint.revision
+        if resumed_revision is not None:
+            if options['rebuild'] or options['refresh']:
+                if not options['dry_run']:
+                    self.checkpoint.clear()
+            else:
+                # Units indexed after the interrupted run started could be
+                # missing from TPs it didn't finish, even without --jobs
+                self.stdout.write("Resuming interrupted indexing")
+                self.last_indexed_revision = resumed_revision
 
         self.parser.last_indexed_revision = self.last_indexed_revision
 
         self.stdout.write("Last indexed revision = %s" %
                           self.last_indexed_revision)
 
+    def _close_connections(self):
+        # Workers must open their own DB connections
+        for connection in connections.all():
+            connection.close()
+
+    def _get_pool(self, jobs):
+        return Pool(jobs)
+
+    def _index_parallel(self, tp_qs, **options):
+        """Indexes translation projects across a pool of processes."""
+        if options['dry_run']:
+            self.stdout.write(
+                "%s translation projects to index" % tp_qs.count())
+            return
+        self.checkpoint.start(self.last_indexed_revision)
+        jobs = [
+            (options['tm'], tp_pk, self.last_indexed_revision,
+             options['disabled_projects'], BULK_CHUNK_SIZE)
+            for tp_pk in tp_qs.values_list("pk", flat=True)
+            if self.checkpoint.get_tp(tp_pk) is not True]
+        self.stdout.write(
+            "%s translation projects to index" % len(jobs))
+        self._close_connections()
+        pool = self._get_pool(options['jobs'])
+        try:
+            for i, (tp_pk, indexed) in enumerate(
+                    pool.imap_unordered(index_translation_project, jobs),
+                    start=1):
+                self.stdout.write(
+                    "Indexed %s translations for translation project %s "
+                    "(%s/%s)" % (indexed, tp_pk, i, len(jobs)))
+        finally:
+            pool.close()
+            pool.join()
+        self.checkpoint.clear()
+
     def handle(self, **options):
         self._initialize(**options)
+        self.checkpoint = IndexCheckpoint(self.INDEX_NAME)
 
         if (options['rebuild'] and
             not options['dry_run'] and
-            self.es.indices.exists(self.INDEX_NAME)):
+            self._index_exists()):
 
-            self.es.indices.delete(index=self.INDEX_NAME)
+            self._delete_index()
 
         if (not options['dry_run'] and
-            not self.es.indices.exists(self.INDEX_NAME)):
+            not self._index_exists()):
 
-            self.es.indices.create(index=self.INDEX_NAME)
+            self._create_index()
 
         if self.is_local_tm:
             self._set_latest_indexed_revision(**options)
 
         if isinstance(self.parser, FileParser):
-            helpers.bulk(self.es, self._parse_translations(**options))
-            return
-
-        # If we are parsing from DB.
-        tp_qs = TranslationProject.objects.all()
+            self._bulk(self._parse_translations(**options))
+        else:
+            # If we are parsing from DB.
+            tp_qs = TranslationProject.objects.all()
 
-        if options['disabled_projects']:
-            tp_qs = tp_qs.exclude(project__disabled=True)
+            if options['disabled_projects']:
+                tp_qs = tp_qs.exclude(project__disabled=True)
 
-        for tp in tp_qs:
-            self.parser.tp_pk = tp.pk
-            helpers.bulk(self.es, self._parse_translations(**options))
+            if options['jobs']:
+                self._index_parallel(tp_qs, **options)
+            else:
+                for tp in tp_qs:
+                    self.parser.tp_pk = tp.pk
+                    self._bulk(self._parse_translations(**options))
+                if not options['dry_run']:
+                    # All of the TPs are indexed, so there is nothing to
+                    # resume
+                    self.checkpoint.clear()
+
+        if not options['dry_run']:
+            # Invalidate cached TM results
+            TMRevision.advance()
+
+
+def index_translation_project(job):
+    """Indexes the units of a TP in keyset-paginated batches, recording
+    progress so it can be resumed.
+
+    This runs in the worker processes of ``update_tmserver --jobs``.
+    """
+    tm, tp_pk, last_indexed_revision, disabled_projects, batch_size = job
+    command = Command()
+    command._setup_tm_server(tm)
+    checkpoint = IndexCheckpoint(command.INDEX_NAME)
+    parser = DBParser(
+        stdout=None, index=command.INDEX_NAME,
+        disabled_projects=disabled_projects)
+    parser.tp_pk = tp_pk
+    parser.last_indexed_revision = last_indexed_revision
+
+    last_id = checkpoint.get_tp(tp_pk) or 0
+    indexed = 0
+    for batch in parser.get_unit_batches(batch_size, after_id=last_id):
+        command._bulk(
+            (parser.get_unit_data(unit) for unit in batch),
+            parallel=True)
+        checkpoint.set_tp(tp_pk, batch[-1]['id'])
+        indexed += len(batch)
+    checkpoint.set_tp(tp_pk, True)
+    return tp_pk, indexed
@@ -19,7 +19,7 @@ from pootle.core.decorators import admin_required
 from pootle.i18n import formatter
 from pootle.i18n.gettext import ugettext as _, ungettext
 from pootle_statistics.models import Submission
-from pootle_store.models import Suggestion
+from pootle_store.models import Suggestion, get_tm_broker
 
 
 def _format_numbers(numbers):
@@ -71,6 +71,26 @@ def rq_stats():
     return result
 
 
+def tm_stats():
+    """Search statistics of the TM servers since this process started"""
+    result = []
+    server_stats = get_tm_broker().get_server_stats()
+    for server, stats in sorted(server_stats.items()):
+        numbers = {
+            k: stats[k]
+            for k in ['searches', 'timeouts', 'skipped', 'errors']}
+        _format_numbers(numbers)
+        numbers['server'] = server
+        # Translators: mean time in milliseconds for a TM server to answer
+        numbers['mean_latency'] = (
+            _('%s ms') % formatter.number(
+                int(round(stats['mean_latency'] * 1000)))
+            if stats['mean_latency'] is not None
+            else None)
+        result.append(numbers)
+    return result
+
+
 def checks():
     from django.core.checks.registry import registry
 
@@ -83,6 +103,7 @@ def view(request):
         'page': 'admin-dashboard',
         'server_stats': server_stats(),
         'rq_stats': rq_stats(),
+        'tm_stats': tm_stats(),
         'checks': checks(),
     }
     return render(request, "admin/dashboard.html", ctx)
@@ -7,16 +7,19 @@
 # AUTHORS file for copyright and authorship information.
 
 import logging
+import threading
+from collections import OrderedDict
+from hashlib import sha1
 
 from translate.filters import checks
 from translate.filters.decorators import Category
 from translate.lang import data
 
+from django.utils.encoding import force_bytes, force_text
 from django.utils.functional import cached_property
 from django.utils.lru_cache import lru_cache
 
 from pootle.core.bulk import BulkCRUD
-from pootle.core.contextmanagers import bulk_operations
 from pootle.core.signals import create, delete, update_data
 from pootle_store.constants import UNTRANSLATED
 from pootle_store.models import QualityCheck, Unit
@@ -31,6 +34,13 @@ from .constants import (
 logger = logging.getLogger(__name__)
 
 
+#: Number of units checked, and their checks created/deleted, at a time
+CHECK_CHUNK_SIZE = 1000
+
+#: Maximum number of check results kept in memory by ``check_results``
+CHECK_RESULTS_CACHE_SIZE = 10000
+
+
 class QualityCheckCRUD(BulkCRUD):
 
     model = QualityCheck
@@ -57,6 +67,81 @@ class CheckableUnit(UnitProxy):
         return self.store__translation_project__language__code
 
 
+class CheckResultsCache(object):
+    """Least recently used cache of QualityCheck failures
+
+    Results are keyed by a digest of the checker (check style and language),
+    the checks run, and the checked content of the unit, so that units with
+    the same source and target only run the checks once.
+    """
+
+    def __init__(self, maxsize=CHECK_RESULTS_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.results)
+
+    def clear(self):
+        with self.lock:
+            self.results.clear()
+
+    def get_checker_key(self, checker):
+        checkers = (
+            checker.checkers
+            if isinstance(checker, checks.TeeChecker)
+            else [checker])
+        return [
+            u"%s.%s" % (x.__class__.__module__, x.__class__.__name__)
+            for x in checkers] + [force_text(checker.config.targetlanguage)]
+
+    def get_content_key(self, value):
+        strings = getattr(value, "strings", None) or [value or u""]
+        return u"\x01".join(force_text(string) for string in strings)
+
+    def get_key(self, checker, unit, check_names=None):
+        key = self.get_checker_key(checker)
+        key.append(
+            u",".join(sorted(check_names))
+            if check_names is not None
+            else u"*")
+        key += [
+            self.get_content_key(unit.source),
+            self.get_content_key(unit.target),
+            u"\n".join(unit.getlocations()),
+            unit.hasplural() and u"1" or u"0"]
+        return sha1(force_bytes(u"\x00".join(key))).hexdigest()
+
+    def run_checks(self, checker, unit, check_names=None):
+        if check_names is None:
+            return checker.run_filters(unit, categorised=True)
+        return run_given_filters(checker, unit, check_names)
+
+    def get_failures(self, checker, unit, check_names=None):
+        """Returns the QualityCheck failures for the unit, running the checks
+        only if they have not been run for the same content and checker.
+        """
+        key = self.get_key(checker, unit, check_names)
+        with self.lock:
+            failures = self.results.pop(key, None)
+            if failures is not None:
+                self.results[key] = failures
+        if failures is None:
+            failures = self.run_checks(checker, unit, check_names)
+            with self.lock:
+                self.results[key] = failures
+                while len(self.results) > self.maxsize:
+                    self.results.popitem(last=False)
+        return {
+            name: dict(failure)
+            for name, failure
+            in failures.items()}
+
+
+check_results = CheckResultsCache()
+
+
 class UnitQualityCheck(object):
 
     def __init__(self, unit, checker, original_checks, check_names):
@@ -79,10 +164,7 @@ class UnitQualityCheck(object):
     def check_failures(self):
         """Current QualityCheck failure for the Unit
         """
-        if self.check_names is None:
-            return self.checker.run_filters(
-                self.unit, categorised=True)
-        return run_given_filters(
+        return check_results.get_failures(
             self.checker, self.unit, self.check_names)
 
     @cached_property
@@ -110,6 +192,29 @@ class UnitQualityCheck(object):
 
         return (updated or deleted)
 
+    def get_changes(self):
+        """Compare self.original_checks to the Units calculated QualityCheck
+        failures, without changing them.
+
+        :return: a tuple of new (unsaved) ``QualityCheck`` objects and the
+          names of original checks that no longer fail
+        """
+        new_checks = [
+            self.checks_qs.model(
+                unit_id=self.unit.id,
+                name=name,
+                message=failure['message'],
+                category=failure['category'])
+            for name, failure
+            in self.check_failures.iteritems()
+            if name not in self.original_checks]
+        stale_checks = [
+            name
+            for name
+            in self.original_checks
+            if name not in self.check_failures]
+        return new_checks, stale_checks
+
     def update_checks(self):
         """Compare self.original_checks to the Units calculated QualityCheck failures.
 
@@ -137,6 +242,8 @@ class UnitQualityCheck(object):
 
 class QualityCheckUpdater(object):
 
+    chunk_size = CHECK_CHUNK_SIZE
+
     def __init__(self, check_names=None, translation_project=None,
                  stores=None, units=None):
         """Refreshes QualityChecks for Units
@@ -156,6 +263,11 @@ class QualityCheckUpdater(object):
     def checks(self):
         """Existing checks in the database for all units
         """
+        return self.get_unit_checks()
+
+    def get_unit_checks(self, unit_ids=None):
+        """Existing checks in the database for the given units
+        """
         checks = self.checks_qs
         check_keys = (
             'id', 'name', 'unit_id',
@@ -163,6 +275,8 @@ class QualityCheckUpdater(object):
 
         if self.check_names is not None:
             checks = checks.filter(name__in=self.check_names)
+        if unit_ids is not None:
+            checks = checks.filter(unit_id__in=unit_ids)
 
         all_units_checks = {}
         for check in checks.values(*check_keys):
@@ -233,9 +347,8 @@ class QualityCheckUpdater(object):
         self.log_debug()
         if clear_unknown:
             self.clear_unknown_checks()
-        with bulk_operations(QualityCheck):
-            self.update_untranslated()
-            self.update_translated()
+        self.update_untranslated()
+        self.update_translated()
         updated = self.updated_stores
         if update_data_after:
             self.update_data(updated)
@@ -260,22 +373,41 @@ class QualityCheckUpdater(object):
                 instance=tp,
                 object_list=tp.stores.filter(id__in=stores))
 
-    def update_translated_unit(self, unit, checker=None):
-        """Update checks for a translated Unit
+    def update_translated_units(self, units):
+        """Update checks for a chunk of translated Units, creating and
+        deleting their checks in bulk.
+
+        :param units: a list of (checker, unit values) tuples
         """
-        unit = CheckableUnit(unit)
-        checker = UnitQualityCheck(
-            unit,
-            checker,
-            self.checks.get(unit.id, {}),
-            self.check_names)
-        if checker.update():
+        unit_checks = self.get_unit_checks(
+            [unit["id"] for checker_, unit in units])
+        new_checks = []
+        stale_checks = []
+        updated_count = 0
+        for checker, unit in units:
+            unit = CheckableUnit(unit)
+            original_checks = unit_checks.get(unit.id, {})
+            created, stale = UnitQualityCheck(
+                unit,
+                checker,
+                original_checks,
+                self.check_names).get_changes()
+            if not (created or stale):
+                continue
+            new_checks += created
+            stale_checks += [original_checks[name]["id"] for name in stale]
             self.update_store(unit.tp, unit.store)
-            return True
-        return False
+            updated_count += 1
+        if new_checks:
+            create.send(QualityCheck, objects=new_checks)
+        if stale_checks:
+            delete.send(
+                QualityCheck,
+                objects=QualityCheck.objects.filter(id__in=stale_checks))
+        return updated_count
 
-    def update_translated(self):
-        """Update checks for translated Units
+    def iterate_translated(self):
+        """Yields (checker, unit values) for translated Units
         """
         unit_fields = [
             "id", "source_f", "target_f", "locations", "store__id",
@@ -293,16 +425,27 @@ class QualityCheckUpdater(object):
         translated = (
             self.units.filter(state__gt=UNTRANSLATED)
                       .order_by("store", "index"))
-        updated_count = 0
         for unit in translated.values(*unit_fields).iterator():
             if self.translation_project is not None:
                 # if TP is set then manually add TP.id to the Unit value dict
                 unit[tp_key] = self.translation_project.id
             else:
                 checker = self.get_checker(unit[tp_key])
-            if checker and self.update_translated_unit(unit, checker=checker):
-                updated_count += 1
-        # clear the cache of the remaining Store
+            if checker:
+                yield checker, unit
+
+    def update_translated(self):
+        """Update checks for translated Units, a chunk at a time
+        """
+        updated_count = 0
+        chunk = []
+        for checker_unit in self.iterate_translated():
+            chunk.append(checker_unit)
+            if len(chunk) == self.chunk_size:
+                updated_count += self.update_translated_units(chunk)
+                chunk = []
+        if chunk:
+            updated_count += self.update_translated_units(chunk)
         return updated_count
 
     def update_store(self, tp, store):
@@ -386,8 +529,8 @@ class StoreQCUpdater(QualityCheckUpdater):
             self.store.__class__,
             instance=self.store)
 
-    def update_translated(self):
-        """Update checks for translated Units
+    def iterate_translated(self):
+        """Yields (checker, unit values) for translated Units
         """
         unit_fields = ["id", "source_f", "target_f", "locations"]
         checker = self.store.translation_project.checker
@@ -395,14 +538,11 @@ class StoreQCUpdater(QualityCheckUpdater):
         translated = (
             self.units.filter(state__gt=UNTRANSLATED)
                       .order_by("store", "index"))
-        updated_count = 0
         for unit in translated.values(*unit_fields).iterator():
             unit["store__translation_project__id"] = self.translation_project.id
             unit["store__id"] = self.store.id
             unit["store__translation_project__language__code"] = lang_code
-            if self.update_translated_unit(unit, checker=checker):
-                updated_count += 1
-        return updated_count
+            yield checker, unit
 
 
 def get_category_id(code):
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import logging
+
+from django.db import connection
+from django.db.models import F
+from django.utils.functional import cached_property
+
+from django_redis import get_redis_connection
+from django_rq.queues import get_queue
+
+from pootle.core.contextmanagers import bulk_operations
+from pootle.core.delegate import data_tool
+from pootle_store.constants import FUZZY, OBSOLETE, TRANSLATED
+from pootle_store.models import Store
+
+from .models import StoreData
+
+
+logger = logging.getLogger(__name__)
+
+
+#: Redis set of the ids of stores waiting for their data to be updated
+DEFERRED_STORES_KEY = "pootle.data.deferred.stores"
+
+#: Redis key set while a job to update the deferred stores is queued
+DEFERRED_JOB_KEY = "pootle.data.deferred.job"
+
+#: Seconds after which a queued job is assumed to have been lost
+DEFERRED_JOB_TIMEOUT = 300
+
+#: Number of stores updated at a time by the deferred job
+DEFERRED_BATCH_SIZE = 100
+
+
+class DeferredStoreData(object):
+    """Coalesces store data updates
+
+    Stores are added to a Redis set, and a single RQ job updates the data
+    of all of the stores in the set, a batch at a time. Word counts are
+    adjusted straight away for saved units, from their states before and
+    after each save.
+    """
+
+    #: Set on saved units to their frozen values and the state that their
+    #: words were last counted in
+    counted_state_attr = "_deferred_counted_state"
+
+    def __init__(self, batch_size=DEFERRED_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    @cached_property
+    def redis(self):
+        return get_redis_connection("redis")
+
+    def get_unit_counted_state(self, unit):
+        """State that `unit`'s words were counted in before it was saved
+
+        ``Unit._frozen`` is not refreshed when a unit is saved, so the state
+        counted by a previous save of the same instance takes precedence,
+        unless the unit has been refreshed since.
+
+        :return: the state, or ``None`` if the unit has just been created.
+        """
+        frozen, state = getattr(unit, self.counted_state_attr, (None, None))
+        if frozen is unit._frozen:
+            return state
+        return (
+            None
+            if unit._frozen.pk is None
+            else unit._frozen.state)
+
+    def get_unit_word_changes(self, unit):
+        """Changes to the Store's word counts from saving `unit`
+
+        :return: a dictionary of changes, or ``None`` if they can't be
+          worked out from the unit.
+        """
+        old_state = self.get_unit_counted_state(unit)
+        if old_state is not None and unit.source_updated:
+            return None
+        wordcount = unit.unit_source.source_wordcount or 0
+        counted = (
+            ("total_words", lambda state: state > OBSOLETE),
+            ("translated_words", lambda state: state == TRANSLATED),
+            ("fuzzy_words", lambda state: state == FUZZY))
+        changes = {}
+        for field, is_counted in counted:
+            change = (
+                (wordcount if is_counted(unit.state) else 0)
+                - (wordcount
+                   if old_state is not None and is_counted(old_state)
+                   else 0))
+            if change:
+                changes[field] = change
+        return changes
+
+    def update_unit_words(self, unit):
+        """Adjusts the Store's word counts for the saved `unit`
+
+        :return: ``True`` if the counts could be adjusted.
+        """
+        changes = self.get_unit_word_changes(unit)
+        setattr(unit, self.counted_state_attr, (unit._frozen, unit.state))
+        if changes is None:
+            return False
+        store_data = StoreData.objects.filter(store_id=unit.store_id)
+        if changes:
+            store_data.update(
+                **{field: F(field) + change
+                   for field, change
+                   in changes.items()})
+        store_data.filter(max_unit_revision__lt=unit.revision).update(
+            max_unit_revision=unit.revision)
+        return True
+
+    def add(self, store, unit=None):
+        """Queues updating the data for `store`, once the current
+        transaction has been committed
+        """
+        if unit is not None:
+            self.update_unit_words(unit)
+        store_id = store.pk
+        connection.on_commit(lambda: self.queue(store_id))
+
+    def queue(self, store_id):
+        """Adds `store_id` to the deferred stores, and queues a job to update
+        them if there isn't one queued already
+        """
+        self.redis.sadd(DEFERRED_STORES_KEY, store_id)
+        queue_job = self.redis.set(
+            DEFERRED_JOB_KEY, 1, nx=True, ex=DEFERRED_JOB_TIMEOUT)
+        if queue_job:
+            get_queue("default").enqueue(update_deferred_store_data)
+
+    def pop(self):
+        pipe = self.redis.pipeline()
+        pipe.smembers(DEFERRED_STORES_KEY)
+        pipe.delete(DEFERRED_STORES_KEY)
+        store_ids, __ = pipe.execute()
+        return sorted(int(store_id) for store_id in store_ids)
+
+    def update(self):
+        """Updates the data of all of the queued stores
+
+        :return: the number of updated stores
+        """
+        self.redis.delete(DEFERRED_JOB_KEY)
+        store_ids = self.pop()
+        for i in range(0, len(store_ids), self.batch_size):
+            stores = Store.objects.select_related(
+                "data", "translation_project").filter(
+                    pk__in=store_ids[i:i + self.batch_size])
+            with bulk_operations(StoreData):
+                for store in stores.iterator():
+                    data_tool.get(store.__class__)(store).update()
+        logger.debug(
+            "[data] Updated data for %s deferred stores", len(store_ids))
+        return len(store_ids)
+
+
+def update_deferred_store_data():
+    """Updates the data of the stores queued by ``DeferredStoreData``
+
+    This runs as an RQ job.
+    """
+    return DeferredStoreData().update()
@@ -8,6 +8,7 @@
 
 import logging
 
+from django.conf import settings
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
@@ -16,6 +17,7 @@ from pootle.core.signals import create, delete, update, update_data
 from pootle_store.models import Store
 from pootle_translationproject.models import TranslationProject
 
+from .deferred import DeferredStoreData
 from .models import StoreChecksData, StoreData, TPChecksData, TPData
 
 
@@ -81,6 +83,9 @@ def handle_storedata_save(**kwargs):
 @receiver(update_data, sender=Store)
 def handle_store_data_update(**kwargs):
     store = kwargs.get("instance")
+    if settings.POOTLE_DEFER_STORE_DATA and kwargs.get("unit"):
+        DeferredStoreData().add(store, unit=kwargs["unit"])
+        return
     data_tool.get(Store)(store).update()
 
 
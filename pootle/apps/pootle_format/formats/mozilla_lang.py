@@ -28,6 +28,8 @@ class LangStoreSyncer(StoreSyncer):
 
 class DiffableLangStore(DiffableStore):
 
+    diff_fields = DiffableStore.diff_fields + ("target_f", )
+
     def get_unit_state(self, file_unit):
         return (
             FUZZY
@@ -19,6 +19,9 @@ from pootle.core.proxy import AttributeProxy
 from pootle_statistics.models import SubmissionTypes
 from pootle_store.constants import POOTLE_WINS, SOURCE_WINS
 from pootle_store.models import Store
+from pootle_store.utils import StoreImportDigest
+
+from .utils import file_hash_changed, file_hasher
 
 
 logger = logging.getLogger(__name__)
@@ -72,14 +75,15 @@ class FSFile(object):
 
     @property
     def fs_changed(self):
-        return (
-            self.latest_hash
-            != self.store_fs.last_sync_hash)
+        return file_hash_changed(
+            self.store_fs.last_sync_hash,
+            self.latest_hash,
+            self.file_path)
 
     @property
     def latest_hash(self):
         if self.file_exists:
-            return str(os.stat(self.file_path).st_mtime)
+            return file_hasher.hash(self.file_path)
 
     @property
     def latest_author(self):
@@ -216,6 +220,12 @@ class FSFile(object):
         """
         Update FS file with the serialized content from Pootle ```Store```
         """
+        if not self.file_exists:
+            # nothing to merge with, so stream the store straight to disk
+            with open(self.file_path, "w") as f:
+                self.store.serialize_to(f)
+            logger.debug("Pushed file: %s", self.path)
+            return self.store.data.max_unit_revision
         disk_store = self.deserialize(create=True)
         self.store.syncer.sync(disk_store, self.store.data.max_unit_revision)
         with open(self.file_path, "w") as f:
@@ -225,10 +235,12 @@ class FSFile(object):
 
     def _sync_to_pootle(self, merge=False, pootle_wins=None):
         """
-        Update Pootle ``Store`` with the parsed FS file.
+        Update Pootle ``Store`` with the parsed FS file, unless the same
+        file was the last pulled into the ``Store`` and it hasn't changed
+        since.
         """
-        tmp_store = self.deserialize()
-        if not tmp_store:
+        contents = self.read()
+        if contents is None:
             logger.warn("File staged for sync has disappeared: %s", self.path)
             return
         if pootle_wins is None:
@@ -245,11 +257,25 @@ class FSFile(object):
             # This is analogous to the `overwrite` option in
             # Store.update_from_disk
             revision = Revision.get() + 1
+        import_digest = StoreImportDigest(self.store)
+        digest = import_digest.get_digest(
+            contents,
+            merge=merge,
+            store_revision=revision if merge else None,
+            resolve_conflict=resolve_conflict)
+        if import_digest.matches(digest):
+            logger.debug("Skipped unchanged file: %s", self.path)
+            return
+        tmp_store = self.deserialize()
+        if not tmp_store:
+            logger.warn("File staged for sync has disappeared: %s", self.path)
+            return
         update_revision, __ = self.store.update(
             tmp_store,
             submission_type=SubmissionTypes.SYSTEM,
             user=self.latest_user,
             store_revision=revision,
             resolve_conflict=resolve_conflict)
+        import_digest.set(digest)
         logger.debug("Pulled file: %s", self.path)
         return update_revision
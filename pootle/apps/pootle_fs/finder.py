@@ -9,13 +9,17 @@
 import fnmatch
 import os
 import re
+import time
+from hashlib import md5
 
 import scandir
 
 from django.core.exceptions import ValidationError
+from django.utils.encoding import force_bytes
 from django.utils.functional import cached_property
 from django.utils.lru_cache import lru_cache
 
+from pootle.core.cache import get_cache
 from pootle.core.decorators import persistent_property
 
 from .apps import PootleFSConfig
@@ -30,6 +34,10 @@ PATH_MAPPING = (
 
 DEFAULT_EXTENSIONS = ("po", "pot")
 
+#: Directories modified within this number of seconds of a scan are listed
+#: again on the next scan, as further changes may not update their mtime
+DIR_MTIME_RESOLUTION = 2
+
 
 class TranslationFileFinder(object):
     ns = "pootle.fs.finder"
@@ -85,10 +93,77 @@ class TranslationFileFinder(object):
 
     def find(self):
         """Find matching files anywhere in file_root"""
-        for filepath in self.walk():
-            match = self.match(filepath)
+        for match in self.scan():
+            yield match
+
+    @property
+    def index_key(self):
+        return (
+            "%s.index.%s"
+            % (self.ns,
+               md5(force_bytes(
+                   "%s:%s:%s"
+                   % (self.file_root,
+                      "::".join(self.exclude_languages),
+                      self.regex.pattern))).hexdigest()))
+
+    def scan_dir(self, path):
+        """List a directory
+
+        :returns subdirs, matches: Where ``subdirs`` are the subdirectories
+          to walk, and ``matches`` the matches for files in the directory.
+        """
+        subdirs = []
+        matches = []
+        for entry in scandir.scandir(path):
+            if entry.is_dir():
+                # like `walk`, symlinked directories are not followed
+                if not entry.is_symlink():
+                    subdirs.append(entry.name)
+                continue
+            match = self.match(os.path.join(path, entry.name))
             if match:
-                yield match
+                matches.append(match)
+        return sorted(subdirs), sorted(matches)
+
+    def scan(self):
+        """Find matching files anywhere in file_root, only listing the
+        directories that have changed since the last scan.
+
+        The matches for each directory are stored in an index along with
+        its inode and mtime, which change when entries are added to or
+        removed from the directory.
+        """
+        cache = get_cache("lru")
+        index = cache.get(self.index_key) or {}
+        new_index = {}
+        found = []
+        scan_time = time.time()
+        paths = [self.file_root]
+        while paths:
+            path = paths.pop()
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            dir_hash = (stat.st_ino, stat.st_mtime)
+            indexed = index.get(path)
+            if indexed and indexed[0] == dir_hash:
+                subdirs, matches = indexed[1:]
+            else:
+                try:
+                    subdirs, matches = self.scan_dir(path)
+                except OSError:
+                    continue
+            if stat.st_mtime > scan_time - DIR_MTIME_RESOLUTION:
+                dir_hash = None
+            new_index[path] = (dir_hash, subdirs, matches)
+            found.extend(matches)
+            paths.extend(
+                os.path.join(path, subdir)
+                for subdir in reversed(subdirs))
+        cache.set(self.index_key, new_index)
+        return found
 
     @property
     def cache_key(self):
@@ -10,26 +10,32 @@ import logging
 import os
 import shutil
 import uuid
+from multiprocessing import Pool
 
 from bulk_update.helper import bulk_update
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db import connections, transaction
+from django.dispatch import receiver
 from django.utils.functional import cached_property
 from django.utils.lru_cache import lru_cache
 
+from pootle.core.contextmanagers import keep_data
 from pootle.core.delegate import (
-    config, response as pootle_response, revision, state as pootle_state)
+    config, response as pootle_response, revision, revision_updater,
+    state as pootle_state)
+from pootle.core.signals import update_data, update_revisions
 from pootle_app.models import Directory
 from pootle_project.models import Project
 from pootle_store.constants import POOTLE_WINS, SOURCE_WINS
 from pootle_store.models import Store
+from pootle_translationproject.models import TranslationProject
 
 from .apps import PootleFSConfig
 from .decorators import emits_state, responds_to_state
 from .delegate import fs_finder, fs_matcher, fs_resources
-from .exceptions import FSStateError
+from .exceptions import FSStateError, FSSyncError
 from .models import StoreFS
 from .signals import fs_post_pull, fs_post_push, fs_pre_pull, fs_pre_push
 
@@ -446,14 +452,87 @@ class Plugin(object):
             self.expire_sync_cache()
         return response
 
+    def sync_files(self, action, stores_fs, jobs=None):
+        """
+        Pull or push the files of the given ``StoreFS``
+
+        :param action: ``pull`` or ``push``
+        :param stores_fs: ``StoreFS`` objects to sync
+        :param jobs: Sync files across this number of processes, each file
+          being synced in its own transaction
+        :yields store_fs, pootle_revision, file_hash: for each synced file
+        :raises FSSyncError: after all jobs have finished, if any file failed
+          to sync
+
+        With ``jobs``, the translation project data and revision updates,
+        which are shared between the stores of a translation project, are
+        collected from the workers and made once all of the jobs have
+        finished.
+        """
+        if not jobs or jobs < 2:
+            for store_fs in stores_fs:
+                yield (
+                    (store_fs, )
+                    + sync_store_fs_file(action, store_fs, self.pootle_user))
+            return
+        stores_fs = list(stores_fs)
+        if action == "pull":
+            # Create missing stores (and their parent directories) before
+            # pulling, so that workers don't race to create them
+            for store_fs in stores_fs:
+                if not store_fs.file.store_exists:
+                    store_fs.file.create_store()
+        ids = [store_fs.id for store_fs in stores_fs]
+        user = self.pootle_user
+        job_list = [
+            (action, ids[i::jobs], user and user.pk)
+            for i in range(min(jobs, len(ids)))]
+        # Workers must open their own DB connections
+        for connection in connections.all():
+            connection.close()
+        errors = []
+        tp_ids = set()
+        revisions = {}
+        pool = Pool(len(job_list))
+        try:
+            # Yield the results of each job as it finishes, so that files
+            # that were synced are recorded even if another job fails
+            results = pool.imap_unordered(sync_store_fs, job_list)
+            for synced, error, job_tp_ids, job_revisions in results:
+                if error:
+                    errors.append(error)
+                tp_ids |= job_tp_ids
+                for keys, paths in job_revisions.items():
+                    revisions[keys] = revisions.get(keys, set()) | paths
+                if not synced:
+                    continue
+                updated = StoreFS.objects.filter(
+                    id__in=synced.keys()).select_related("store").in_bulk()
+                for store_fs_id, result in synced.items():
+                    yield (updated[store_fs_id], ) + result
+        finally:
+            pool.close()
+            pool.join()
+        for tp in TranslationProject.objects.filter(pk__in=tp_ids):
+            update_data.send(tp.__class__, instance=tp)
+        for keys, paths in revisions.items():
+            update_revisions.send(
+                Directory,
+                paths=paths,
+                keys=list(keys) or None)
+        if errors:
+            raise FSSyncError("\n".join(errors))
+
     @responds_to_state
     @emits_state(pre=fs_pre_pull, post=fs_post_pull)
-    def sync_pull(self, state, response, fs_path=None, pootle_path=None):
+    def sync_pull(self, state, response, fs_path=None, pootle_path=None,
+                  jobs=None):
         """
         Pull translations from working directory to Pootle
 
         :param fs_path: FS path glob to filter translations
         :param pootle_path: Pootle path glob to filter translations
+        :param jobs: Pull files across this number of processes
         :returns response: Where ``response`` is an instance of self.respose_class
         """
         sfs = {}
@@ -461,13 +540,12 @@ class Plugin(object):
             sfs[fs_state.kwargs["store_fs"]] = fs_state
         _sfs = StoreFS.objects.filter(
             id__in=sfs.keys()).select_related("store", "store__data")
-        for store_fs in _sfs:
-            store_fs.file.pull(user=self.pootle_user)
-            if store_fs.store and store_fs.store.data:
+        synced = self.sync_files("pull", _sfs, jobs=jobs)
+        for store_fs, pootle_revision, file_hash in synced:
+            if pootle_revision is not None:
                 state.resources.pootle_revisions[
-                    store_fs.store_id] = store_fs.store.data.max_unit_revision
-            state.resources.file_hashes[
-                store_fs.pootle_path] = store_fs.file.latest_hash
+                    store_fs.store_id] = pootle_revision
+            state.resources.file_hashes[store_fs.pootle_path] = file_hash
             fs_state = sfs[store_fs.id]
             fs_state.store_fs = store_fs
             response.add("pulled_to_pootle", fs_state=fs_state)
@@ -475,12 +553,14 @@ class Plugin(object):
 
     @responds_to_state
     @emits_state(pre=fs_pre_push, post=fs_post_push)
-    def sync_push(self, state, response, fs_path=None, pootle_path=None):
+    def sync_push(self, state, response, fs_path=None, pootle_path=None,
+                  jobs=None):
         """
         Push translations from Pootle to working directory.
 
         :param fs_path: FS path glob to filter translations
         :param pootle_path: Pootle path glob to filter translations
+        :param jobs: Push files across this number of processes
         :returns response: Where ``response`` is an instance of self.respose_class
         """
         pushable = state['pootle_staged'] + state['pootle_ahead']
@@ -490,14 +570,19 @@ class Plugin(object):
                 for fs_state
                 in pushable])
         stores_fs = {sfs.id: sfs for sfs in stores_fs.select_related("store")}
-        for fs_state in pushable:
-            store_fs = stores_fs[fs_state.store_fs.id]
+        fs_states = {
+            fs_state.store_fs.id: fs_state
+            for fs_state in pushable}
+        synced = self.sync_files(
+            "push",
+            [stores_fs[fs_state.store_fs.id] for fs_state in pushable],
+            jobs=jobs)
+        for store_fs, pootle_revision, file_hash in synced:
+            fs_state = fs_states[store_fs.id]
             fs_state.store_fs = store_fs
-            store_fs.file.push()
             state.resources.pootle_revisions[
-                store_fs.store_id] = store_fs.store.data.max_unit_revision
-            state.resources.file_hashes[
-                store_fs.pootle_path] = store_fs.file.latest_hash
+                store_fs.store_id] = pootle_revision
+            state.resources.file_hashes[store_fs.pootle_path] = file_hash
             response.add('pushed_to_fs', fs_state=fs_state)
         return response
 
@@ -524,30 +609,63 @@ class Plugin(object):
         return response
 
     @responds_to_state
-    @transaction.atomic
-    def sync(self, state, response, fs_path=None, pootle_path=None, update="all"):
+    def sync(self, state, response, fs_path=None, pootle_path=None,
+             update="all", jobs=None):
         """
         Synchronize all staged and non-conflicting files and Stores, and push
         changes upstream if required.
 
         :param fs_path: FS path glob to filter translations
         :param pootle_path: Pootle path glob to filter translations
+        :param jobs: Pull and push files across this number of processes.
+          Each file is then synced in its own transaction, rather than
+          syncing everything in a single transaction.
         :returns response: Where ``response`` is an instance of self.respose_class
         """
-        self.sync_rm(
-            state, response, fs_path=fs_path, pootle_path=pootle_path)
-        if update in ["all", "pootle"]:
-            self.sync_merge(
+        if jobs and jobs > 1:
+            return self._sync(
+                state, response,
+                fs_path=fs_path,
+                pootle_path=pootle_path,
+                update=update,
+                jobs=jobs)
+        with transaction.atomic():
+            return self._sync(
                 state, response,
                 fs_path=fs_path,
                 pootle_path=pootle_path,
                 update=update)
-            self.sync_pull(
-                state, response, fs_path=fs_path, pootle_path=pootle_path)
-        if update in ["all", "fs"]:
-            self.sync_push(
+
+    def _sync(self, state, response, fs_path=None, pootle_path=None,
+              update="all", jobs=None):
+        with transaction.atomic():
+            self.sync_rm(
                 state, response, fs_path=fs_path, pootle_path=pootle_path)
-            self.push(response)
+            if update in ["all", "pootle"]:
+                self.sync_merge(
+                    state, response,
+                    fs_path=fs_path,
+                    pootle_path=pootle_path,
+                    update=update)
+        sync_kwargs = dict(fs_path=fs_path, pootle_path=pootle_path)
+        if jobs:
+            sync_kwargs["jobs"] = jobs
+        try:
+            if update in ["all", "pootle"]:
+                self.sync_pull(state, response, **sync_kwargs)
+            if update in ["all", "fs"]:
+                self.sync_push(state, response, **sync_kwargs)
+                self.push(response)
+        finally:
+            # With jobs each file is synced in its own transaction, so the
+            # files that were synced before a failure must still be updated
+            with transaction.atomic():
+                self.update_synced_store_fs(state, response)
+            if response.made_changes:
+                self.expire_sync_cache()
+        return response
+
+    def update_synced_store_fs(self, state, response):
         sync_types = [
             "pushed_to_fs", "pulled_to_pootle",
             "merged_from_pootle", "merged_from_fs"]
@@ -574,6 +692,79 @@ class Plugin(object):
                 update_fields=[
                     "last_sync_revision", "last_sync_hash",
                     "resolve_conflict", "staged_for_merge"])
-        if response.made_changes:
-            self.expire_sync_cache()
-        return response
+
+
+def sync_store_fs_file(action, store_fs, user=None):
+    """Pulls or pushes the file of a ``StoreFS``.
+
+    :returns: a tuple of the store's latest revision and the file hash
+    """
+    if action == "pull":
+        store_fs.file.pull(user=user)
+    else:
+        store_fs.file.push()
+    pootle_revision = None
+    if store_fs.store and store_fs.store.data:
+        pootle_revision = store_fs.store.data.max_unit_revision
+    return pootle_revision, store_fs.file.latest_hash
+
+
+def sync_store_fs(job):
+    """Pulls or pushes the files of a group of ``StoreFS``, each in its own
+    transaction.
+
+    This runs in the worker processes of ``pootle fs sync --jobs``.
+
+    Syncing stops at the first file that fails.
+
+    Translation project data and revision updates are collected rather than
+    made, as other workers may be syncing stores of the same translation
+    projects.
+
+    :returns: a tuple of a dictionary of ``sync_store_fs_file`` results by
+      ``StoreFS`` id, an error message if a file failed to sync, the ids of
+      the translation projects to update the data of, and the revision keys
+      to update by paths
+    """
+    action, store_fs_ids, user_pk = job
+    user = (
+        get_user_model().objects.get(pk=user_pk)
+        if user_pk
+        else None)
+    synced = {}
+    tp_ids = set()
+    revisions = {}
+    error = None
+    stores_fs = StoreFS.objects.filter(
+        id__in=store_fs_ids).select_related("store", "store__data")
+    suppress_tp_data = keep_data(
+        signals=(update_data, ),
+        suppress=(TranslationProject, ))
+
+    with keep_data(signals=(update_revisions, )), suppress_tp_data:
+
+        @receiver(update_data, sender=TranslationProject)
+        def handle_tp_data(**kwargs):
+            tp_ids.add(kwargs["instance"].pk)
+
+        @receiver(update_revisions)
+        def handle_revisions(**kwargs):
+            paths = revision_updater.get(kwargs["sender"])(
+                context=kwargs.get("instance"),
+                object_list=kwargs.get("object_list"),
+                paths=kwargs.get("paths")).all_pootle_paths
+            keys = tuple(kwargs.get("keys") or ())
+            revisions[keys] = revisions.get(keys, set()) | set(paths)
+
+        for store_fs in stores_fs:
+            try:
+                with transaction.atomic():
+                    synced[store_fs.id] = sync_store_fs_file(
+                        action, store_fs, user)
+            except Exception as e:
+                logger.exception(
+                    "Failed to %s file: %s", action, store_fs.pootle_path)
+                error = (
+                    "Failed to %s %s: %s" % (action, store_fs.pootle_path, e))
+                break
+    return synced, error, tp_ids, revisions
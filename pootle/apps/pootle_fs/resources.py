@@ -17,7 +17,8 @@ from pootle_store.models import Store
 
 from .apps import PootleFSConfig
 from .models import StoreFS
-from .utils import StoreFSPathFilter, StorePathFilter
+from .utils import (
+    StoreFSPathFilter, StorePathFilter, file_hash_changed, file_hasher)
 
 
 class FSProjectResources(object):
@@ -102,6 +103,11 @@ class FSProjectStateResources(object):
         _found_file_paths,
         key_attr="fs_cache_key")
 
+    @cached_property
+    def found_file_path_set(self):
+        """Set of found file paths, for membership tests"""
+        return set(self.found_file_paths)
+
     @cached_property
     def resources(self):
         """Uncached Project resources provided by FSPlugin"""
@@ -150,9 +156,10 @@ class FSProjectStateResources(object):
 
     @persistent_property
     def missing_file_paths(self):
+        found_file_paths = self.found_file_path_set
         return [
-            path for path in self.tracked_paths.keys()
-            if path not in self.found_file_paths]
+            path for path in self.tracked_paths
+            if path not in found_file_paths]
 
     @cached_property
     def tracked(self):
@@ -166,6 +173,22 @@ class FSProjectStateResources(object):
         _tracked_paths,
         key_attr="sync_cache_key")
 
+    @cached_property
+    def known_fs_paths(self):
+        """Set of fs_paths that are tracked, or that trackable Stores would
+        be tracked to
+        """
+        return (
+            set(self.tracked_paths)
+            | set(self.trackable_store_paths.values()))
+
+    @cached_property
+    def known_pootle_paths(self):
+        """Set of pootle_paths of tracked and trackable Stores"""
+        return (
+            set(self.tracked_paths.values())
+            | set(self.trackable_store_paths))
+
     @cached_property
     def unsynced(self):
         """Returns tracked StoreFSs that have NO sync information, and are not
@@ -193,19 +216,21 @@ class FSProjectStateResources(object):
                        .exclude(store__obsolete=True)
                        .values_list("store_id", "store__data__max_unit_revision"))
 
+    def get_file_path(self, path):
+        return os.path.join(
+            self.context.project.local_fs_path,
+            path.strip("/"))
+
     @cached_property
     def file_hashes(self):
-        hashes = {}
-
-        def _get_file_hash(path):
-            file_path = os.path.join(
-                self.context.project.local_fs_path,
-                path.strip("/"))
-            if os.path.exists(file_path):
-                return str(os.stat(file_path).st_mtime)
-        for pootle_path, path in self.found_file_matches:
-            hashes[pootle_path] = _get_file_hash(path)
-        return hashes
+        """Digests of the contents of found files by pootle_path"""
+        file_paths = {
+            pootle_path: self.get_file_path(path)
+            for pootle_path, path in self.found_file_matches}
+        hashes = file_hasher.hashes(file_paths.values())
+        return {
+            pootle_path: hashes.get(file_path)
+            for pootle_path, file_path in file_paths.items()}
 
     @cached_property
     def fs_changed(self):
@@ -215,9 +240,12 @@ class FSProjectStateResources(object):
         hashes = self.file_hashes
         tracked_files = []
         for store_fs in self.synced.iterator():
-            if store_fs.last_sync_hash == hashes.get(store_fs.pootle_path):
-                continue
-            tracked_files.append(store_fs.pk)
+            changed = file_hash_changed(
+                store_fs.last_sync_hash,
+                hashes.get(store_fs.pootle_path),
+                self.get_file_path(store_fs.path))
+            if changed:
+                tracked_files.append(store_fs.pk)
         return tracked_files
 
     def reload(self):
@@ -154,16 +154,12 @@ class ProjectFSState(State):
 
     @property
     def state_fs_untracked(self):
-        tracked_fs_paths = self.resources.tracked_paths.keys()
-        tracked_pootle_paths = self.resources.tracked_paths.values()
-        trackable_fs_paths = self.resources.trackable_store_paths.values()
-        trackable_pootle_paths = self.resources.trackable_store_paths.keys()
+        known_fs_paths = self.resources.known_fs_paths
+        known_pootle_paths = self.resources.known_pootle_paths
         for pootle_path, fs_path in self.resources.found_file_matches:
             fs_untracked = (
-                fs_path not in tracked_fs_paths
-                and pootle_path not in tracked_pootle_paths
-                and fs_path not in trackable_fs_paths
-                and pootle_path not in trackable_pootle_paths)
+                fs_path not in known_fs_paths
+                and pootle_path not in known_pootle_paths)
             if fs_untracked:
                 yield dict(
                     pootle_path=pootle_path,
@@ -171,16 +167,18 @@ class ProjectFSState(State):
 
     @property
     def state_pootle_untracked(self):
+        found_file_paths = self.resources.found_file_path_set
         for store, path in self.resources.trackable_stores:
-            if path not in self.resources.found_file_paths:
+            if path not in found_file_paths:
                 yield dict(
                     store=store,
                     fs_path=path)
 
     @property
     def state_conflict_untracked(self):
+        found_file_paths = self.resources.found_file_path_set
         for store, path in self.resources.trackable_stores:
-            if path in self.resources.found_file_paths:
+            if path in found_file_paths:
                 yield dict(
                     store=store,
                     fs_path=path)
@@ -6,15 +6,30 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import hashlib
+import os
+import re
 from fnmatch import translate
+from multiprocessing.pool import ThreadPool
 
+from django.utils.encoding import force_bytes
 from django.utils.functional import cached_property
 
+from pootle.core.cache import get_cache
 from pootle.core.exceptions import MissingPluginError, NotConfiguredError
 
 from .delegate import fs_plugins
 
 
+#: Size of the blocks read from files to compute their digest (bytes)
+FILE_HASH_BLOCK_SIZE = 64 * 1024
+
+#: Maximum number of threads reading files to compute their digest
+FILE_HASH_THREADS = 8
+
+MTIME_HASH_RE = re.compile(r"^\d+(\.\d+)?$")
+
+
 class PathFilter(object):
 
     def path_regex(self, path):
@@ -105,3 +120,111 @@ def parse_fs_url(fs_url):
             fs_type = chunks[0]
             fs_url = chunks[1]
     return fs_type, fs_url
+
+
+def get_file_mtime_hash(file_path):
+    """Returns the modification time of the file as a string, as was used
+    for the file hashes before content digests.
+    """
+    if os.path.exists(file_path):
+        return str(os.stat(file_path).st_mtime)
+
+
+def is_mtime_hash(file_hash):
+    return bool(file_hash and MTIME_HASH_RE.match(file_hash))
+
+
+def file_hash_changed(last_sync_hash, file_hash, file_path):
+    """Checks whether a file has changed since it was synced.
+
+    ``StoreFS`` synced before file hashes were digests of their contents
+    are compared using their modification time.
+    """
+    if last_sync_hash == file_hash:
+        return False
+    if file_hash and is_mtime_hash(last_sync_hash):
+        return last_sync_hash != get_file_mtime_hash(file_path)
+    return True
+
+
+class FileHasher(object):
+    """Computes the digests of the contents of files.
+
+    Digests are cached together with the inode, size and modification time
+    of the files, so unmodified files are not read again.
+    """
+
+    ns = "pootle.fs.file_hash"
+
+    @cached_property
+    def cache(self):
+        return get_cache("lru")
+
+    def get_cache_key(self, file_path):
+        return (
+            "%s.%s"
+            % (self.ns, hashlib.md5(force_bytes(file_path)).hexdigest()))
+
+    def get_stat(self, file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+        return "%s.%s.%s" % (stat.st_ino, stat.st_size, stat.st_mtime)
+
+    def digest(self, file_path):
+        digest = hashlib.sha1()
+        try:
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(FILE_HASH_BLOCK_SIZE), b""):
+                    digest.update(block)
+        except IOError:
+            return
+        return digest.hexdigest()
+
+    def hash(self, file_path):
+        return self.hashes([file_path]).get(file_path)
+
+    def hashes(self, file_paths):
+        """Returns a dictionary of the digests of the given files by path.
+
+        Files that don't exist are omitted.
+        """
+        stats = {}
+        for file_path in file_paths:
+            stat = self.get_stat(file_path)
+            if stat:
+                stats[file_path] = stat
+        keys = {
+            file_path: self.get_cache_key(file_path)
+            for file_path in stats}
+        cached = self.cache.get_many(keys.values())
+        hashes = {}
+        to_hash = []
+        for file_path, stat in stats.items():
+            cached_stat, file_hash = cached.get(keys[file_path], (None, None))
+            if cached_stat == stat:
+                hashes[file_path] = file_hash
+            else:
+                to_hash.append(file_path)
+        if not to_hash:
+            return hashes
+        if len(to_hash) == 1:
+            digests = [self.digest(to_hash[0])]
+        else:
+            pool = ThreadPool(min(FILE_HASH_THREADS, len(to_hash)))
+            try:
+                digests = pool.map(self.digest, to_hash)
+            finally:
+                pool.close()
+                pool.join()
+        to_cache = {}
+        for file_path, file_hash in zip(to_hash, digests):
+            if file_hash:
+                hashes[file_path] = file_hash
+                to_cache[keys[file_path]] = (stats[file_path], file_hash)
+        self.cache.set_many(to_cache)
+        return hashes
+
+
+file_hasher = FileHasher()
@@ -19,3 +19,4 @@ class PootleLogConfig(AppConfig):
 
     def ready(self):
         importlib.import_module("pootle_log.getters")
+        importlib.import_module("pootle_log.receivers")
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2018-01-15 12:00
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import pootle.core.user
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('pootle_statistics', '0023_remove_scorelog'),
+        ('pootle_store', '0055_fill_unit_source_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(db_index=True, null=True)),
+                ('action', models.CharField(max_length=32)),
+                ('revision', models.IntegerField(blank=True, null=True)),
+                ('submission', models.OneToOneField(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pootle_statistics.Submission')),
+                ('suggestion', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pootle_store.Suggestion')),
+                ('store', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pootle_store.Store')),
+                ('unit', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pootle_store.Unit')),
+                ('unit_source', models.OneToOneField(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pootle_store.UnitSource')),
+                ('user', models.ForeignKey(db_index=False, null=True, on_delete=models.SET(pootle.core.user.get_system_user), related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'pootle_log_event',
+            },
+        ),
+        migrations.AlterIndexTogether(
+            name='event',
+            index_together=set([('unit', 'timestamp'), ('user', 'timestamp'), ('store', 'user', 'timestamp'), ('action', 'timestamp')]),
+        ),
+    ]
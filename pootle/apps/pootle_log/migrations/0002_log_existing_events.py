@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2018-01-15 12:30
+from __future__ import unicode_literals
+
+import logging
+
+from django.db import migrations
+
+
+BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+# pootle_statistics.models.SubmissionFields
+SOURCE = 1
+TARGET = 2
+COMMENT = 4
+CHECK = 5
+
+
+def get_submission_action(field, new_value):
+    if field == CHECK:
+        return (
+            "check_muted"
+            if new_value == "0"
+            else "check_unmuted")
+    return {
+        SOURCE: "source_updated",
+        TARGET: "target_updated",
+        COMMENT: "comment_updated"}.get(field, "state_changed")
+
+
+def create_events(Event, events):
+    created = 0
+    batch = []
+    for event in events:
+        batch.append(event)
+        if len(batch) == BATCH_SIZE:
+            Event.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    if batch:
+        Event.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def iterate_created_units(apps, Event):
+    unit_sources = apps.get_model("pootle_store.UnitSource").objects
+    unit_sources = unit_sources.order_by().values_list(
+        "id", "unit_id", "unit__store_id", "created_by_id",
+        "unit__creation_time")
+    for (unit_source_id, unit_id, store_id,
+         user_id, timestamp) in unit_sources.iterator():
+        yield Event(
+            unit_id=unit_id,
+            store_id=store_id,
+            user_id=user_id,
+            timestamp=timestamp,
+            action="unit_created",
+            unit_source_id=unit_source_id)
+
+
+def iterate_submissions(apps, Event):
+    submissions = apps.get_model("pootle_statistics.Submission").objects
+    submissions = submissions.order_by().values_list(
+        "id", "unit_id", "unit__store_id", "submitter_id", "creation_time",
+        "field", "new_value", "revision")
+    for (submission_id, unit_id, store_id, user_id, timestamp,
+         field, new_value, revision) in submissions.iterator():
+        yield Event(
+            unit_id=unit_id,
+            store_id=store_id,
+            user_id=user_id,
+            timestamp=timestamp,
+            action=get_submission_action(field, new_value),
+            revision=revision,
+            submission_id=submission_id)
+
+
+def iterate_suggestions(apps, Event):
+    suggestions = apps.get_model("pootle_store.Suggestion").objects
+    suggestions = suggestions.exclude(
+        creation_time__isnull=True).order_by().values_list(
+            "id", "unit_id", "unit__store_id", "user_id", "creation_time")
+    for (suggestion_id, unit_id, store_id,
+         user_id, timestamp) in suggestions.iterator():
+        yield Event(
+            unit_id=unit_id,
+            store_id=store_id,
+            user_id=user_id,
+            timestamp=timestamp,
+            action="suggestion_created",
+            suggestion_id=suggestion_id)
+
+
+def iterate_reviews(apps, Event):
+    reviews = apps.get_model("pootle_store.Suggestion").objects
+    reviews = reviews.filter(
+        review_time__isnull=False).exclude(
+            state__name="pending").order_by().values_list(
+                "id", "unit_id", "unit__store_id", "reviewer_id",
+                "review_time", "state__name")
+    for (suggestion_id, unit_id, store_id, user_id,
+         timestamp, state) in reviews.iterator():
+        yield Event(
+            unit_id=unit_id,
+            store_id=store_id,
+            user_id=user_id,
+            timestamp=timestamp,
+            action=(
+                "suggestion_accepted"
+                if state == "accepted"
+                else "suggestion_rejected"),
+            suggestion_id=suggestion_id)
+
+
+def log_existing_events(apps, schema_editor):
+    Event = apps.get_model("pootle_log.Event")
+    Event.objects.all().delete()
+    created = sum(
+        create_events(Event, events)
+        for events
+        in [iterate_created_units(apps, Event),
+            iterate_submissions(apps, Event),
+            iterate_suggestions(apps, Event),
+            iterate_reviews(apps, Event)])
+    logger.debug("[log] Logged %s events", created)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pootle_comment', '0002_use_abstract_module'),
+        ('pootle_log', '0001_initial'),
+        ('pootle_statistics', '0023_remove_scorelog'),
+        ('pootle_store', '0055_fill_unit_source_data'),
+    ]
+
+    operations = [
+        migrations.RunPython(log_existing_events),
+    ]
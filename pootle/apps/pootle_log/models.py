@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from django.conf import settings
+from django.db import models
+
+from pootle.core.user import get_system_user
+
+
+class Event(models.Model):
+    """An event logged from a submission, suggestion or unit creation
+
+    Events hold the unit's store and the timestamp of the row that they are
+    logged from, so that they can be filtered by store, user and time without
+    joining the tables that they are logged from. Timestamps are kept up to
+    date by the receivers in ``pootle_log.receivers``.
+    """
+
+    class Meta(object):
+        db_table = "pootle_log_event"
+        index_together = [
+            ["store", "user", "timestamp"],
+            ["user", "timestamp"],
+            ["unit", "timestamp"],
+            ["action", "timestamp"]]
+
+    timestamp = models.DateTimeField(null=True, db_index=True)
+    action = models.CharField(max_length=32)
+    revision = models.IntegerField(null=True, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        db_index=False,
+        related_name="+",
+        on_delete=models.SET(get_system_user))
+    unit = models.ForeignKey(
+        "pootle_store.Unit",
+        db_index=False,
+        related_name="+",
+        on_delete=models.CASCADE)
+    store = models.ForeignKey(
+        "pootle_store.Store",
+        db_index=False,
+        related_name="+",
+        on_delete=models.CASCADE)
+    submission = models.OneToOneField(
+        "pootle_statistics.Submission",
+        null=True,
+        related_name="+",
+        on_delete=models.CASCADE)
+    suggestion = models.ForeignKey(
+        "pootle_store.Suggestion",
+        null=True,
+        related_name="+",
+        on_delete=models.CASCADE)
+    unit_source = models.OneToOneField(
+        "pootle_store.UnitSource",
+        null=True,
+        related_name="+",
+        on_delete=models.CASCADE)
+
+    def __unicode__(self):
+        return u"%s: %s (%s)" % (self.timestamp, self.action, self.store_id)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from pootle.core.signals import create
+from pootle_statistics.models import Submission
+from pootle_store.models import Suggestion, Unit, UnitSource
+
+from .updater import EventLogUpdater
+
+
+# pootle_log is installed after pootle_store, so the objects sent with the
+# `create` signal have already been created by the pootle_store receivers,
+# and is installed before pootle_score, so that events are logged before
+# scores are updated.
+
+
+@receiver(create, sender=UnitSource)
+def handle_unit_sources_created(**kwargs):
+    if kwargs.get("objects"):
+        EventLogUpdater().log_unit_sources(kwargs["objects"])
+
+
+@receiver(post_save, sender=UnitSource)
+def handle_unit_source_created(**kwargs):
+    if kwargs.get("created"):
+        EventLogUpdater().log_unit_sources([kwargs["instance"]])
+
+
+@receiver(post_save, sender=Unit)
+def handle_unit_saved(**kwargs):
+    unit = kwargs["instance"]
+    if not kwargs.get("created"):
+        EventLogUpdater().update_timestamp(
+            unit.creation_time,
+            unit_id=unit.id,
+            action="unit_created")
+
+
+@receiver(create, sender=Submission)
+def handle_submissions_created(**kwargs):
+    if kwargs.get("objects"):
+        EventLogUpdater().log_submissions(kwargs["objects"])
+
+
+@receiver(post_save, sender=Submission)
+def handle_submission_saved(**kwargs):
+    submission = kwargs["instance"]
+    if kwargs.get("created"):
+        EventLogUpdater().log_submissions([submission])
+    else:
+        EventLogUpdater().update_timestamp(
+            submission.creation_time,
+            submission_id=submission.id)
+
+
+@receiver(post_save, sender=Suggestion)
+def handle_suggestion_saved(**kwargs):
+    suggestion = kwargs["instance"]
+    if kwargs.get("created"):
+        EventLogUpdater().log_suggestions([suggestion])
+    else:
+        EventLogUpdater().update_timestamp(
+            suggestion.creation_time,
+            suggestion_id=suggestion.id,
+            action="suggestion_created")
+    if suggestion.review_time and not suggestion.is_pending:
+        EventLogUpdater().log_reviews([suggestion])
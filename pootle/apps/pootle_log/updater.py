@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import logging
+
+from django.utils.functional import cached_property
+
+from pootle.core.delegate import states
+from pootle_statistics.models import Submission, SubmissionFields
+from pootle_store.models import Suggestion, UnitSource
+
+from .models import Event
+
+
+logger = logging.getLogger(__name__)
+
+
+#: Number of events created at a time
+EVENT_LOG_BATCH_SIZE = 1000
+
+SUGGESTION_REVIEW_ACTIONS = ("suggestion_accepted", "suggestion_rejected")
+
+EVENT_SOURCE_ACTIONS = dict(
+    unit_source=("unit_created", ),
+    suggestion=("suggestion_created", ) + SUGGESTION_REVIEW_ACTIONS,
+    submission=(
+        "state_changed", "check_muted", "check_unmuted", "target_updated",
+        "source_updated", "comment_updated"))
+
+
+def get_submission_action(field, new_value):
+    if field == SubmissionFields.CHECK:
+        return (
+            "check_muted"
+            if new_value == "0"
+            else "check_unmuted")
+    elif field == SubmissionFields.TARGET:
+        return "target_updated"
+    elif field == SubmissionFields.SOURCE:
+        return "source_updated"
+    elif field == SubmissionFields.COMMENT:
+        return "comment_updated"
+    return "state_changed"
+
+
+class EventLogUpdater(object):
+    """Adds events to the ``Event`` log
+
+    Events are logged by the receivers in ``pootle_log.receivers`` when
+    submissions, suggestions and unit sources are created, and when
+    suggestions are reviewed, in the same transaction as their sources. The
+    receivers also update the timestamps of events when their sources are
+    saved with new ones.
+    """
+
+    def __init__(self, batch_size=EVENT_LOG_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    @property
+    def event_qs(self):
+        return Event.objects
+
+    @cached_property
+    def suggestion_states(self):
+        return states.get(Suggestion)
+
+    def create_events(self, events):
+        created = 0
+        batch = []
+        for event in events:
+            batch.append(event)
+            if len(batch) == self.batch_size:
+                created += len(self.event_qs.bulk_create(batch))
+                batch = []
+        if batch:
+            created += len(self.event_qs.bulk_create(batch))
+        return created
+
+    def iterate_created_units(self, unit_sources):
+        unit_sources = unit_sources.order_by().values_list(
+            "id", "unit_id", "created_by_id", "unit__creation_time",
+            "unit__store_id")
+        for (unit_source_id, unit_id, user_id,
+             timestamp, store_id) in unit_sources.iterator():
+            yield Event(
+                unit_id=unit_id,
+                user_id=user_id,
+                timestamp=timestamp,
+                action="unit_created",
+                store_id=store_id,
+                unit_source_id=unit_source_id)
+
+    def iterate_submissions(self, submissions):
+        submissions = submissions.order_by().values_list(
+            "id", "unit_id", "submitter_id", "creation_time", "field",
+            "new_value", "revision", "unit__store_id")
+        for (submission_id, unit_id, user_id, timestamp, field, new_value,
+             revision, store_id) in submissions.iterator():
+            yield Event(
+                unit_id=unit_id,
+                user_id=user_id,
+                timestamp=timestamp,
+                action=get_submission_action(field, new_value),
+                store_id=store_id,
+                revision=revision,
+                submission_id=submission_id)
+
+    def iterate_suggestions(self, suggestions):
+        suggestions = suggestions.exclude(
+            creation_time__isnull=True).order_by().values_list(
+                "id", "unit_id", "user_id", "creation_time",
+                "unit__store_id")
+        for (suggestion_id, unit_id, user_id,
+             timestamp, store_id) in suggestions.iterator():
+            yield Event(
+                unit_id=unit_id,
+                user_id=user_id,
+                timestamp=timestamp,
+                action="suggestion_created",
+                store_id=store_id,
+                suggestion_id=suggestion_id)
+
+    def get_unlogged_reviews(self, reviews):
+        logged = set(
+            self.event_qs.filter(
+                action__in=SUGGESTION_REVIEW_ACTIONS,
+                suggestion_id__in=[review[0] for review in reviews]
+            ).values_list("suggestion_id", "timestamp"))
+        return [
+            review
+            for review
+            in reviews
+            if (review[0], review[3]) not in logged]
+
+    def iterate_reviews(self, suggestions):
+        reviews = suggestions.filter(
+            review_time__isnull=False).exclude(
+                state_id=self.suggestion_states["pending"])
+        reviews = reviews.order_by().values_list(
+            "id", "unit_id", "reviewer_id", "review_time", "state_id",
+            "unit__store_id")
+        batch = []
+        for review in reviews.iterator():
+            batch.append(review)
+            if len(batch) == self.batch_size:
+                for event in self.get_review_events(batch):
+                    yield event
+                batch = []
+        if batch:
+            for event in self.get_review_events(batch):
+                yield event
+
+    def get_review_events(self, reviews):
+        accepted = self.suggestion_states["accepted"]
+        for (suggestion_id, unit_id, user_id, timestamp,
+             state_id, store_id) in self.get_unlogged_reviews(reviews):
+            yield Event(
+                unit_id=unit_id,
+                user_id=user_id,
+                timestamp=timestamp,
+                action=(
+                    "suggestion_accepted"
+                    if state_id == accepted
+                    else "suggestion_rejected"),
+                store_id=store_id,
+                suggestion_id=suggestion_id)
+
+    def log_unit_sources(self, unit_sources):
+        """Logs the creation of the units of `unit_sources`
+
+        The unit sources may have been created in bulk, without ids, so
+        they are found from their units.
+        """
+        return self.create_events(
+            self.iterate_created_units(
+                UnitSource.objects.filter(
+                    unit_id__in=set(
+                        unit_source.unit_id
+                        for unit_source
+                        in unit_sources))))
+
+    def get_created_submissions(self, submissions):
+        """Submissions that were created from the `submissions` objects
+
+        Not all db backends return ids from bulk inserts. Events are logged
+        in the same transaction as their submissions, so the submissions of
+        the objects' units that have no events are the ones that were
+        created.
+        """
+        ids = [
+            submission.pk
+            for submission
+            in submissions
+            if submission.pk is not None]
+        if len(ids) == len(submissions):
+            return Submission.objects.filter(id__in=ids)
+        unit_ids = set(submission.unit_id for submission in submissions)
+        logged = self.event_qs.filter(
+            unit_id__in=unit_ids,
+            submission_id__isnull=False).values_list(
+                "submission_id", flat=True)
+        return Submission.objects.filter(
+            unit_id__in=unit_ids).exclude(id__in=logged)
+
+    def log_submissions(self, submissions):
+        """Logs the creation of `submissions`"""
+        return self.create_events(
+            self.iterate_submissions(
+                self.get_created_submissions(list(submissions))))
+
+    def log_suggestions(self, suggestions):
+        """Logs the creation of `suggestions`"""
+        return self.create_events(
+            self.iterate_suggestions(
+                Suggestion.objects.filter(
+                    id__in=[suggestion.pk for suggestion in suggestions])))
+
+    def log_reviews(self, suggestions):
+        """Logs the reviews of `suggestions` that have not been logged"""
+        return self.create_events(
+            self.iterate_reviews(
+                Suggestion.objects.filter(
+                    id__in=[suggestion.pk for suggestion in suggestions])))
+
+    def update_timestamp(self, timestamp, **filters):
+        """Copies `timestamp` to the events matching `filters` if it has
+        changed since they were logged
+
+        :return: the number of updated events
+        """
+        return self.event_qs.filter(**filters).exclude(
+            timestamp=timestamp).update(timestamp=timestamp)
+
+    def rebuild(self):
+        """Replaces the log with events for all of the existing submissions,
+        suggestions and unit sources
+
+        :return: the number of logged events
+        """
+        self.event_qs.all().delete()
+        created = sum(
+            self.create_events(events)
+            for events
+            in [self.iterate_created_units(UnitSource.objects.all()),
+                self.iterate_submissions(Submission.objects.all()),
+                self.iterate_suggestions(Suggestion.objects.all()),
+                self.iterate_reviews(Suggestion.objects.all())])
+        logger.debug("[log] Logged %s events", created)
+        return created
@@ -7,6 +7,7 @@
 # AUTHORS file for copyright and authorship information.
 
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 from django.utils.functional import cached_property
 
 from pootle.core.delegate import comparable_event
@@ -15,6 +16,13 @@ from pootle_statistics.models import (
     Submission, SubmissionFields, SubmissionTypes)
 from pootle_store.models import Suggestion, UnitSource
 
+from .models import Event
+from .updater import EVENT_SOURCE_ACTIONS, get_submission_action
+
+
+#: Number of logged events read at a time
+LOGGED_EVENTS_CHUNK_SIZE = 1000
+
 
 class LogEvent(object):
 
@@ -71,6 +79,11 @@ class ComparableLogEvent(BaseProxy):
 
 class Log(object):
     include_meta = False
+    logged_events_chunk_size = LOGGED_EVENTS_CHUNK_SIZE
+
+    @property
+    def event_qs(self):
+        return Event.objects
 
     @property
     def source_qs(self):
@@ -98,6 +111,11 @@ class Log(object):
         return self.submission_qs.select_related(
             "unit", "submitter", "unit__unit_source")
 
+    @property
+    def logged_events(self):
+        return self.event_qs.select_related(
+            "user", "submission", "suggestion", "unit__unit_source")
+
     @cached_property
     def event(self):
         return LogEvent
@@ -235,23 +253,11 @@ class Log(object):
 
     def get_submission_events(self, **kwargs):
         for submission in self.filtered_submissions(**kwargs):
-            event_name = "state_changed"
-            if submission.field == SubmissionFields.CHECK:
-                event_name = (
-                    "check_muted"
-                    if submission.new_value == "0"
-                    else "check_unmuted")
-            elif submission.field == SubmissionFields.TARGET:
-                event_name = "target_updated"
-            elif submission.field == SubmissionFields.SOURCE:
-                event_name = "source_updated"
-            elif submission.field == SubmissionFields.COMMENT:
-                event_name = "comment_updated"
             yield self.event(
                 submission.unit,
                 submission.submitter,
                 submission.creation_time,
-                event_name,
+                get_submission_action(submission.field, submission.new_value),
                 submission,
                 revision=submission.revision)
 
@@ -309,6 +315,101 @@ class Log(object):
             for event in self.get_submission_events(**kwargs):
                 yield event
 
+    def filtered_logged_events(self, **kwargs):
+        events = self.filter_users(
+            self.logged_events,
+            kwargs.get("users"),
+            field="user",
+            include_meta=kwargs.get("include_meta"))
+        events = self.filter_path(
+            events,
+            kwargs.get("path"),
+            field="store__pootle_path")
+        events = self.filter_store(
+            events,
+            kwargs.get("store"),
+            field="store_id")
+        events = self.filter_timestamps(
+            events,
+            start=kwargs.get("start"),
+            end=kwargs.get("end"),
+            field="timestamp")
+        event_sources = kwargs.get("event_sources")
+        if event_sources is not None:
+            events = events.filter(
+                action__in=[
+                    action
+                    for event_source in event_sources
+                    for action in EVENT_SOURCE_ACTIONS[event_source]])
+        return events
+
+    def stream_logged_events(self, events):
+        """Yields `events` in timestamp order, a chunk at a time
+
+        Events without timestamps are yielded first.
+        """
+        chunk_size = self.logged_events_chunk_size
+        untimed = events.filter(timestamp__isnull=True).order_by("id")
+        timed = events.filter(
+            timestamp__isnull=False).order_by("timestamp", "id")
+        last_id = 0
+        while True:
+            chunk = list(untimed.filter(id__gt=last_id)[:chunk_size])
+            for event in chunk:
+                yield event
+            if len(chunk) < chunk_size:
+                break
+            last_id = chunk[-1].id
+        chunk = list(timed[:chunk_size])
+        while chunk:
+            for event in chunk:
+                yield event
+            if len(chunk) < chunk_size:
+                break
+            last = chunk[-1]
+            after_last = (
+                Q(timestamp__gt=last.timestamp)
+                | Q(timestamp=last.timestamp, id__gt=last.id))
+            chunk = list(timed.filter(after_last)[:chunk_size])
+
+    def get_logged_event(self, event):
+        action = event.action
+        if event.submission_id:
+            value = event.submission
+        elif event.suggestion_id:
+            value = event.suggestion
+            if action != "suggestion_created":
+                # reviews can be reverted, so only the current one is used
+                if value.is_pending or value.review_time != event.timestamp:
+                    return None
+                action = (
+                    "suggestion_accepted"
+                    if value.is_accepted
+                    else "suggestion_rejected")
+        else:
+            value = event.unit.unit_source
+        # share the unit that was selected with the event
+        value.unit = event.unit
+        return self.event(
+            event.unit,
+            event.user,
+            event.timestamp,
+            action,
+            value,
+            revision=event.revision)
+
+    def get_logged_events(self, **kwargs):
+        """Events from the ``Event`` log, in timestamp order
+
+        Takes the same filters as ``get_events``.
+        """
+        events = self.stream_logged_events(
+            self.filtered_logged_events(**kwargs))
+        for event in events:
+            log_event = self.get_logged_event(event)
+            if log_event is not None:
+                yield log_event
+
 
 class StoreLog(Log):
     include_meta = True
@@ -331,6 +432,11 @@ class StoreLog(Log):
         return super(
             StoreLog, self).submissions.filter(unit__store_id=self.store.id)
 
+    @property
+    def event_qs(self):
+        return super(
+            StoreLog, self).event_qs.filter(store_id=self.store.id)
+
     def filter_store(self, qs, store=None, field="unit__store_id"):
         return qs
 
@@ -356,6 +462,11 @@ class UnitLog(Log):
         return super(
             UnitLog, self).submissions.filter(unit_id=self.unit.id)
 
+    @property
+    def event_qs(self):
+        return super(
+            UnitLog, self).event_qs.filter(unit_id=self.unit.id)
+
     def filter_store(self, qs, store=None, field="unit__store_id"):
         return qs
 
@@ -393,3 +504,8 @@ class UserLog(Log):
     @property
     def submission_qs(self):
         return self.user.submission_set
+
+    @property
+    def event_qs(self):
+        return super(
+            UserLog, self).event_qs.filter(user_id=self.user.id)
@@ -55,7 +55,7 @@ class UserProfile(object):
         events = sorted(
             sortable(ev)
             for ev
-            in self.log.get_events(start=start))
+            in self.log.get_logged_events(start=start))
         if n is not None:
             events = events[-n:]
         return reversed(events)
@@ -9,21 +9,40 @@
 from datetime import timedelta
 
 from django.contrib.auth import get_user_model
-from django.db.models import Sum
+from django.db.models import Q, Sum
 from django.utils.functional import cached_property
 
 from pootle.core.bulk import BulkCRUD
 from pootle.core.contextmanagers import bulk_operations, keep_data
-from pootle.core.delegate import event_score, log, score_updater
+from pootle.core.delegate import (
+    event_score, log, score_updater, states)
 from pootle.core.signals import create, update, update_scores
 from pootle.core.utils.timezone import localdate
 from pootle_log.utils import LogEvent
 from pootle_score.models import UserStoreScore, UserTPScore
+from pootle_statistics.models import Submission, SubmissionFields
+from pootle_store.models import Suggestion, UnitSource
 from pootle_translationproject.models import TranslationProject
 
 from .utils import to_datetime
 
 
+class ScoredUnit(object):
+    """The parts of a unit that event scores are calculated from"""
+
+    def __init__(self, source_wordcount):
+        self.unit_source = UnitSource(source_wordcount=source_wordcount)
+
+
+class ScoredValue(object):
+    """The parts of a submission or suggestion that event scores are
+    calculated from
+    """
+
+    def __init__(self, unit):
+        self.unit = unit
+
+
 class UserRelatedScoreCRUD(BulkCRUD):
 
     def post_create(self, **kwargs):
@@ -258,28 +277,11 @@ class StoreScoreUpdater(ScoreUpdater):
 
     def calculate(self, start=None, end=None, users=None):
         calculated_scores = {}
-        scored_events = self.logs.get_events(
+        scored_events = self.logs.get_logged_events(
             users=users,
             start=to_datetime(start),
             end=to_datetime(end),
             include_meta=False,
-            ordered=False,
-            only=dict(
-                suggestion=(
-                    "unit__unit_source__source_wordcount",
-                    "user_id",
-                    "reviewer_id",
-                    "state_id",),
-                submission=(
-                    "unit__unit_source__source_wordcount",
-                    "unit__unit_source__created_by_id",
-                    "unit_id",
-                    "submitter__id",
-                    "old_value",
-                    "new_value",
-                    "creation_time",
-                    "revision",
-                    "field")),
             event_sources=("suggestion", "submission"))
         for event in scored_events:
             self.score_event(event, calculated_scores)
@@ -327,6 +329,131 @@ class TPScoreUpdater(ScoreUpdater):
                     reviewed=Sum("reviewed"),
                     suggested=Sum("suggested"))
 
+    @cached_property
+    def submission_actions(self):
+        # state changes are logged as `state_changed` events, which are not
+        # scored
+        actions = {
+            SubmissionFields.TARGET: "target_updated",
+            SubmissionFields.COMMENT: "comment_updated"}
+        return {
+            field: action
+            for field, action
+            in actions.items()
+            if action in self.scoring}
+
+    @cached_property
+    def meta_users(self):
+        User = get_user_model()
+        return set(
+            User.objects.filter(
+                username__in=User.objects.META_USERS).values_list(
+                    "id", flat=True))
+
+    @cached_property
+    def event_scores(self):
+        return {}
+
+    def get_event_score(self, action, wordcount):
+        """Scores for an event of `action` on a unit with `wordcount` source
+        words, from the ``event_score`` class of the action
+        """
+        if (action, wordcount) not in self.event_scores:
+            unit = ScoredUnit(wordcount)
+            event = self.event_class(
+                unit, None, None, action, ScoredValue(unit))
+            self.event_scores[(action, wordcount)] = (
+                self.scoring[action](event).get_score())
+        return self.event_scores[(action, wordcount)]
+
+    def add_store_score(self, scores, store, timestamp, user, event_scores):
+        if not any(x > 0 for x in event_scores.values()):
+            return
+        event_date = localdate(timestamp)
+        user_scores = (
+            scores.setdefault(store, {})
+                  .setdefault(event_date, {})
+                  .setdefault(user, {}))
+        for k, value in event_scores.items():
+            if value:
+                user_scores[k] = user_scores.get(k, 0) + value
+
+    def calculate_submission_scores(self, scores, users=None):
+        if not self.submission_actions:
+            return
+        submissions = Submission.objects.filter(
+            unit__store__translation_project_id=self.tp.id,
+            field__in=self.submission_actions.keys()).exclude(
+                submitter_id__in=self.meta_users).order_by()
+        if users:
+            submissions = submissions.filter(submitter_id__in=users)
+        submissions = submissions.values_list(
+            "unit__store_id",
+            "submitter_id",
+            "creation_time",
+            "field",
+            "unit__unit_source__source_wordcount")
+        for store, user, timestamp, field, wordcount in submissions.iterator():
+            self.add_store_score(
+                scores, store, timestamp, user,
+                self.get_event_score(
+                    self.submission_actions[field], wordcount))
+
+    def calculate_suggestion_scores(self, scores, users=None):
+        suggestion_states = states.get(Suggestion)
+        suggestions = Suggestion.objects.filter(
+            unit__store__translation_project_id=self.tp.id).exclude(
+                creation_time__isnull=True).order_by()
+        if users:
+            suggestions = suggestions.filter(
+                Q(user_id__in=users) | Q(reviewer_id__in=users))
+        suggestions = suggestions.values_list(
+            "unit__store_id",
+            "user_id",
+            "creation_time",
+            "reviewer_id",
+            "review_time",
+            "state_id",
+            "unit__unit_source__source_wordcount")
+        score_created = "suggestion_created" in self.scoring
+        for suggestion in suggestions.iterator():
+            (store, user, created, reviewer,
+             reviewed, state, wordcount) = suggestion
+            score_user = (
+                user not in self.meta_users
+                and (not users or user in users))
+            if score_created and score_user:
+                self.add_store_score(
+                    scores, store, created, user,
+                    self.get_event_score("suggestion_created", wordcount))
+            if state == suggestion_states["pending"]:
+                continue
+            action = (
+                "suggestion_accepted"
+                if state == suggestion_states["accepted"]
+                else "suggestion_rejected")
+            score_reviewer = (
+                reviewer not in self.meta_users
+                and (not users or reviewer in users))
+            if action in self.scoring and score_reviewer:
+                self.add_store_score(
+                    scores, store, reviewed, reviewer,
+                    self.get_event_score(action, wordcount))
+
+    def calculate_store_scores(self, users=None):
+        """Calculates the scores of all of the TP's stores at once
+
+        Scores are summed from the values of the TP's submissions and
+        suggestions, rather than replaying each store's log events.
+
+        :return: a dictionary of store scores, keyed by store id, in the form
+          returned by :meth:`StoreScoreUpdater.calculate`
+        """
+        scores = {}
+        self.calculate_submission_scores(scores, users)
+        self.calculate_suggestion_scores(scores, users)
+        return scores
+
     def clear(self, users=None):
         tp_scores = self.score_model.objects.all()
         store_scores = self.store_score_model.objects.all()
@@ -348,12 +475,13 @@ class TPScoreUpdater(ScoreUpdater):
             signals=(update_scores, ),
             suppress=(TranslationProject, ))
         existing = existing or self.get_store_scores(self.tp)
+        calculated = self.calculate_store_scores(users)
         with bulk_operations(UserTPScore):
             with suppress_tp_scores:
                 with bulk_operations(UserStoreScore):
                     for store in self.tp.stores.iterator():
-                        score_updater.get(store.__class__)(store).update(
-                            users=users,
+                        score_updater.get(store.__class__)(store).set_scores(
+                            calculated.get(store.id, {}),
                             existing=existing.get(store.id))
             self.update(users=users, existing=existing_tps)
 
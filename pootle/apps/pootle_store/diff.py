@@ -6,11 +6,16 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import bisect
 import difflib
 import logging
-from collections import OrderedDict
+from array import array
+from hashlib import sha1
+
+from translate.misc.multistring import multistring
 
 from django.db import models
+from django.utils.encoding import force_bytes, force_text
 from django.utils.functional import cached_property
 
 from pootle.core.delegate import format_diffs
@@ -23,6 +28,173 @@ from .unit import UnitProxy
 logger = logging.getLogger(__name__)
 
 
+def _get_matched_pairs(a, b):
+    """Positions ``(i, j)`` of the longest common subsequence of `a` and `b`
+
+    As the items are unique in each sequence, this is the longest increasing
+    subsequence of the positions in `b` of the items of `a`, which is found
+    with patience sorting in ``O(n log n)``.
+    """
+    b_index = {item: j for j, item in enumerate(b)}
+    pairs = [(i, b_index[item])
+             for i, item in enumerate(a)
+             if item in b_index]
+    # for each length, the pair ending a subsequence with the lowest `j`
+    tails = []
+    tail_positions = []
+    previous = [None] * len(pairs)
+    for k, (i_, j) in enumerate(pairs):
+        length = bisect.bisect_left(tail_positions, j)
+        if length:
+            previous[k] = tails[length - 1]
+        if length == len(tails):
+            tails.append(k)
+            tail_positions.append(j)
+        else:
+            tails[length] = k
+            tail_positions[length] = j
+    matched = []
+    k = tails[-1] if tails else None
+    while k is not None:
+        matched.append(pairs[k])
+        k = previous[k]
+    matched.reverse()
+    return matched
+
+
+def _add_opcode(opcodes, i1, i2, j1, j2, equal=False):
+    if equal:
+        tag = "equal"
+        if opcodes and opcodes[-1][0] == tag:
+            opcodes[-1] = (tag, opcodes[-1][1], i2, opcodes[-1][3], j2)
+            return
+    elif i1 < i2 and j1 < j2:
+        tag = "replace"
+    elif i1 < i2:
+        tag = "delete"
+    elif j1 < j2:
+        tag = "insert"
+    else:
+        return
+    opcodes.append((tag, i1, i2, j1, j2))
+
+
+def get_opcodes(a, b):
+    """Returns ``difflib.SequenceMatcher`` style opcodes to turn `a` into `b`
+
+    Common leading and trailing items are matched first, so that the usual
+    case of mostly unchanged stores is linear, and the remaining items are
+    aligned on their longest common subsequence. Sequences with duplicate
+    items are left to ``difflib``.
+    """
+    if len(set(a)) != len(a) or len(set(b)) != len(b):
+        return difflib.SequenceMatcher(None, a, b).get_opcodes()
+    len_a, len_b = len(a), len(b)
+    prefix = 0
+    while (prefix < min(len_a, len_b)
+           and a[prefix] == b[prefix]):
+        prefix += 1
+    suffix = 0
+    while (suffix < min(len_a, len_b) - prefix
+           and a[len_a - suffix - 1] == b[len_b - suffix - 1]):
+        suffix += 1
+    end_a, end_b = len_a - suffix, len_b - suffix
+    opcodes = []
+    if prefix:
+        _add_opcode(opcodes, 0, prefix, 0, prefix, equal=True)
+    i = j = prefix
+    for match_i, match_j in _get_matched_pairs(a[prefix:end_a],
+                                               b[prefix:end_b]):
+        match_i += prefix
+        match_j += prefix
+        _add_opcode(opcodes, i, match_i, j, match_j)
+        _add_opcode(
+            opcodes, match_i, match_i + 1, match_j, match_j + 1, equal=True)
+        i, j = match_i + 1, match_j + 1
+    _add_opcode(opcodes, i, end_a, j, end_b)
+    if suffix:
+        _add_opcode(opcodes, end_a, len_a, end_b, len_b, equal=True)
+    return opcodes
+
+
+class DiffUnit(object):
+    """A unit's record in `DiffUnits`, read with ``unit["field"]``"""
+
+    __slots__ = ("units", "position")
+
+    def __init__(self, units, position):
+        self.units = units
+        self.position = position
+
+    def __contains__(self, k):
+        return k == "unitid" or k in self.units.columns
+
+    def __getitem__(self, k):
+        if k == "unitid":
+            return self.units.unitids[self.position]
+        return self.units.columns[k][self.position]
+
+
+class DiffUnits(object):
+    """Ordered mapping of unitids to the `DiffUnit` records of units
+
+    The fields of the units are stored in columns, rather than in a
+    dictionary per unit, with integer fields packed in arrays.
+    """
+
+    int_fields = ("state", "id", "index", "revision")
+
+    def __init__(self, fields):
+        self.unitids = []
+        self.positions = {}
+        self.columns = {
+            k: (array("l") if k in self.int_fields else [])
+            for k in fields
+            if k != "unitid"}
+
+    def __contains__(self, unitid):
+        return unitid in self.positions
+
+    def __getitem__(self, unitid):
+        return DiffUnit(self, self.positions[unitid])
+
+    def __iter__(self):
+        return iter(self.unitids)
+
+    def __len__(self):
+        return len(self.unitids)
+
+    def add(self, unit):
+        """Adds the record of `unit`, or replaces it if the unitid is
+        already present.
+        """
+        position = self.positions.get(unit["unitid"])
+        if position is None:
+            self.positions[unit["unitid"]] = len(self.unitids)
+            self.unitids.append(unit["unitid"])
+            for k, column in self.columns.items():
+                column.append(unit[k])
+        else:
+            for k, column in self.columns.items():
+                column[position] = unit[k]
+
+    def get(self, unitid, default=None):
+        if unitid in self.positions:
+            return self[unitid]
+        return default
+
+    def items(self):
+        return [(unitid, DiffUnit(self, position))
+                for position, unitid in enumerate(self.unitids)]
+
+    def keys(self):
+        return list(self.unitids)
+
+    def values(self):
+        return [DiffUnit(self, position)
+                for position in xrange(len(self.unitids))]
+
+
 class UnitDiffProxy(UnitProxy):
     """Wraps File/DB Unit dicts used by StoreDiff for equality comparison"""
 
@@ -94,15 +266,43 @@ class DiffableStore(object):
         "source_f", "target_f", "developer_comment",
         "translator_comment", "locations", "context")
 
+    #: Fields kept for every DB unit along with its digest, the rest are
+    #: only materialized for units that are added
+    diff_fields = ("unitid", "state", "id", "index", "revision")
+
+    #: Fields kept for every file unit, along with the unit itself
+    file_diff_fields = ("unitid", "state")
+
     def __init__(self, target_store, source_store):
         self.target_store = target_store
         self.source_store = source_store
 
+    def get_unit_digest(self, unit, unit_class):
+        """Digest of the attributes that `unit_class` compares units on
+
+        Units with the same digest are equal, so only the units with
+        different digests need comparing.
+        """
+        proxy = unit_class(unit)
+        digest = sha1()
+        for k in unit_class.match_attrs:
+            value = getattr(proxy, k)
+            if isinstance(value, (int, long)):
+                value = u"i:%s" % value
+            else:
+                value = u"s:%s" % u"\x00".join(
+                    value.strings
+                    if isinstance(value, multistring)
+                    else [force_text(value)])
+            digest.update(force_bytes(u"%s:%s\x1f" % (len(value), value)))
+        return digest.digest()
+
     def get_db_units(self, unit_qs):
-        diff_units = OrderedDict()
+        diff_units = DiffUnits(self.diff_fields + ("digest", ))
         units = unit_qs.values(*self.unit_fields).order_by("index")
-        for unit in units:
-            diff_units[unit["unitid"]] = unit
+        for unit in units.iterator():
+            unit["digest"] = self.get_unit_digest(unit, self.db_unit_class)
+            diff_units.add(unit)
         return diff_units
 
     def get_file_unit(self, unit):
@@ -125,7 +325,7 @@ class DiffableStore(object):
             "translator_comment": unit.getnotes(origin="translator")}
 
     def get_file_units(self, units):
-        diff_units = OrderedDict()
+        diff_units = DiffUnits(self.file_diff_fields + ("digest", "unit"))
         for unit in units:
             if unit.isheader():
                 continue
@@ -137,9 +337,29 @@ class DiffableStore(object):
                     (unitid
                      if len(unitid) <= 20
                      else "%s..." % unitid[:17]))
-            diff_units[unit.getid()] = self.get_file_unit(unit)
+            file_unit = self.get_file_unit(unit)
+            file_unit["digest"] = self.get_unit_digest(
+                file_unit, self.file_unit_class)
+            file_unit["unit"] = unit
+            diff_units.add(file_unit)
         return diff_units
 
+    def get_source_units(self, unitids):
+        """Returns the full unit dictionaries for the source `unitids`"""
+        if not isinstance(self.source_store, models.Model):
+            return {
+                unitid: self.get_file_unit(self.source_units[unitid]["unit"])
+                for unitid in unitids}
+        chunks = 200
+        unit_ids = [self.source_units[unitid]["id"] for unitid in unitids]
+        source_units = {}
+        for i in xrange(0, len(unit_ids), chunks):
+            units = self.source_store.unit_set.filter(
+                id__in=unit_ids[i:i + chunks]).values(*self.unit_fields)
+            for unit in units.iterator():
+                source_units[unit["unitid"]] = unit
+        return source_units
+
     @cached_property
     def target_units(self):
         return self.get_db_units(self.target_store.unit_set)
@@ -187,6 +407,10 @@ class StoreDiff(object):
         return [unitid for unitid, unit in self.target_units.items()
                 if unit['state'] != OBSOLETE]
 
+    @cached_property
+    def active_target_unitids(self):
+        return set(self.active_target_units)
+
     @cached_property
     def diffable(self):
         return self.diff_class(self.target_store, self.source_store)
@@ -266,16 +490,14 @@ class StoreDiff(object):
 
     @cached_property
     def obsoleted_target_units(self):
-        return [unitid for unitid, unit in self.target_units.items()
-                if (unit['state'] == OBSOLETE
-                    and unit["revision"] > self.source_revision)]
+        return set(
+            unitid for unitid, unit in self.target_units.items()
+            if (unit['state'] == OBSOLETE
+                and unit["revision"] > self.source_revision))
 
     @cached_property
     def opcodes(self):
-        sm = difflib.SequenceMatcher(None,
-                                     self.active_target_units,
-                                     self.new_unit_list)
-        return sm.get_opcodes()
+        return get_opcodes(self.active_target_units, self.new_unit_list)
 
     @cached_property
     def updated_target_units(self):
@@ -296,13 +518,37 @@ class StoreDiff(object):
         return None
 
     def get_indexes_to_update(self):
+        """Returns the final indexes of the existing units that change.
+
+        Units after each insert point are shifted along, and units that are
+        moved take their new position.
+
+        :return: a dictionary of unit DB ids to their new indexes
+        """
         offset = 0
-        index_updates = []
+        starts = []
+        offsets = []
         for (insert_at_, uids_add_, next_index, delta) in self.insert_points:
             if delta > 0:
-                index_updates += [(next_index + offset, delta)]
                 offset += delta
-        return index_updates
+                if starts and starts[-1] == next_index:
+                    offsets[-1] = offset
+                else:
+                    starts.append(next_index)
+                    offsets.append(offset)
+        indexes = {}
+        for unitid, unit in self.target_units.items():
+            if unitid in self.moved_target_units:
+                index = self.moved_target_units[unitid]["index"]
+            else:
+                position = bisect.bisect_right(starts, unit["index"])
+                index = (
+                    unit["index"] + offsets[position - 1]
+                    if position
+                    else unit["index"])
+            if index != unit["index"]:
+                indexes[unit["id"]] = index
+        return indexes
 
     def get_units_to_add(self):
         offset = 0
@@ -316,18 +562,22 @@ class StoreDiff(object):
                 source_unit = self.source_units.get(uid)
                 if source_unit and uid not in self.target_units:
                     new_unit_index = insert_at + index + 1 + offset
-                    to_add += [(proxy(source_unit), new_unit_index)]
+                    to_add += [(uid, new_unit_index)]
             if delta > 0:
                 offset += delta
-        return to_add
+        source_units = self.diffable.get_source_units(
+            [uid_ for uid_, index_ in to_add])
+        return [(proxy(source_units[uid_]), index_)
+                for uid_, index_ in to_add]
 
     def get_units_to_obsolete(self):
         return [unit['id'] for unitid, unit in self.target_units.items()
                 if ((unitid not in self.source_units
                      or self.source_units[unitid]['state'] == OBSOLETE)
-                    and unitid in self.active_target_units)]
+                    and unitid in self.active_target_unitids)]
 
-    def get_units_to_update(self):
+    @cached_property
+    def moved_target_units(self):
         uid_index_map = {}
         offset = 0
 
@@ -340,6 +590,10 @@ class StoreDiff(object):
                         'index': new_unit_index}
             if delta > 0:
                 offset += delta
+        return uid_index_map
+
+    def get_units_to_update(self):
+        uid_index_map = dict(self.moved_target_units)
         update_ids = self.get_updated_sourceids()
         update_ids.update({x['dbid'] for x in uid_index_map.values()})
         return (update_ids, uid_index_map)
@@ -356,11 +610,8 @@ class StoreDiff(object):
                 set(self.target_units[uid]['id']
                     for uid in self.active_target_units[i1:i2]
                     if (uid in self.source_units
-                        and (
-                            self.diffable.target_unit_class(
-                                self.target_units[uid])
-                            != self.diffable.source_unit_class(
-                                self.source_units[uid])))))
+                        and (self.target_units[uid]["digest"]
+                             != self.source_units[uid]["digest"]))))
         return update_ids
 
     def has_changes(self, diff):
@@ -10,26 +10,40 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 
 from pootle.core.delegate import (
-    comparable_event, deserializers, frozen, grouped_events, lifecycle, review,
-    search_backend, serializers, states, uniqueid, versioned, wordcount)
+    comparable_event, crud, deserializers, frozen, grouped_events, lifecycle,
+    review, search_backend, serializers, states, uniqueid, versioned,
+    wordcount)
 from pootle.core.plugin import getter
 from pootle_config.delegate import (
     config_should_not_be_appended, config_should_not_be_set)
 from pootle_misc.util import import_func
+from pootle_statistics.models import Submission
 
-from .models import Store, Suggestion, SuggestionState, Unit
+from .models import (
+    Store, Suggestion, SuggestionState, Unit, UnitChange, UnitSource)
 from .unit.search import DBSearchBackend
 from .unit.timeline import (
     ComparableUnitTimelineLogEvent, UnitTimelineGroupedEvents, UnitTimelineLog)
 from .utils import (
-    FrozenUnit, SuggestionsReview, UnitLifecycle, UnitUniqueId,
-    UnitWordcount)
+    FrozenUnit, SubmissionCRUD, SuggestionsReview, UnitChangeCRUD, UnitCRUD,
+    UnitLifecycle, UnitSourceCRUD, UnitUniqueId, UnitWordcount)
 from .versioned import VersionedStore
 
 
 wordcounter = None
 suggestion_states = None
 
+CRUD = {
+    Submission: SubmissionCRUD(),
+    Unit: UnitCRUD(),
+    UnitChange: UnitChangeCRUD(),
+    UnitSource: UnitSourceCRUD()}
+
+
+@getter(crud, sender=(Submission, Unit, UnitChange, UnitSource))
+def data_crud_getter(**kwargs):
+    return CRUD[kwargs["sender"]]
+
 
 @getter(states, sender=Suggestion)
 def get_suggestion_states(**kwargs_):
@@ -14,7 +14,7 @@ from translate.filters.decorators import Category
 
 from django.contrib.auth import get_user_model
 from django.db import models
-from django.db.models import F
+from django.db.models import Case, F, IntegerField, Value, When
 from django.template.defaultfilters import truncatechars
 from django.urls import reverse
 from django.utils.encoding import force_bytes
@@ -331,7 +331,7 @@ class Unit(AbstractUnit):
                 self.change.reviewed_on = timestamp
             self.change.save()
         update_data.send(
-            self.store.__class__, instance=self.store)
+            self.store.__class__, instance=self.store, unit=self)
 
     def get_absolute_url(self):
         return self.store.get_absolute_url()
@@ -537,8 +537,10 @@ class Unit(AbstractUnit):
 
             return False
 
+        from pootle_checks.utils import check_results
+
         checker = self.store.translation_project.checker
-        qc_failures = checker.run_filters(self, categorised=True)
+        qc_failures = check_results.get_failures(checker, self)
         checks_to_add = []
         for name in qc_failures.iterkeys():
             if name in existing:
@@ -922,6 +924,22 @@ class Store(AbstractStore):
         Unit.objects.filter(store_id=self.id, index__gte=start).update(
             index=operator.add(F('index'), delta))
 
+    def reindex(self, indexes):
+        """Sets the indexes of units in bulk, writing each unit only once.
+
+        :param indexes: a dictionary of unit ids to their new indexes, as
+          returned by ``StoreDiff.get_indexes_to_update``.
+        """
+        chunks = 1000
+        unit_ids = sorted(indexes)
+        for i in xrange(0, len(unit_ids), chunks):
+            chunk = unit_ids[i:i + chunks]
+            Unit.objects.filter(store_id=self.id, id__in=chunk).update(
+                index=Case(
+                    *[When(id=unit_id, then=Value(indexes[unit_id]))
+                      for unit_id in chunk],
+                    output_field=IntegerField()))
+
     @cached_property
     def data_tool(self):
         return data_tool.get(self.__class__)(self)
@@ -967,6 +985,14 @@ class Store(AbstractStore):
         return StoreSerialization(self).serialize(
             include_obsolete=include_obsolete, raw=raw)
 
+    def serialize_to(self, out, include_obsolete=False, raw=False):
+        return StoreSerialization(self).serialize_to(
+            out, include_obsolete=include_obsolete, raw=raw)
+
+    def iterate_serialized(self, include_obsolete=False, raw=False):
+        return StoreSerialization(self).iterate_serialized(
+            include_obsolete=include_obsolete, raw=raw)
+
 # # # # # # # # # # # #  TranslationStore # # # # # # # # # # # # #
 
     suggestions_in_format = True
@@ -12,14 +12,35 @@ from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.utils.encoding import force_bytes
 
-from pootle.core.delegate import lifecycle, uniqueid
+from pootle.core.delegate import crud, lifecycle, uniqueid
 from pootle.core.models import Revision
-from pootle.core.signals import update_checks, update_data
+from pootle.core.signals import create, update_checks, update_data
+from pootle_statistics.models import Submission
 
 from .constants import FUZZY, TRANSLATED, UNTRANSLATED
 from .models import Suggestion, Unit, UnitChange, UnitSource
 
 
+@receiver(create, sender=Submission)
+def handle_submission_create(**kwargs):
+    crud.get(Submission).create(**kwargs)
+
+
+@receiver(create, sender=Unit)
+def handle_unit_create(**kwargs):
+    crud.get(Unit).create(**kwargs)
+
+
+@receiver(create, sender=UnitSource)
+def handle_unit_source_create(**kwargs):
+    crud.get(UnitSource).create(**kwargs)
+
+
+@receiver(create, sender=UnitChange)
+def handle_unit_change_create(**kwargs):
+    crud.get(UnitChange).create(**kwargs)
+
+
 @receiver(post_save, sender=Suggestion)
 def handle_suggestion_added(**kwargs):
     created = kwargs.get("created")
@@ -6,6 +6,10 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+from io import BytesIO
+
+from translate.storage import pypo
+
 from django.utils.functional import cached_property
 
 from pootle.core.delegate import config, serializers
@@ -46,15 +50,27 @@ class StoreSerialization(object):
             found_serializers.append(available_serializers[serializer])
         return found_serializers
 
-    def tostring(self, include_obsolete=False, raw=False):
-        store = self.store.syncer.convert(
-            include_obsolete=include_obsolete, raw=raw)
+    @property
+    def streamable(self):
+        """Stores can be streamed if they are serialized unit by unit, and
+        there are no serializers that need the whole of the output.
+        """
+        return (
+            not self.serializers
+            and issubclass(self.store.syncer.file_class, pypo.pofile))
+
+    def update_headers(self, store):
         if hasattr(store, "updateheader"):
             # FIXME We need those headers on import
             # However some formats just don't support setting metadata
             max_unit_revision = self.max_unit_revision or 0
             store.updateheader(add=True, X_Pootle_Path=self.pootle_path)
             store.updateheader(add=True, X_Pootle_Revision=max_unit_revision)
+
+    def tostring(self, include_obsolete=False, raw=False):
+        store = self.store.syncer.convert(
+            include_obsolete=include_obsolete, raw=raw)
+        self.update_headers(store)
         return str(store)
 
     def pipeline(self, data):
@@ -67,3 +83,33 @@ class StoreSerialization(object):
     def serialize(self, include_obsolete=False, raw=False):
         return self.pipeline(
             self.tostring(include_obsolete=include_obsolete, raw=raw))
+
+    def iterate_serialized(self, include_obsolete=False, raw=False):
+        """Yields the serialized store in chunks of bytes
+
+        Streamable stores are converted and yielded a chunk of units at a
+        time, otherwise the whole serialized store is yielded.
+        """
+        if not self.streamable:
+            yield self.serialize(include_obsolete=include_obsolete, raw=raw)
+            return
+        syncer = self.store.syncer
+        header = syncer.get_output()
+        self.update_headers(header)
+        yield self._serialize_chunk(header)
+        chunks = syncer.convert_chunks(
+            include_obsolete=include_obsolete, raw=raw)
+        for chunk in chunks:
+            yield b"\n" + self._serialize_chunk(chunk)
+
+    def _serialize_chunk(self, chunk):
+        out = BytesIO()
+        chunk.serialize(out)
+        return out.getvalue()
+
+    def serialize_to(self, out, include_obsolete=False, raw=False):
+        """Writes the serialized store to the file-like ``out``"""
+        serialized = self.iterate_serialized(
+            include_obsolete=include_obsolete, raw=raw)
+        for data in serialized:
+            out.write(data)
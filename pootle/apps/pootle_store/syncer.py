@@ -22,6 +22,10 @@ from .models import Unit
 logger = logging.getLogger(__name__)
 
 
+#: Number of units fetched and converted at a time when streaming a store
+CONVERT_CHUNK_SIZE = 1000
+
+
 class UnitSyncer(object):
 
     def __init__(self, unit, raw=False):
@@ -165,18 +169,51 @@ class StoreSyncer(object):
             u"[sync] Converting: %s to %s",
             self.store.pootle_path,
             fileclass)
-        output = fileclass()
-        output.settargetlanguage(self.language.code)
+        output = self.get_output(fileclass)
         # FIXME: we should add some headers
-        units = (
-            self.store.unit_set
-            if include_obsolete
-            else self.store.units)
-        for unit in units.iterator():
+        for unit in self.get_units(include_obsolete).iterator():
             output.addunit(
                 self.unit_sync_class(unit, raw=raw).convert(output.UnitClass))
         return output
 
+    def convert_chunks(self, fileclass=None, include_obsolete=False,
+                       raw=False, chunk_size=CONVERT_CHUNK_SIZE):
+        """export to fileclass, one chunk of units at a time
+
+        Yields a ``fileclass`` store, stripped of any headers, for each chunk
+        of units, so that large stores can be written out without holding all
+        of their units in memory.
+        """
+        fileclass = fileclass or self.file_class
+        for units in self.iter_unit_chunks(include_obsolete, chunk_size):
+            output = fileclass()
+            output.units = []
+            for unit in units:
+                output.addunit(
+                    self.unit_sync_class(
+                        unit, raw=raw).convert(output.UnitClass))
+            yield output
+
+    def get_output(self, fileclass=None):
+        output = (fileclass or self.file_class)()
+        output.settargetlanguage(self.language.code)
+        return output
+
+    def get_units(self, include_obsolete=False):
+        return (
+            self.store.unit_set
+            if include_obsolete
+            else self.store.units)
+
+    def iter_unit_chunks(self, include_obsolete=False,
+                         chunk_size=CONVERT_CHUNK_SIZE):
+        units = self.get_units(include_obsolete)
+        unit_ids = list(units.values_list("id", flat=True))
+        for i in range(0, len(unit_ids), chunk_size):
+            chunk = unit_ids[i:i + chunk_size]
+            found = units.in_bulk(chunk)
+            yield [found[pk] for pk in chunk if pk in found]
+
     def _getclass(self, obj):
         try:
             return getclass(obj)
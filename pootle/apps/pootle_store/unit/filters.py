@@ -8,6 +8,7 @@
 
 from django.db.models import Q
 
+from pootle.core.delegate import text_index
 from pootle_statistics.models import SubmissionTypes
 from pootle_store.constants import FUZZY, TRANSLATED, UNTRANSLATED
 
@@ -175,13 +176,21 @@ class UnitTextSearch(object):
             return [text]
         return [t.strip() for t in text.split(" ") if t.strip()]
 
+    @property
+    def text_index(self):
+        return text_index.get()
+
     def search(self, text, sfields, exact=False, case=False):
         result = self.qs.none()
         words = self.get_words(text, exact)
+        search_fields = self.get_search_fields(sfields)
 
-        for k in self.get_search_fields(sfields):
+        for k in search_fields:
             result |= self.search_field(k, words, exact=exact, case=case)
-        return result
+        if self.text_index is None:
+            return result
+        # narrow down the units to scan using the word index
+        return self.text_index.filter(result, words, search_fields)
 
     def search_field(self, k, words, exact=False, case=False):
         subresult = self.qs
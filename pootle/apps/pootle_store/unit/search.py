@@ -6,9 +6,16 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
-from django.db.models import Max
+from array import array
+from hashlib import md5
+
+from django.db.models import Max, Model, Q
+from django.utils.encoding import force_bytes
 from django.utils.functional import cached_property
 
+from pootle.core.cache import get_cache
+from pootle.core.delegate import revision
+from pootle_app.models import Directory
 from pootle_store.constants import SIMPLY_SORTED
 from pootle_store.models import Unit
 from pootle_store.unit.filters import UnitSearchFilter, UnitTextSearch
@@ -17,7 +24,11 @@ from pootle_store.unit.filters import UnitSearchFilter, UnitTextSearch
 class DBSearchBackend(object):
 
     default_chunk_size = None
-    default_order = "store__pootle_path", "index"
+    default_order = "store__pootle_path", "index", "pk"
+    #: kwargs that only affect which part of the results is returned
+    pagination_kwargs = "count", "offset", "previous_uids", "uids"
+    #: larger result sets are not cached, and paginated using unit keys
+    max_cached_uids = 100000
     select_related = (
         'store__translation_project__project',
         'store__translation_project__language')
@@ -84,6 +95,115 @@ class DBSearchBackend(object):
     def uids(self):
         return self.kwargs.get("uids", [])
 
+    @property
+    def keyset_paginated(self):
+        """Whether results can be paginated using the unit keys in
+        ``default_order``, ie the results are not custom sorted.
+        """
+        return not (self.unit_filter and self.sort_by is not None)
+
+    @property
+    def cache(self):
+        return get_cache("lru")
+
+    @property
+    def revision_path(self):
+        """Path of the directory whose stats revision changes when the
+        results might change.
+        """
+        if self.language_code and self.project_code:
+            return (
+                "/%s/%s/%s"
+                % (self.language_code,
+                   self.project_code,
+                   self.dir_path or ""))
+        elif self.language_code:
+            return "/%s/" % self.language_code
+        elif self.project_code:
+            return "/projects/%s/" % self.project_code
+        return "/projects/"
+
+    @cached_property
+    def stats_revision(self):
+        directory = Directory.objects.filter(
+            pootle_path=self.revision_path).first()
+        if directory is None:
+            return ""
+        return revision.get(Directory)(directory).get(key="stats")
+
+    @property
+    def search_kwargs(self):
+        search_kwargs = dict(
+            (k, v)
+            for k, v in self.kwargs.items()
+            if k not in self.pagination_kwargs)
+        search_kwargs["request_user"] = getattr(self.request_user, "pk", None)
+        return search_kwargs
+
+    @cached_property
+    def cache_key(self):
+        if not self.stats_revision:
+            return
+        search_kwargs = sorted(
+            (k, (v.pk if isinstance(v, Model) else v))
+            for k, v in self.search_kwargs.items())
+        return (
+            "pootle.search.units:%s:%s"
+            % (self.stats_revision,
+               md5(force_bytes(repr(search_kwargs))).hexdigest()))
+
+    @cached_property
+    def cached_uids(self):
+        """Ordered pks of the results as an array of ints, cached until the
+        stats revision changes, or ``None`` if there are too many results to
+        cache.
+        """
+        if self.cache_key is None:
+            return
+        cache_key = "%s:uids" % self.cache_key
+        uids = self.cache.get(cache_key)
+        if uids is None:
+            uids = array(
+                "I",
+                self.results.values_list(
+                    "pk", flat=True)[:self.max_cached_uids + 1])
+            if len(uids) > self.max_cached_uids:
+                # remember not to fetch them again
+                uids = False
+            self.cache.set(cache_key, uids)
+        return uids or None
+
+    @property
+    def total(self):
+        """Count of the results, cached until the stats revision changes."""
+        if self.cached_uids is not None:
+            return len(self.cached_uids)
+        cache_key = self.cache_key
+        if cache_key is None:
+            return self.results.count()
+        cache_key = "%s:total" % cache_key
+        total = self.cache.get(cache_key)
+        if total is None:
+            total = self.results.count()
+            self.cache.set(cache_key, total)
+        return total
+
+    def get_unit_key(self, uid):
+        return Unit.objects.filter(pk=uid).values_list(
+            "store__pootle_path", "index").first()
+
+    def filter_after(self, qs, uid, pootle_path, index):
+        return qs.filter(
+            Q(store__pootle_path__gt=pootle_path)
+            | Q(store__pootle_path=pootle_path, index__gt=index)
+            | Q(store__pootle_path=pootle_path, index=index, pk__gt=uid))
+
+    def filter_before(self, qs, uid, pootle_path, index):
+        return qs.filter(
+            Q(store__pootle_path__lt=pootle_path)
+            | Q(store__pootle_path=pootle_path, index__lt=index)
+            | Q(store__pootle_path=pootle_path, index=index, pk__lt=uid))
+
     @property
     def units_qs(self):
         return (
@@ -106,7 +226,7 @@ class DBSearchBackend(object):
                 # use `distinct()` and `order_by()` at the same time
                 qs = qs.annotate(sort_by_field=Max(max_field))
             return qs.order_by(
-                sort_by, "store__pootle_path", "index")
+                sort_by, "store__pootle_path", "index", "pk")
         return qs
 
     def filter_qs(self, qs):
@@ -144,8 +264,67 @@ class DBSearchBackend(object):
     def results(self):
         return self.sort_qs(self.filter_qs(self.units_qs))
 
+    def get_next_slice(self, total):
+        """Returns the chunk following ``previous_uids``, starting after the
+        key of the last of them, even if it is no longer in the results.
+        """
+        last_key = self.get_unit_key(self.previous_uids[-1])
+        if last_key is None:
+            return
+        # units that have left the results shift the start position
+        start = (
+            max(self.offset - len(self.previous_uids), 0)
+            + self.results.filter(pk__in=self.previous_uids).count())
+        end = min(start + (2 * self.chunk_size), total)
+        uid_list = list(
+            self.filter_after(
+                self.results, self.previous_uids[-1], *last_key)
+            .values_list("pk", flat=True)[:2 * self.chunk_size])
+        return total, start, end, uid_list
+
+    def get_unit_position(self, uid):
+        """Returns the position of unit ``uid`` in the results, or
+        ``None`` if it is not in them.
+        """
+        if self.keyset_paginated:
+            unit_key = self.get_unit_key(uid)
+            if unit_key is None or not self.results.filter(pk=uid).exists():
+                return
+            return self.filter_before(self.results, uid, *unit_key).count()
+        uid_list = list(self.results.values_list("pk", flat=True))
+        if uid in uid_list:
+            return uid_list.index(uid)
+
+    def search_cached(self, uids):
+        """Returns the requested chunk as a slice of the cached ``uids``."""
+        total = len(uids)
+        start = self.offset or 0
+        if start > (total + len(self.previous_uids)):
+            return total, total, total, self.results.none()
+        find_unit = (
+            self.language_code
+            and self.project_code
+            and self.filename
+            and self.uids)
+        if self.chunk_size is None:
+            return total, 0, total, self.results
+        if find_unit:
+            if self.uids[0] in uids:
+                start = (
+                    int(uids.index(self.uids[0]) / (2 * self.chunk_size))
+                    * (2 * self.chunk_size))
+        elif self.previous_uids and self.offset:
+            # units that have left the results shift the start position
+            start = (
+                max(self.offset - len(self.previous_uids), 0)
+                + len(set(self.previous_uids).intersection(uids)))
+        end = min(start + (2 * self.chunk_size), total)
+        return total, start, end, uids[start:end].tolist()
+
     def search(self):
-        total = self.results.count()
+        if self.cached_uids is not None:
+            return self.search_cached(self.cached_uids)
+        total = self.total
         start = self.offset
 
         if start > (total + len(self.previous_uids)):
@@ -160,6 +339,10 @@ class DBSearchBackend(object):
             self.previous_uids
             and self.offset)
 
+        if not find_unit and find_next_slice and self.keyset_paginated:
+            next_slice = self.get_next_slice(total)
+            if next_slice is not None:
+                return next_slice
         if not find_unit and find_next_slice:
             # if both previous_uids and offset are set then try to ensure
             # that the results we are returning start from the end of previous
@@ -179,11 +362,10 @@ class DBSearchBackend(object):
                 start,
                 end,
                 uid_list[offset:offset + (2 * self.chunk_size)])
-        if find_unit:
+        if find_unit and self.chunk_size:
             # find the uid in the Store
-            uid_list = list(self.results.values_list("pk", flat=True))
-            if self.chunk_size and self.uids[0] in uid_list:
-                unit_index = uid_list.index(self.uids[0])
+            unit_index = self.get_unit_position(self.uids[0])
+            if unit_index is not None:
                 start = (
                     int(unit_index / (2 * self.chunk_size))
                     * (2 * self.chunk_size))
@@ -13,11 +13,13 @@ from django.utils.functional import cached_property
 
 from pootle.core.delegate import frozen, review, versioned
 from pootle.core.models import Revision
+from pootle.core.signals import create, update_checks, update_data
+from pootle_statistics.models import SubmissionTypes
 from pootle_store.contextmanagers import update_store_after
 
 from .constants import OBSOLETE, PARSED, POOTLE_WINS
 from .diff import StoreDiff
-from .models import Suggestion
+from .models import Suggestion, Unit, UnitChange, UnitSource
 from .util import get_change_str
 
 
@@ -404,18 +406,14 @@ class StoreUpdater(object):
 
         if allow_add_and_obsolete:
             # Update indexes
-            for start, delta in to_change["index"]:
-                self.target_store.update_index(start=start, delta=delta)
+            self.target_store.reindex(to_change["index"])
 
             # Add new units
-            for unit, new_unit_index in to_change["add"]:
-                self.target_store.addunit(
-                    unit,
-                    new_unit_index,
-                    user=user,
-                    changed_with=submission_type,
-                    update_revision=update_revision)
-            changes["added"] = len(to_change["add"])
+            changes["added"] = self.add_units(
+                to_change["add"],
+                user=user,
+                changed_with=submission_type,
+                update_revision=update_revision)
 
             # Obsolete units
             changes["obsoleted"] = self.mark_units_obsolete(
@@ -427,6 +425,63 @@ class StoreUpdater(object):
             update.store_revision, update.update_revision)
         return changes
 
+    def add_units(self, to_add, user, changed_with=None,
+                  update_revision=None):
+        """Adds new units to the target store in bulk.
+
+        The units, and their `UnitSource`/`UnitChange` objects, are created
+        with a `create` signal each, rather than saving them one at a time.
+
+        :param to_add: list of `(unit, index)` tuples for the ttk units to add
+        :return: number of units added
+        """
+        if not to_add:
+            return 0
+        changed_with = changed_with or SubmissionTypes.SYSTEM
+        units = []
+        for unit, index in to_add:
+            newunit = self.target_store.UnitClass(
+                store=self.target_store,
+                index=index)
+            newunit.update(unit, user=user)
+            newunit.revision = update_revision
+            units.append(newunit)
+        create.send(Unit, objects=units)
+        create.send(
+            UnitSource,
+            objects=[
+                UnitSource(
+                    unit=unit,
+                    created_by=user,
+                    created_with=changed_with)
+                for unit in units])
+        changed = [unit for unit in units if unit.updated]
+        if changed:
+            create.send(
+                UnitChange,
+                objects=[
+                    self.new_unit_change(unit, user, changed_with)
+                    for unit in changed])
+        for unit in changed:
+            update_checks.send(unit.__class__, instance=unit)
+            if unit.istranslated():
+                unit.update_tmserver()
+        update_data.send(
+            self.target_store.__class__,
+            instance=self.target_store)
+        return len(units)
+
+    def new_unit_change(self, unit, user, changed_with):
+        change = UnitChange(
+            unit=unit,
+            changed_with=changed_with,
+            submitted_by=user,
+            submitted_on=unit.creation_time)
+        if unit.comment_updated:
+            change.commented_by = user
+            change.commented_on = unit.creation_time
+        return change
+
     def update_units(self, update):
         update_count = 0
         suggestion_count = 0
@@ -14,7 +14,10 @@ from . import views
 get_units_urlpatterns = [
     url(r'^xhr/units/?$',
         views.get_units,
-        name='pootle-xhr-units')]
+        name='pootle-xhr-units'),
+    url(r'^xhr/units/tm/?$',
+        views.get_units_tm,
+        name='pootle-xhr-units-tm')]
 
 unit_xhr_urlpatterns = [
 
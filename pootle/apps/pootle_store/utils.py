@@ -6,28 +6,53 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import os
 from collections import OrderedDict
+from hashlib import sha1
+from io import BytesIO
+
+from rq.exceptions import NoSuchJobError
+from rq.job import Job
+
+from translate.storage.factory import getclass
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import router
+from django.db.models.signals import pre_save
 from django.template import loader
 from django.utils import timezone
+from django.utils.encoding import force_bytes
 from django.utils.functional import cached_property
+from django_rq.queues import get_queue
 
+from pootle.core.bulk import BulkCRUD
+from pootle.core.cache import get_cache
 from pootle.core.delegate import site, states, unitid
 from pootle.core.mail import send_mail
-from pootle.core.signals import update_data, update_scores
+from pootle.core.signals import create, update_data, update_scores
+from pootle.core.utils.db import useable_connection
+from pootle.core.utils.ptempfile import mkstemp
 from pootle.core.utils.timezone import datetime_min, localdate, make_aware
 from pootle.i18n.gettext import ugettext as _
 from pootle_statistics.models import (
-    MUTED, UNMUTED, SubmissionFields, SubmissionTypes)
+    MUTED, UNMUTED, Submission, SubmissionFields, SubmissionTypes)
 
 from .constants import TRANSLATED
-from .models import Suggestion
+from .models import Store, Suggestion, Unit, UnitChange, UnitSource
 
 
 User = get_user_model()
 
+#: Seconds the results of store update jobs are kept for
+STORE_UPDATE_RESULT_TTL = 86400
+
+#: Seconds a store update job can run for before it is failed
+STORE_UPDATE_JOB_TIMEOUT = 1800
+
+#: Seconds the digest of the file last imported into a store is kept for
+STORE_IMPORT_DIGEST_TIMEOUT = 7 * 86400
+
 
 class UnitWordcount(object):
 
@@ -132,6 +157,65 @@ class FrozenUnit(object):
         return self.unit["translator_comment"]
 
 
+class PreSaveCRUD(BulkCRUD):
+    """As `bulk_create` does not send model signals, this runs the `pre_save`
+    handlers for each object before creating them.
+    """
+
+    def pre_create(self, instance=None, objects=None):
+        if objects is None:
+            return
+        using = router.db_for_write(self.model)
+        for obj in objects:
+            pre_save.send(
+                obj.__class__,
+                instance=obj,
+                raw=False,
+                using=using,
+                update_fields=None)
+
+
+class UnitCRUD(PreSaveCRUD):
+
+    model = Unit
+
+    def post_create(self, instance=None, objects=None, pre=None, result=None):
+        if objects is None:
+            return
+        # not all db backends return ids from bulk inserts, so fetch them
+        # using the units' unique (store, unitid_hash)
+        missing = [unit for unit in objects if unit.pk is None]
+        if missing:
+            ids = {
+                (store_id, unitid_hash): pk
+                for store_id, unitid_hash, pk
+                in self.qs.filter(
+                    store_id__in=set(unit.store_id for unit in missing),
+                    unitid_hash__in=set(
+                        unit.unitid_hash for unit in missing)).values_list(
+                            "store_id", "unitid_hash", "pk")}
+            for unit in missing:
+                unit.pk = ids[(unit.store_id, unit.unitid_hash)]
+        for unit in objects:
+            unit._state.adding = False
+            unit._state.db = self.qs.db
+
+
+class UnitSourceCRUD(PreSaveCRUD):
+
+    model = UnitSource
+
+
+class UnitChangeCRUD(BulkCRUD):
+
+    model = UnitChange
+
+
+class SubmissionCRUD(BulkCRUD):
+
+    model = Submission
+
+
 class SuggestionsReview(object):
     accept_email_template = 'editor/email/suggestions_accepted_with_comment.txt'
     accept_email_subject = _(u"Suggestion accepted with comment")
@@ -347,7 +431,7 @@ class UnitLifecycle(object):
         subs = list(subs)
         if not subs:
             return
-        self.unit.submission_set.bulk_create(subs)
+        create.send(Submission, objects=subs)
         update_scores.send(
             self.unit.store.__class__,
             instance=self.unit.store,
@@ -438,3 +522,129 @@ class UnitLifecycle(object):
 
     def change(self, **kwargs):
         self.update(self.calculate_change(**kwargs))
+
+
+class StoreImportDigest(object):
+    """Digest of the file last imported into a Store
+
+    The digest is kept in the cache along with the Store's revision after
+    the import, so importing the same file with the same options into an
+    unchanged Store can be skipped without parsing and diffing the file.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    @cached_property
+    def cache(self):
+        return get_cache("redis")
+
+    @property
+    def cache_key(self):
+        return "pootle:store.import_digest:%s" % self.store.pk
+
+    @property
+    def revision(self):
+        return self.store.get_max_unit_revision()
+
+    def get_digest(self, contents, **kwargs):
+        digest = sha1(force_bytes(contents))
+        for k, v in sorted(kwargs.items()):
+            digest.update(force_bytes("\n%s=%r" % (k, v)))
+        return digest.hexdigest()
+
+    def matches(self, digest):
+        return self.cache.get(self.cache_key) == (digest, self.revision)
+
+    def set(self, digest):
+        self.cache.set(
+            self.cache_key,
+            (digest, self.revision),
+            timeout=STORE_IMPORT_DIGEST_TIMEOUT)
+
+
+def import_store_file(store, contents, filename, user=None, **kwargs):
+    """Updates `store` from the `contents` of a translation file, unless the
+    same file was the last imported into the Store and it hasn't changed
+    since.
+
+    The `contents` are only parsed once their digest has been checked.
+
+    :return: a tuple of the update revision and the changes made.
+    """
+    import_digest = StoreImportDigest(store)
+    digest = import_digest.get_digest(contents, **kwargs)
+    if import_digest.matches(digest):
+        return None, {}
+    f = BytesIO(contents)
+    f.name = filename
+    file_store = getclass(f)(f.read())
+    result = store.update(file_store, user=user, **kwargs)
+    import_digest.set(digest)
+    return result
+
+
+def update_store_job(store_pk, path, filename, user_pk=None, **kwargs):
+    """Wraps updating a store from the translation file saved at `path` to
+    allow it to be run as RQ job. The file is removed once it has been read.
+
+    :return: a dict with the update `revision` and the `changes` made.
+    """
+    try:
+        with open(path, "rb") as f:
+            contents = f.read()
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    with useable_connection():
+        store = Store.objects.get(pk=store_pk)
+        user = (
+            User.objects.get(pk=user_pk)
+            if user_pk is not None
+            else None)
+        revision, changes = import_store_file(
+            store, contents, filename, user=user, **kwargs)
+    return dict(revision=revision, changes=changes)
+
+
+def enqueue_store_update(store, contents, filename, user=None, **kwargs):
+    """Queues updating `store` from the `contents` of a translation file.
+
+    The `contents` are saved to a temporary file, which is parsed by the job
+    rather than while queueing it.
+
+    :return: the id of the RQ job, to retrieve its status with
+        `get_store_update_job`.
+    """
+    fd, path = mkstemp(
+        prefix="pootle-upload-", suffix=os.path.splitext(filename)[1])
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(contents)
+        job = get_queue("default").enqueue(
+            update_store_job,
+            store.pk,
+            path,
+            filename,
+            user_pk=user and user.pk,
+            timeout=STORE_UPDATE_JOB_TIMEOUT,
+            result_ttl=STORE_UPDATE_RESULT_TTL,
+            **kwargs)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return job.id
+
+
+def get_store_update_job(job_id):
+    """Returns the RQ job updating a store, or `None` if there is no such
+    job.
+    """
+    try:
+        job = Job.fetch(job_id, connection=get_queue("default").connection)
+    except NoSuchJobError:
+        return None
+    if job.func_name != "%s.%s" % (__name__, update_store_job.__name__):
+        return None
+    return job
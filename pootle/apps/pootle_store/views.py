@@ -42,7 +42,7 @@ from .decorators import get_unit_context
 from .forms import (
     AddSuggestionForm, SubmitForm, SuggestionReviewForm, SuggestionSubmitForm,
     UnitSearchForm, unit_comment_form_factory, unit_form_factory)
-from .models import Suggestion, Unit
+from .models import Suggestion, Unit, get_tm_broker
 from .templatetags.store_tags import pluralize_source, pluralize_target
 from .unit.results import GroupedResults
 from .unit.timeline import Timeline
@@ -157,6 +157,21 @@ def _get_critical_checks_snippet(request, unit):
     return template.render(context=ctx, request=request)
 
 
+def _get_unit_search_kwargs(request):
+    search_form = UnitSearchForm(request.GET, user=request.user)
+
+    if not search_form.is_valid():
+        errors = search_form.errors.as_data()
+        if "path" in errors:
+            for error in errors["path"]:
+                if error.code == "max_length":
+                    raise Http400(_('Path too long.'))
+                elif error.code == "required":
+                    raise Http400(_('Arguments missing.'))
+        raise Http404(forms.ValidationError(search_form.errors).messages)
+    return search_form.cleaned_data
+
+
 @ajax_required
 def get_units(request, **kwargs_):
     """Gets source and target texts and its metadata.
@@ -170,20 +185,8 @@ def get_units(request, **kwargs_):
         When the `initial` GET parameter is present, a sorted list of
         the result set ids will be returned too.
     """
-    search_form = UnitSearchForm(request.GET, user=request.user)
-
-    if not search_form.is_valid():
-        errors = search_form.errors.as_data()
-        if "path" in errors:
-            for error in errors["path"]:
-                if error.code == "max_length":
-                    raise Http400(_('Path too long.'))
-                elif error.code == "required":
-                    raise Http400(_('Arguments missing.'))
-        raise Http404(forms.ValidationError(search_form.errors).messages)
-
     total, start, end, units_qs = search_backend.get(Unit)(
-        request.user, **search_form.cleaned_data).search()
+        request.user, **_get_unit_search_kwargs(request)).search()
     return JsonResponse(
         {'start': start,
          'end': end,
@@ -191,6 +194,22 @@ def get_units(request, **kwargs_):
          'unitGroups': GroupedResults(units_qs).data})
 
 
+@ajax_required
+def get_units_tm(request, **kwargs_):
+    """Gets TM suggestions for a chunk of units.
+
+    :return: A JSON-encoded string containing the TM suggestions keyed by
+        unit id, for the units `get_units` returns with the same GET
+        parameters.
+    """
+    units_qs = search_backend.get(Unit)(
+        request.user, **_get_unit_search_kwargs(request)).search()[3]
+    units = Unit.objects.filter(pk__in=list(units_qs)).select_related(
+        "store__translation_project__language")
+    return JsonResponse(
+        {'tm_suggestions': get_tm_broker().search_many(units)})
+
+
 @ajax_required
 @get_unit_context('view')
 def get_more_context(request, unit, **kwargs_):
@@ -536,7 +555,10 @@ class UnitEditJSON(PootleUnitJSON):
     def get_response_data(self, context):
         return {
             'editor': self.render_edit_template(context),
-            'tm_suggestions': self.object.get_tm_suggestions(),
+            'tm_suggestions': (
+                self.object.get_tm_suggestions()
+                if self.request.GET.get("tm") != "0"
+                else None),
             'is_obsolete': self.object.isobsolete(),
             'sources': self.get_sources()}
 
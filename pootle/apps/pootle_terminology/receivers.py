@@ -10,6 +10,7 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 from pootle.core.delegate import terminology
+from pootle.core.signals import create
 from pootle_statistics.models import Submission, SubmissionFields
 from pootle_store.constants import TRANSLATED
 from pootle_store.models import Unit
@@ -46,3 +47,17 @@ def handle_submission_save(**kwargs):
     if not is_terminology:
         return
     terminology.get(Unit)(unit).stem()
+
+
+@receiver(create, sender=Unit)
+def handle_unit_create(**kwargs):
+    for unit in kwargs.get("objects") or []:
+        if unit.state != TRANSLATED:
+            continue
+        is_terminology = (
+            unit.store.name.startswith("pootle-terminology")
+            or (unit.store.translation_project.project.code
+                == "terminology"))
+        if not is_terminology:
+            continue
+        terminology.get(Unit)(unit).stem()
@@ -8,13 +8,15 @@
 
 from stemming.porter2 import stem
 
-from pootle.core.delegate import stemmer, stopwords, text_comparison
+from pootle.core.delegate import (
+    stemmer, stopwords, text_comparison, text_index)
 from pootle.core.plugin import getter
 
-from .utils import Stopwords, TextComparison
+from .utils import Stopwords, TextComparison, UnitTextIndex
 
 
 site_stopwords = Stopwords()
+site_text_index = UnitTextIndex()
 
 
 @getter(stemmer)
@@ -30,3 +32,8 @@ def get_stopwords(**kwargs_):
 @getter(text_comparison)
 def get_text_comparison(**kwargs_):
     return TextComparison
+
+
+@getter(text_index)
+def get_text_index(**kwargs_):
+    return site_text_index
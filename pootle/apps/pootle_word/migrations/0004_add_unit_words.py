@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from pootle.core.utils.db import set_mysql_collation_for_column
+
+
+def make_word_text_cs(apps, schema_editor):
+    cursor = schema_editor.connection.cursor()
+    set_mysql_collation_for_column(
+        apps,
+        cursor,
+        "pootle_word.Word",
+        "text",
+        "utf8_bin",
+        "varchar(255)")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pootle_word', '0003_add_word_stems'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Word',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.CharField(max_length=255, unique=True)),
+            ],
+            options={
+                'db_table': 'pootle_word_word',
+            },
+        ),
+        migrations.CreateModel(
+            name='UnitWord',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=32)),
+                ('unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_words', to='pootle_store.Unit')),
+                ('word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pootle_word.Word')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='unitword',
+            unique_together=set([('unit', 'field', 'word')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='unitword',
+            index_together=set([('word', 'field')]),
+        ),
+        migrations.RunPython(make_word_text_cs),
+    ]
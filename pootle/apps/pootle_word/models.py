@@ -37,3 +37,29 @@ class Stem(AbstractStem):
             "\"%s\", units: %s"
             % (self.root,
                list(self.units.values_list("id", flat=True))))
+
+
+class Word(models.Model):
+
+    text = models.CharField(
+        max_length=255,
+        unique=True,
+        null=False,
+        blank=False)
+
+    class Meta(object):
+        db_table = "pootle_word_word"
+
+    def __unicode__(self):
+        return self.text
+
+
+class UnitWord(models.Model):
+
+    class Meta(object):
+        unique_together = ["unit", "field", "word"]
+        index_together = [["word", "field"]]
+
+    unit = models.ForeignKey(Unit, related_name="search_words")
+    word = models.ForeignKey("Word")
+    field = models.CharField(max_length=32)
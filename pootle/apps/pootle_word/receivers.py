@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from pootle.core.delegate import text_index
+from pootle.core.signals import create
+from pootle_store.models import Unit
+
+
+@receiver(post_save, sender=Unit)
+def handle_unit_save(**kwargs):
+    text_index.get().index_units(
+        [kwargs["instance"]],
+        created=kwargs.get("created", False))
+
+
+@receiver(create, sender=Unit)
+def handle_unit_create(**kwargs):
+    if kwargs.get("objects"):
+        text_index.get().index_units(
+            kwargs["objects"],
+            created=True)
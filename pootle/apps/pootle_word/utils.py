@@ -8,13 +8,18 @@
 
 import os
 import re
+import unicodedata
 
 import Levenshtein
 import translate
 
+from django.db import IntegrityError, transaction
+from django.utils.encoding import force_text
 from django.utils.functional import cached_property
 
-from pootle.core.delegate import stemmer, stopwords
+from pootle.core.delegate import config, stemmer, stopwords
+
+from .models import UnitWord, Word
 
 
 class Stopwords(object):
@@ -107,3 +112,151 @@ class TextComparison(TextStemmer):
              + self.tokens_present(other)
              + self.stems_present(other))
             / 4)
+
+
+class UnitTextIndex(object):
+    """Index of the words found in the searchable text fields of units.
+
+    Words are case and accent folded, and indexed by each of their suffixes,
+    so any unit containing a search text in one of its fields necessarily
+    has, for each word of the search text, an indexed word starting with it.
+    The index can therefore be used to narrow down the units that a text
+    search needs to scan, with prefix lookups on the indexed words.
+    """
+
+    config_key = "pootle.search.text_index"
+    fields = (
+        "source_f", "target_f", "locations",
+        "translator_comment", "developer_comment")
+    batch_size = 500
+    #: Shorter search words are not used to narrow down searches, and
+    #: shorter suffixes are not indexed
+    min_length = 3
+    #: Suffixes are truncated to this length, so longer search words are not
+    #: used to narrow down searches
+    max_length = 64
+    word_re = re.compile(u"\\w+", re.U)
+
+    @property
+    def is_ready(self):
+        """The index is only used once it has been fully built."""
+        return bool(config.get(key=self.config_key))
+
+    def set_ready(self, ready=True):
+        config.get().set_config(self.config_key, ready)
+
+    def fold(self, text):
+        text = unicodedata.normalize("NFKD", force_text(text or u"").lower())
+        return u"".join(
+            c for c in text
+            if not unicodedata.combining(c))
+
+    def get_words(self, text):
+        words = set()
+        for word in self.word_re.findall(self.fold(text)):
+            for start in range(len(word) - self.min_length + 1):
+                words.add(word[start:start + self.max_length])
+        return words
+
+    def get_search_words(self, words):
+        search_words = set()
+        for word in words:
+            search_words.update(
+                w for w in self.word_re.findall(self.fold(word))
+                if self.min_length <= len(w) <= self.max_length)
+        return search_words
+
+    def get_unit_words(self, unit):
+        return set(
+            (field, word)
+            for field in self.fields
+            for word in self.get_words(getattr(unit, field)))
+
+    def chunked(self, items):
+        items = list(items)
+        for i in range(0, len(items), self.batch_size):
+            yield items[i:i + self.batch_size]
+
+    def get_word_ids(self, words):
+        word_ids = {}
+        for chunk in self.chunked(words):
+            word_ids.update(
+                Word.objects.filter(text__in=chunk)
+                            .values_list("text", "id"))
+        missing = set(words) - set(word_ids)
+        if not missing:
+            return word_ids
+        try:
+            with transaction.atomic():
+                Word.objects.bulk_create(
+                    [Word(text=word) for word in missing],
+                    batch_size=self.batch_size)
+        except IntegrityError:
+            # some of the words were added concurrently
+            for word in missing:
+                Word.objects.get_or_create(text=word)
+        for chunk in self.chunked(missing):
+            word_ids.update(
+                Word.objects.filter(text__in=chunk)
+                            .values_list("text", "id"))
+        return word_ids
+
+    def get_indexed_words(self, unit_ids):
+        indexed = {}
+        for chunk in self.chunked(unit_ids):
+            indexed_words = UnitWord.objects.filter(
+                unit_id__in=chunk).values_list("unit_id", "field", "word__text")
+            for unit_id, field, word in indexed_words:
+                indexed.setdefault(unit_id, set()).add((field, word))
+        return indexed
+
+    def index_units(self, units, created=False):
+        """(Re)indexes the text of ``units``, only rewriting the entries of
+        units whose words have changed.
+
+        :return: number of units (re)indexed
+        """
+        unit_words = dict(
+            (unit.id, self.get_unit_words(unit))
+            for unit in units)
+        indexed = (
+            {}
+            if created
+            else self.get_indexed_words(unit_words.keys()))
+        changed = dict(
+            (unit_id, words)
+            for unit_id, words in unit_words.items()
+            if words != indexed.get(unit_id, set()))
+        if not changed:
+            return 0
+        word_ids = self.get_word_ids(
+            set(word
+                for words in changed.values()
+                for field_, word in words))
+        to_delete = [
+            unit_id for unit_id in changed
+            if unit_id in indexed]
+        for chunk in self.chunked(to_delete):
+            UnitWord.objects.filter(unit_id__in=chunk).delete()
+        UnitWord.objects.bulk_create(
+            [UnitWord(unit_id=unit_id, field=field, word_id=word_ids[word])
+             for unit_id, words in changed.items()
+             for field, word in words],
+            batch_size=self.batch_size)
+        return len(changed)
+
+    def filter(self, qs, words, fields):
+        """Narrows ``qs`` to the units with indexed words starting with each
+        of ``words`` in any of ``fields``.
+        """
+        search_words = self.get_search_words(words)
+        if not (search_words and self.is_ready):
+            return qs
+        fields = [field for field in fields if field in self.fields]
+        for word in search_words:
+            qs = qs.filter(
+                id__in=UnitWord.objects.filter(
+                    field__in=fields,
+                    word__in=Word.objects.filter(text__startswith=word))
+                .values("unit_id"))
+        return qs
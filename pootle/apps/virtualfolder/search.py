@@ -16,6 +16,12 @@ class VFolderDBSearchBackend(DBSearchBackend):
         self.vfolder = kwargs.pop("vfolder")
         super(VFolderDBSearchBackend, self).__init__(request_user, **kwargs)
 
+    @property
+    def search_kwargs(self):
+        search_kwargs = super(VFolderDBSearchBackend, self).search_kwargs
+        search_kwargs["vfolder"] = self.vfolder.pk
+        return search_kwargs
+
     def filter_qs(self, qs):
         filtered = super(VFolderDBSearchBackend, self).filter_qs(qs)
         return filtered.filter(store__vfolders=self.vfolder)
@@ -294,7 +294,12 @@ def check_settings(app_configs=None, **kwargs):
                     id="pootle.C010",
                 ))
 
-            if 'HOST' not in settings.POOTLE_TM_SERVER[server]:
+            # The local TM index is stored on disk, it has no server.
+            is_server = (
+                settings.POOTLE_TM_SERVER[server].get('ENGINE')
+                != 'pootle.core.search.backends.LocalTMBackend')
+
+            if is_server and 'HOST' not in settings.POOTLE_TM_SERVER[server]:
                 errors.append(checks.Critical(
                     _("POOTLE_TM_SERVER['%s'] has no HOST.", server),
                     hint=_("Set a HOST for POOTLE_TM_SERVER['%s'].",
@@ -302,7 +307,7 @@ def check_settings(app_configs=None, **kwargs):
                     id="pootle.C011",
                 ))
 
-            if 'PORT' not in settings.POOTLE_TM_SERVER[server]:
+            if is_server and 'PORT' not in settings.POOTLE_TM_SERVER[server]:
                 errors.append(checks.Critical(
                     _("POOTLE_TM_SERVER['%s'] has no PORT.", server),
                     hint=_("Set a PORT for POOTLE_TM_SERVER['%s'].",
@@ -8,6 +8,8 @@
 
 import logging
 
+from django.db import connections, router
+
 from bulk_update.helper import bulk_update
 
 
@@ -17,6 +19,7 @@ logger = logging.getLogger(__name__)
 class BulkCRUD(object):
 
     model = None
+    batch_size = 1000
 
     def __repr__(self):
         return (
@@ -47,6 +50,17 @@ class BulkCRUD(object):
                     values=None):
         pass
 
+    def get_batch_size(self, objects):
+        """Number of `objects` created per query, within the backend's
+        limit on query parameters.
+        """
+        ops = connections[router.db_for_write(self.model)].ops
+        return max(
+            min(self.batch_size,
+                ops.bulk_batch_size(
+                    self.model._meta.concrete_fields, objects)),
+            1)
+
     def bulk_update(self, objects, fields=None):
         bulk_update(
             objects,
@@ -58,9 +72,10 @@ class BulkCRUD(object):
             result = kwargs["instance"].save()
             self.post_create(instance=kwargs["instance"], pre=pre, result=result)
         if "objects" in kwargs:
-            pre = self.pre_delete(objects=kwargs["objects"])
+            pre = self.pre_create(objects=kwargs["objects"])
             result = self.model.objects.bulk_create(
-                kwargs["objects"])
+                kwargs["objects"],
+                batch_size=self.get_batch_size(kwargs["objects"]))
             logger.debug(
                 "[crud] Created (%s): %s",
                 len(result),
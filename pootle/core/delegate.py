@@ -54,6 +54,7 @@ site = Getter()
 states = Getter()
 stopwords = Getter()
 text_comparison = Getter()
+text_index = Getter()
 panels = Provider()
 
 serializers = Provider(providing_args=["instance"])
@@ -10,8 +10,6 @@ from __future__ import absolute_import
 
 import logging
 
-import Levenshtein
-
 try:
     from elasticsearch import Elasticsearch
     from elasticsearch.exceptions import ElasticsearchException
@@ -19,6 +17,7 @@ except ImportError:
     Elasticsearch = None
 
 from ..base import SearchBackend
+from .utils import DEFAULT_MIN_SIMILARITY, get_min_similarity, get_similarity
 
 
 __all__ = ('ElasticSearchBackend',)
@@ -27,9 +26,6 @@ __all__ = ('ElasticSearchBackend',)
 logger = logging.getLogger(__name__)
 
 
-DEFAULT_MIN_SIMILARITY = 0.7
-
-
 def filter_hits_by_distance(hits, source_text,
                             min_similarity=DEFAULT_MIN_SIMILARITY):
     """Returns ES `hits` filtered according to their Levenshtein distance
@@ -39,20 +35,16 @@ def filter_hits_by_distance(hits, source_text,
     discarded. It's assumed that `hits` is already sorted from higher to lower
     score.
     """
-    if min_similarity <= 0 or min_similarity >= 1:
-        min_similarity = DEFAULT_MIN_SIMILARITY
+    min_similarity = get_min_similarity(min_similarity)
 
     filtered_hits = []
     for hit in hits:
         hit_source_text = hit['_source']['source']
-        distance = Levenshtein.distance(source_text, hit_source_text)
-        similarity = (
-            1 - distance / float(max(len(source_text), len(hit_source_text)))
-        )
+        similarity = get_similarity(source_text, hit_source_text)
 
         logger.debug(
-            'Similarity: %.2f (distance: %d)\nOriginal:\t%s\nComparing with:\t%s',
-            similarity, distance, source_text, hit_source_text
+            'Similarity: %.2f\nOriginal:\t%s\nComparing with:\t%s',
+            similarity, source_text, hit_source_text
         )
 
         if similarity < min_similarity:
@@ -98,25 +90,21 @@ class ElasticSearchBackend(SearchBackend):
         logger.error("Elasticsearch error for server(%s:%s): %s",
                      self._settings.get("HOST"), self._settings.get("PORT"), e)
 
-    def search(self, unit):
-        counter = {}
-        res = []
-        language = unit.store.translation_project.language.code
-        es_res = self._es_call(
-            "search",
-            index=self._settings['INDEX_NAME'],
-            doc_type=language,
-            body={
-                "query": {
-                    "match": {
-                        "source": {
-                            "query": unit.source,
-                            "fuzziness": 'AUTO',
-                        }
+    def _get_query(self, unit):
+        return {
+            "query": {
+                "match": {
+                    "source": {
+                        "query": unit.source,
+                        "fuzziness": 'AUTO',
                     }
                 }
             }
-        )
+        }
+
+    def _get_results(self, unit, es_res):
+        counter = {}
+        res = []
 
         if es_res is None:
             # ElasticsearchException - eg ConnectionError.
@@ -128,6 +116,9 @@ class ElasticSearchBackend(SearchBackend):
                          "string: %s", self._settings["HOST"],
                          self._settings["PORT"], unit)
             return []
+        elif "error" in es_res:
+            self._log_error(es_res["error"])
+            return []
 
         hits = filter_hits_by_distance(
             es_res['hits']['hits'],
@@ -163,6 +154,38 @@ class ElasticSearchBackend(SearchBackend):
 
         return res
 
+    def search(self, unit):
+        language = unit.store.translation_project.language.code
+        es_res = self._es_call(
+            "search",
+            index=self._settings['INDEX_NAME'],
+            doc_type=language,
+            body=self._get_query(unit)
+        )
+        return self._get_results(unit, es_res)
+
+    def search_many(self, units):
+        units = list(units)
+        if not units:
+            return {}
+
+        body = []
+        for unit in units:
+            body.append({
+                "index": self._settings['INDEX_NAME'],
+                "type": unit.store.translation_project.language.code})
+            body.append(self._get_query(unit))
+        es_res = self._es_call("msearch", body=body)
+
+        if es_res is None or es_res == "":
+            responses = [es_res] * len(units)
+        else:
+            responses = es_res['responses']
+        return {
+            unit.id: self._get_results(unit, response)
+            for unit, response
+            in zip(units, responses)}
+
     def update(self, language, obj):
         self._es_call(
             "index",
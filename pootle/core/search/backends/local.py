@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from __future__ import absolute_import
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from django.conf import settings
+from django.utils.encoding import force_text
+
+from pootle.core.utils.json import PootleJSONEncoder
+
+from ..base import SearchBackend
+from .utils import DEFAULT_MIN_SIMILARITY, get_min_similarity, get_similarity
+
+
+__all__ = ('LocalTMBackend',)
+
+
+logger = logging.getLogger(__name__)
+
+
+#: Size of the memory map used to read the index (bytes)
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+
+#: Seconds to wait for other processes writing to the index
+DEFAULT_LOCK_TIMEOUT = 30
+
+#: Number of candidates sharing most trigrams to re-score
+DEFAULT_MAX_CANDIDATES = 50
+
+#: Maximum number of hits to consider per search, as ES does
+DEFAULT_MAX_RESULTS = 10
+
+#: Maximum number of trigrams searched for, keeping queries within SQLite's
+#: limit on bound parameters (999 on older builds)
+MAX_QUERY_TRIGRAMS = 900
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS tm_unit ("
+    " language TEXT NOT NULL,"
+    " id TEXT NOT NULL,"
+    " revision INTEGER NOT NULL DEFAULT 0,"
+    " length INTEGER NOT NULL,"
+    " source TEXT NOT NULL,"
+    " body TEXT NOT NULL,"
+    " PRIMARY KEY (language, id))",
+    "CREATE TABLE IF NOT EXISTS tm_trigram ("
+    " language TEXT NOT NULL,"
+    " gram TEXT NOT NULL,"
+    " unit_id TEXT NOT NULL,"
+    " PRIMARY KEY (language, gram, unit_id))",
+    "CREATE INDEX IF NOT EXISTS tm_trigram_unit"
+    " ON tm_trigram (language, unit_id)",
+    "CREATE INDEX IF NOT EXISTS tm_unit_revision ON tm_unit (revision)")
+
+
+def get_trigrams(text):
+    """Returns the set of (case-insensitive) trigrams for `text`."""
+    text = u"  %s " % force_text(text).lower()
+    return set(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def get_query_trigrams(text, max_trigrams=MAX_QUERY_TRIGRAMS):
+    """Returns up to `max_trigrams` of the trigrams for `text`, spread
+    evenly across them."""
+    grams = sorted(get_trigrams(text))
+    if len(grams) <= max_trigrams:
+        return grams
+    step = float(len(grams)) / max_trigrams
+    return [grams[int(i * step)] for i in range(max_trigrams)]
+
+
+class LocalTMBackend(SearchBackend):
+    """Translation memory stored in a local trigram index.
+
+    Candidates sharing most trigrams with the searched text are fetched from
+    an on-disk (memory-mapped) SQLite index, and re-scored using their
+    Levenshtein similarity, so no external search service is required.
+    """
+
+    def __init__(self, config_name):
+        super(LocalTMBackend, self).__init__(config_name)
+        self.weight = min(max(self._settings.get('WEIGHT', self.weight),
+                              0.0), 1.0)
+        self._local = threading.local()
+        self.create_index()
+
+    @property
+    def index_path(self):
+        return os.path.join(
+            self._settings.get('PATH', os.path.join(settings.WORKING_DIR,
+                                                    'tm')),
+            "%s.db" % self._settings['INDEX_NAME'])
+
+    @property
+    def min_similarity(self):
+        return get_min_similarity(
+            self._settings.get('MIN_SIMILARITY', DEFAULT_MIN_SIMILARITY))
+
+    @property
+    def connection(self):
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.index_path,
+                timeout=self._settings.get('LOCK_TIMEOUT',
+                                           DEFAULT_LOCK_TIMEOUT))
+            conn.execute(
+                "PRAGMA mmap_size = %d"
+                % int(self._settings.get('MMAP_SIZE', DEFAULT_MMAP_SIZE)))
+            conn.execute("PRAGMA journal_mode = WAL")
+            self._local.connection = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "connection", None)
+        if conn is not None:
+            conn.close()
+            self._local.connection = None
+
+    def index_exists(self):
+        return os.path.exists(self.index_path)
+
+    def create_index(self):
+        index_dir = os.path.dirname(self.index_path)
+        if not os.path.exists(index_dir):
+            os.makedirs(index_dir)
+        with self.connection as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def delete_index(self):
+        self.close()
+        if self.index_exists():
+            os.remove(self.index_path)
+
+    def get_latest_revision(self):
+        row = self.connection.execute(
+            "SELECT MAX(revision) FROM tm_unit").fetchone()
+        return row[0]
+
+    def _index_unit(self, conn, language, obj):
+        unit_id = force_text(obj['id'])
+        source = force_text(obj['source'])
+        body = dict(
+            (k, v) for k, v in obj.items()
+            if not k.startswith("_"))
+        body["source"] = source
+        body["target"] = force_text(obj['target'])
+        conn.execute(
+            "DELETE FROM tm_trigram WHERE language = ? AND unit_id = ?",
+            (language, unit_id))
+        conn.execute(
+            "INSERT OR REPLACE INTO tm_unit "
+            "(language, id, revision, length, source, body) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (language, unit_id, int(obj.get('revision') or 0), len(source),
+             source, json.dumps(body, cls=PootleJSONEncoder)))
+        conn.executemany(
+            "INSERT OR IGNORE INTO tm_trigram (language, gram, unit_id) "
+            "VALUES (?, ?, ?)",
+            [(language, gram, unit_id) for gram in get_trigrams(source)])
+
+    def update(self, language, obj):
+        try:
+            with self.connection as conn:
+                self._index_unit(conn, language, obj)
+        except sqlite3.Error as e:
+            self._log_error(e)
+
+    def bulk_update(self, docs):
+        """Adds `docs` to the index, as yielded by `update_tmserver` parsers.
+
+        :return: number of indexed docs
+        """
+        indexed = 0
+        with self.connection as conn:
+            for doc in docs:
+                obj = dict(doc)
+                obj['id'] = doc['_id']
+                self._index_unit(conn, force_text(doc['_type']), obj)
+                indexed += 1
+        return indexed
+
+    def _log_error(self, e):
+        logger.error("Local TM error for index(%s): %s", self.index_path, e)
+
+    def _get_candidates(self, language, source):
+        grams = get_query_trigrams(source)
+        min_similarity = self.min_similarity
+        return self.connection.execute(
+            "SELECT u.id, u.source, u.body FROM tm_unit u "
+            "JOIN (SELECT t.unit_id, COUNT(*) AS shared FROM tm_trigram t "
+            "      JOIN tm_unit c "
+            "        ON c.language = t.language AND c.id = t.unit_id "
+            "      WHERE t.language = ? AND t.gram IN (%s) "
+            "        AND c.length BETWEEN ? AND ? "
+            "      GROUP BY t.unit_id "
+            "      ORDER BY shared DESC LIMIT ?) AS m "
+            "  ON u.language = ? AND u.id = m.unit_id"
+            % ", ".join("?" * len(grams)),
+            [language]
+            + grams
+            + [int(len(source) * min_similarity),
+               int(len(source) / min_similarity) + 1,
+               self._settings.get('MAX_CANDIDATES', DEFAULT_MAX_CANDIDATES),
+               language]).fetchall()
+
+    def search(self, unit):
+        counter = {}
+        res = []
+        language = unit.store.translation_project.language.code
+        source = force_text(unit.source)
+        try:
+            candidates = self._get_candidates(language, source)
+        except sqlite3.Error as e:
+            self._log_error(e)
+            return []
+
+        hits = []
+        for unit_id, hit_source, body in candidates:
+            if unit_id == force_text(unit.id):
+                continue
+            similarity = get_similarity(source, hit_source)
+            if similarity >= self.min_similarity:
+                hits.append((similarity, unit_id, body))
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+
+        max_results = self._settings.get('MAX_RESULTS', DEFAULT_MAX_RESULTS)
+        for similarity, unit_id, body in hits[:max_results]:
+            body = json.loads(body)
+            translation_pair = body['source'] + body['target']
+            if translation_pair not in counter:
+                counter[translation_pair] = 1
+                res.append({
+                    'unit_id': unit_id,
+                    'source': body['source'],
+                    'target': body['target'],
+                    'project': body['project'],
+                    'path': body['path'],
+                    'username': body['username'],
+                    'fullname': body['fullname'],
+                    'email_md5': body['email_md5'],
+                    'iso_submitted_on': body.get('iso_submitted_on', None),
+                    'display_submitted_on': body.get('display_submitted_on',
+                                                     None),
+                    'score': similarity * self.weight,
+                })
+            else:
+                counter[translation_pair] += 1
+
+        for item in res:
+            item['count'] = counter[item['source']+item['target']]
+
+        return res
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import Levenshtein
+
+
+DEFAULT_MIN_SIMILARITY = 0.7
+
+
+def get_similarity(source_text, other_text):
+    """Returns the similarity (0..1) of `other_text` to `source_text`,
+    based on their Levenshtein distance.
+    """
+    longest = max(len(source_text), len(other_text))
+    if not longest:
+        return 1.0
+    distance = Levenshtein.distance(source_text, other_text)
+    return 1 - distance / float(longest)
+
+
+def get_min_similarity(min_similarity):
+    """Returns `min_similarity` if it is a sane threshold, otherwise falls back
+    to ``DEFAULT_MIN_SIMILARITY``.
+    """
+    if min_similarity <= 0 or min_similarity >= 1:
+        return DEFAULT_MIN_SIMILARITY
+    return min_similarity
@@ -11,6 +11,12 @@ from django.conf import settings
 
 SERVER_SETTINGS_NAME = 'POOTLE_TM_SERVER'
 
+#: Seconds to wait for a TM server to answer before ignoring its results
+DEFAULT_SEARCH_TIMEOUT = 5
+
+#: Number of threads searching a TM server at the same time, per process
+DEFAULT_SEARCH_WORKERS = 4
+
 
 class SearchBackend(object):
 
@@ -37,6 +43,16 @@ class SearchBackend(object):
 
         return False
 
+    @property
+    def timeout(self):
+        """Seconds the broker waits for this TM results."""
+        return self._settings.get('TIMEOUT', DEFAULT_SEARCH_TIMEOUT)
+
+    @property
+    def workers(self):
+        """Number of threads the broker searches this TM with at a time."""
+        return self._settings.get('WORKERS', DEFAULT_SEARCH_WORKERS)
+
     def search(self, unit):
         """Search for TM results.
 
@@ -45,6 +61,14 @@ class SearchBackend(object):
         """
         raise NotImplementedError
 
+    def search_many(self, units):
+        """Search for TM results for several units at once.
+
+        :param units: iterable of :cls:`~pootle_store.models.Unit`
+        :return: dict of results lists keyed by unit id
+        """
+        return {unit.id: self.search(unit) for unit in units}
+
     def update(self, language, obj):
         """Add a unit to the backend"""
         pass
@@ -8,14 +8,86 @@
 
 import importlib
 import logging
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+from django.conf import settings
+from django.utils.encoding import force_text
+
+from pootle.core.cache import get_cache
 
 from . import SearchBackend
+from .cache import get_tm_cache_key, get_tm_revision
+
+
+logger = logging.getLogger(__name__)
+
+
+#: Thread pools searching each TM server, shared by all brokers in the
+#: process, and the number of their workers that are busy
+_search_pools = {}
+_busy_workers = {}
+_search_pools_lock = threading.Lock()
+
+
+def submit_search(server, workers, func):
+    """Runs `func` in the thread pool of `server`, of `workers` threads
+
+    :return: the ``AsyncResult`` of `func`, or ``None`` if all of the
+      server's workers are busy, e.g. waiting on a hung server.
+    """
+    key = (server, workers)
+    with _search_pools_lock:
+        if _busy_workers.get(key, 0) >= workers:
+            return None
+        _busy_workers[key] = _busy_workers.get(key, 0) + 1
+        if key not in _search_pools:
+            _search_pools[key] = ThreadPool(workers)
+        pool = _search_pools[key]
+
+    def _run():
+        try:
+            return func()
+        finally:
+            with _search_pools_lock:
+                _busy_workers[key] -= 1
+
+    return pool.apply_async(_run)
+
+
+class SourceSearch(object):
+    """Proxies a unit to search TM for its source text, so the results can
+    be shared by all the units with the same source.
+    """
+
+    def __init__(self, unit):
+        # The id must not match any TM entry so no result is discarded
+        self.id = u"source:%s" % unit.id
+        self.source = unit.source
+        self.store = unit.store
+
+
+def exclude_unit(results, unit):
+    """Returns `results` without the TM entry for `unit` itself."""
+    unit_id = force_text(unit.id)
+    filtered = []
+    for result in results:
+        if force_text(result.get('unit_id')) == unit_id:
+            if result['count'] <= 1:
+                continue
+            result = dict(result, count=result['count'] - 1)
+        filtered.append(result)
+    return filtered
 
 
 class SearchBroker(SearchBackend):
     def __init__(self, config_name=None):
         super(SearchBroker, self).__init__(config_name)
         self._servers = {}
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+        self.cache = get_cache('lru')
 
         if self._settings is None:
             return
@@ -43,14 +115,105 @@ class SearchBroker(SearchBackend):
                     logging.warning("Search backend '%s'. Cannot import '%s'",
                                     server, _module)
 
-    def search(self, unit):
-        if not self._servers:
-            return []
+    def get_stats(self, server):
+        return self.stats.setdefault(
+            server,
+            dict(searches=0, timeouts=0, skipped=0, errors=0, latency=0.0))
+
+    def _update_stats(self, server, latency=0.0, **counts):
+        with self._stats_lock:
+            stats = self.get_stats(server)
+            stats['latency'] += latency
+            for k, count in counts.items():
+                stats[k] += count
+            return dict(stats)
+
+    def get_server_stats(self):
+        """Returns the search counts and the mean latency of each server
+        since the broker was created.
+        """
+        server_stats = {}
+        with self._stats_lock:
+            for server in self._servers:
+                server_stats[server] = dict(self.get_stats(server))
+        for stats in server_stats.values():
+            answered = (
+                stats['searches'] - stats['timeouts'] - stats['skipped']
+                - stats['errors'])
+            stats['mean_latency'] = (
+                stats['latency'] / answered
+                if answered
+                else None)
+        return server_stats
+
+    def _start_search(self, server, method, *args):
+        """Starts the `method` search on `server` in the server's thread
+        pool, so a server that hangs can't hold up the searches of later
+        requests.
+
+        :return: the ``AsyncResult`` of the search, or ``None`` if all of
+          the server's workers are busy.
+        """
 
+        def _search():
+            outcome = {}
+            start = time.time()
+            try:
+                outcome['results'] = getattr(
+                    self._servers[server], method)(*args)
+            except Exception as e:
+                outcome['error'] = e
+            outcome['latency'] = time.time() - start
+            return outcome
+
+        return submit_search(server, self._servers[server].workers, _search)
+
+    def _search_servers(self, method, *args):
+        """Calls the `method` search on all servers concurrently, returning
+        the results of those answering before their deadline.
+        """
+        start = time.time()
+        pending = [
+            (server, self._start_search(server, method, *args))
+            for server in self._servers]
+        server_results = {}
+        for server, search in pending:
+            if search is None:
+                stats = self._update_stats(server, searches=1, skipped=1)
+                logger.warning(
+                    "Search backend '%s' skipped as all of its workers are "
+                    "busy (%s of %s searches skipped)",
+                    server, stats['skipped'], stats['searches'])
+                continue
+            remaining = max(
+                start + self._servers[server].timeout - time.time(), 0)
+            search.wait(remaining)
+            if not search.ready():
+                stats = self._update_stats(server, searches=1, timeouts=1)
+                logger.warning(
+                    "Search backend '%s' timed out after %ss "
+                    "(%s of %s searches timed out)",
+                    server, self._servers[server].timeout,
+                    stats['timeouts'], stats['searches'])
+                continue
+            outcome = search.get()
+            if 'error' in outcome:
+                self._update_stats(server, searches=1, errors=1)
+                logger.error("Search backend '%s' failed: %s",
+                             server, outcome['error'])
+                continue
+            latency, results = outcome['latency'], outcome['results']
+            self._update_stats(server, latency=latency, searches=1)
+            logger.debug("Search backend '%s' answered in %.3fs",
+                         server, latency)
+            server_results[server] = results
+        return server_results
+
+    def _merge_results(self, server_results):
         results = []
         counter = {}
         for server in self._servers:
-            for result in self._servers[server].search(unit):
+            for result in server_results.get(server, []):
                 translation_pair = result['source'] + result['target']
                 if translation_pair not in counter:
                     counter[translation_pair] = result['count']
@@ -68,7 +231,68 @@ class SearchBroker(SearchBackend):
 
         return results
 
+    def get_cache_key(self, language, source, revision):
+        return get_tm_cache_key(
+            self._servers.keys(), language, source, revision)
+
+    def _cache_results(self, cache_key, server_results, results):
+        # Results missing servers that timed out or failed are not cached.
+        if len(server_results) == len(self._servers):
+            self.cache.set(cache_key, results,
+                           timeout=settings.POOTLE_TM_CACHE_TIMEOUT)
+
+    def search(self, unit):
+        if not self._servers:
+            return []
+
+        # Retrieve the language here, so the servers don't query the DB from
+        # their threads.
+        language = unit.store.translation_project.language.code
+        cache_key = self.get_cache_key(
+            language, unit.source, get_tm_revision())
+        results = self.cache.get(cache_key)
+        if results is None:
+            server_results = self._search_servers(
+                "search", SourceSearch(unit))
+            results = self._merge_results(server_results)
+            self._cache_results(cache_key, server_results, results)
+        return exclude_unit(results, unit)
+
+    def search_many(self, units):
+        units = list(units)
+        if not self._servers:
+            return {unit.id: [] for unit in units}
+
+        revision = get_tm_revision()
+        cache_keys = {
+            unit.id: self.get_cache_key(
+                unit.store.translation_project.language.code,
+                unit.source,
+                revision)
+            for unit in units}
+        cached = self.cache.get_many(set(cache_keys.values()))
+        searches = {}
+        for unit in units:
+            if cache_keys[unit.id] not in cached:
+                searches.setdefault(cache_keys[unit.id], SourceSearch(unit))
+        if searches:
+            server_results = self._search_servers(
+                "search_many", searches.values())
+            for cache_key, search in searches.items():
+                cached[cache_key] = self._merge_results(
+                    {server: results.get(search.id, [])
+                     for server, results
+                     in server_results.items()})
+                self._cache_results(
+                    cache_key, server_results, cached[cache_key])
+        return {
+            unit.id: exclude_unit(cached[cache_keys[unit.id]], unit)
+            for unit in units}
+
     def update(self, language, obj):
         for server in self._servers:
             if self._servers[server].is_auto_updatable:
                 self._servers[server].update(language, obj)
+        # Results for the same source text are no longer accurate.
+        self.cache.delete(
+            self.get_cache_key(language, obj['source'], get_tm_revision()))
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+from hashlib import md5
+
+from django.utils.encoding import force_bytes, force_text
+
+from pootle.core.models.revision import NoRevision, Revision
+
+
+class TMRevision(Revision):
+    """Revision of the TM indexes, advanced every time `update_tmserver`
+    updates them, invalidating all the cached TM results.
+    """
+
+    CACHE_KEY = 'pootle:tm:revision'
+
+    @classmethod
+    def advance(cls):
+        try:
+            return cls.incr()
+        except NoRevision:
+            cls.initialize()
+            return cls.incr()
+
+
+def normalize_source(source):
+    return u" ".join(force_text(source).split())
+
+
+def get_tm_revision():
+    return TMRevision.get() or TMRevision.INITIAL
+
+
+def get_tm_cache_key(servers, language, source, revision):
+    """Returns the cache key for the TM results of `source` text in
+    `language`, from `servers` at the TM `revision`.
+    """
+    return "pootle.core.search.tm:%s:%s:%s:%s" % (
+        revision,
+        ",".join(sorted(servers)),
+        language,
+        md5(force_bytes(normalize_source(source))).hexdigest())
@@ -119,10 +119,14 @@ PTL.editor = {
     }
 
     this.formats = {};
+    this.tmCache = {};
 
     this.setActiveUnit = debounce((body, newUnit) => {
       this.fetchUnits().always(() => {
-        UnitAPI.fetchUnit(newUnit.id, body)
+        const unitBody = (
+          newUnit.id in this.tmCache ? assign({ tm: 0 }, body) : body
+        );
+        UnitAPI.fetchUnit(newUnit.id, unitBody)
           .then(
             (data) => {
               this.setEditUnit(data);
@@ -1518,7 +1522,10 @@ PTL.editor = {
       }
       return UnitAPI.fetchUnits(reqData)
         .then(
-          (data) => this.storeUnitData(data, { isInitial: initial }),
+          (data) => {
+            this.fetchUnitsTM(reqData);
+            return this.storeUnitData(data, { isInitial: initial });
+          },
           this.error
         ).always(() => this.markAsFetched(offsetToFetch));
     }
@@ -1527,6 +1534,12 @@ PTL.editor = {
     /* eslint-enable new-cap */
   },
 
+  /* Prefetches TM suggestions for a chunk of units */
+  fetchUnitsTM(reqData) {
+    UnitAPI.fetchUnitsTM(reqData)
+      .then((data) => assign(this.tmCache, data.tm_suggestions));
+  },
+
   storeUnitData(data, { isInitial = false } = {}) {
     const { total } = data;
     const { start } = data;
@@ -1585,7 +1598,9 @@ PTL.editor = {
     currentUnit.set('isObsolete', data.is_obsolete);
     currentUnit.set('sources', data.sources);
 
-    this.tmData = data.tm_suggestions || null;
+    this.tmData = (
+      data.tm_suggestions || this.tmCache[currentUnit.id] || null
+    );
     this.editorRow = data.editor;
   },
 
@@ -21,6 +21,13 @@ const UnitAPI = {
     });
   },
 
+  fetchUnitsTM(body) {
+    return fetch({
+      body,
+      url: `${this.apiRoot}tm/`,
+    });
+  },
+
   fetchUnit(uId, body = {}) {
     return fetch({
       body,
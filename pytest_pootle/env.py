@@ -173,6 +173,15 @@ class PootleTestEnv(object):
             "utf8_bin",
             "varchar(255)")
 
+        # Word.Word
+        set_mysql_collation_for_column(
+            apps,
+            cursor,
+            "pootle_word.Word",
+            "text",
+            "utf8_bin",
+            "varchar(255)")
+
     def setup_permissions(self):
         from django.contrib.contenttypes.models import ContentType
 
@@ -385,6 +394,7 @@ class PootleTestEnv(object):
 
         from pootle.core.contextmanagers import bulk_operations
         from pootle_data.models import TPChecksData, TPData
+        from pootle_log.models import Event
         from pootle_score.models import UserTPScore
         from pootle_statistics.models import SubmissionTypes
         from pootle_store.constants import UNTRANSLATED
@@ -396,6 +406,7 @@ class PootleTestEnv(object):
 
         units = Unit.objects.all()
         units.update(creation_time=year_ago)
+        Event.objects.filter(action="unit_created").update(timestamp=year_ago)
 
         User = get_user_model()
         admin = User.objects.get(username="admin")
@@ -518,10 +529,15 @@ class PootleTestEnv(object):
                     UnitDBFactory(store=store, state=state)
 
     def _update_submission_times(self, unit, update_time, last_update=None):
+        from pootle_log.models import Event
+
         submissions = unit.submission_set.all()
         if last_update:
             submissions = submissions.exclude(
                 creation_time__lte=last_update)
+        Event.objects.filter(
+            submission_id__in=list(submissions.values_list("id", flat=True))
+        ).update(timestamp=update_time)
         submissions.update(creation_time=update_time)
 
     def _add_submissions(self, unit, created, admin, member, member2):
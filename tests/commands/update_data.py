@@ -10,6 +10,8 @@ import pytest
 
 from django.core.management import call_command
 
+from pootle_translationproject.models import TranslationProject
+
 
 @pytest.mark.cmd
 @pytest.mark.django_db
@@ -78,3 +80,46 @@ def test_update_data_store(store0):
     store0.data.refresh_from_db()
     assert store0.data.total_words == total_words
     assert store0.data.critical_checks == critical_checks
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_update_data_workers(store0, monkeypatch):
+    """Site wide update_data handling TPs in parallel"""
+    jobs = []
+
+    class DummyPool(object):
+
+        def __init__(self, processes):
+            self.processes = processes
+
+        def imap_unordered(self, func, iterable):
+            for job in iterable:
+                jobs.append(job)
+                yield func(job)
+
+        def close(self):
+            pass
+
+        def join(self):
+            pass
+
+    class DummyConnections(object):
+
+        def all(self):
+            return []
+
+    monkeypatch.setattr(
+        "pootle_app.management.commands.Pool", DummyPool)
+    monkeypatch.setattr(
+        "pootle_app.management.commands.connections", DummyConnections())
+    total_words = store0.data.total_words
+    store0.data.total_words = 0
+    store0.data.save()
+    revision = store0.parent.revisions.get(key="stats").value
+    call_command("update_data", "--workers", "2")
+    store0.data.refresh_from_db()
+    assert store0.data.total_words == total_words
+    assert TranslationProject.objects.count() == len(jobs)
+    assert all(job[2] for job in jobs)
+    assert store0.parent.revisions.get(key="stats").value != revision
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from django.core.management import call_command
+
+from pootle.core.delegate import text_index
+from pootle_word.models import UnitWord
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_update_search_index_project(store0):
+    project = store0.translation_project.project
+    UnitWord.objects.all().delete()
+    call_command(
+        "update_search_index",
+        "--project", project.code,
+        "--batch-size", "7")
+    assert not text_index.get().is_ready
+    assert not UnitWord.objects.exclude(
+        unit__store__translation_project__project=project).exists()
+    for unit in store0.units:
+        assert (
+            set(unit.search_words.values_list("field", "word__text"))
+            == text_index.get().get_unit_words(unit))
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_update_search_index_noargs(store0):
+    UnitWord.objects.all().delete()
+    call_command("update_search_index")
+    assert text_index.get().is_ready
+    assert (
+        set(store0.units.first().search_words.values_list(
+            "field", "word__text"))
+        == text_index.get().get_unit_words(store0.units.first()))
@@ -116,3 +116,177 @@ msgstr "test"
                  '--target-language=af', os.path.join(p.dirname, p.basename))
     out, err = capfd.readouterr()
     assert "1 translations to index" in out
+
+
+@pytest.mark.django_db
+def test_update_tmserver_db_parser_batches(tp0):
+    from pootle_app.management.commands.update_tmserver import DBParser
+
+    parser = DBParser(
+        stdout=None, index="translations", disabled_projects=False)
+    parser.tp_pk = tp0.pk
+    parser.last_indexed_revision = -1
+    units = list(parser.get_units()[0])
+    assert units
+    unit_ids = sorted(unit["id"] for unit in units)
+    batches = list(parser.get_unit_batches(3))
+    assert all(len(batch) <= 3 for batch in batches)
+    assert [unit["id"] for batch in batches for unit in batch] == unit_ids
+    batches = list(parser.get_unit_batches(3, after_id=unit_ids[1]))
+    assert (
+        [unit["id"] for batch in batches for unit in batch]
+        == unit_ids[2:])
+
+
+def _local_tm_settings(settings, tmpdir):
+    settings.POOTLE_TM_SERVER = {
+        'local': {
+            'ENGINE': 'pootle.core.search.backends.LocalTMBackend',
+            'PATH': str(tmpdir),
+            'INDEX_NAME': 'translations',
+        }
+    }
+
+
+def _get_tp_unit_ids(tp):
+    from pootle_app.management.commands.update_tmserver import DBParser
+
+    parser = DBParser(
+        stdout=None, index="translations", disabled_projects=False)
+    parser.tp_pk = tp.pk
+    parser.last_indexed_revision = -1
+    return sorted(unit["id"] for unit in parser.get_units()[0])
+
+
+def _get_indexed_unit_ids():
+    from pootle.core.search.backends import LocalTMBackend
+
+    return sorted(
+        int(unit_id)
+        for unit_id, in LocalTMBackend('local').connection.execute(
+            "SELECT id FROM tm_unit").fetchall())
+
+
+class InProcessPool(object):
+    """Runs the indexing jobs in the test process, so they share its DB
+    connection.
+    """
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+
+    def imap_unordered(self, func, jobs):
+        return (func(job) for job in jobs)
+
+    def close(self):
+        pass
+
+    def join(self):
+        pass
+
+
+def _patch_pool(monkeypatch):
+    from pootle_app.management.commands.update_tmserver import Command
+
+    monkeypatch.setattr(
+        Command, "_get_pool", lambda self, jobs: InProcessPool(jobs))
+    monkeypatch.setattr(Command, "_close_connections", lambda self: None)
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_update_tmserver_jobs(capfd, settings, tmpdir, monkeypatch):
+    from pootle_app.management.commands.update_tmserver import IndexCheckpoint
+    from pootle_translationproject.models import TranslationProject
+
+    _local_tm_settings(settings, tmpdir)
+    _patch_pool(monkeypatch)
+    tps = TranslationProject.objects.all()
+    call_command('update_tmserver', '--jobs=2')
+    out, err = capfd.readouterr()
+    assert "Last indexed revision = -1" in out
+    assert ("%s translation projects to index" % tps.count()) in out
+    assert (
+        _get_indexed_unit_ids()
+        == sorted(
+            unit_id
+            for tp in tps
+            for unit_id in _get_tp_unit_ids(tp)))
+    # the checkpoint is cleared once all of the TPs are indexed
+    assert IndexCheckpoint("translations").revision is None
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_update_tmserver_jobs_resume(capfd, settings, tmpdir, monkeypatch,
+                                     tp0):
+    from pootle_app.management.commands.update_tmserver import (
+        IndexCheckpoint, index_translation_project)
+    from pootle_translationproject.models import TranslationProject
+
+    _local_tm_settings(settings, tmpdir)
+    _patch_pool(monkeypatch)
+    tp0_unit_ids = _get_tp_unit_ids(tp0)
+    assert len(tp0_unit_ids) > 2
+
+    # a TP resumes after its last indexed unit
+    checkpoint = IndexCheckpoint("translations")
+    checkpoint.set_tp(tp0.pk, tp0_unit_ids[1])
+    assert (
+        index_translation_project(('local', tp0.pk, -1, False, 3))
+        == (tp0.pk, len(tp0_unit_ids) - 2))
+    assert checkpoint.get_tp(tp0.pk) is True
+    assert _get_indexed_unit_ids() == tp0_unit_ids[2:]
+
+    # an interrupted run resumes from its starting revision, skipping the
+    # TPs that were completely indexed
+    checkpoint.start(-1)
+    tps = TranslationProject.objects.all()
+    call_command('update_tmserver', '--jobs=2')
+    out, err = capfd.readouterr()
+    assert "Resuming interrupted indexing" in out
+    assert ("%s translation projects to index" % (tps.count() - 1)) in out
+    assert (
+        _get_indexed_unit_ids()
+        == sorted(
+            [unit_id
+             for tp in tps.exclude(pk=tp0.pk)
+             for unit_id in _get_tp_unit_ids(tp)]
+            + tp0_unit_ids[2:]))
+    assert checkpoint.revision is None
+
+
+@pytest.mark.cmd
+@pytest.mark.django_db
+def test_update_tmserver_serial_checkpoint(capfd, settings, tmpdir, tp0):
+    from pootle_app.management.commands.update_tmserver import IndexCheckpoint
+    from pootle_translationproject.models import TranslationProject
+
+    _local_tm_settings(settings, tmpdir)
+    tps = TranslationProject.objects.all()
+    all_unit_ids = sorted(
+        unit_id
+        for tp in tps
+        for unit_id in _get_tp_unit_ids(tp))
+
+    # an interrupted parallel run is resumed and cleared by a serial run
+    checkpoint = IndexCheckpoint("translations")
+    checkpoint.start(-1)
+    checkpoint.set_tp(tp0.pk, True)
+    call_command('update_tmserver')
+    out, err = capfd.readouterr()
+    assert "Resuming interrupted indexing" in out
+    assert "Last indexed revision = -1" in out
+    assert _get_indexed_unit_ids() == all_unit_ids
+    assert checkpoint.revision is None
+    assert checkpoint.get_tp(tp0.pk) is None
+
+    # rebuilding without --jobs clears a stale checkpoint
+    checkpoint.start(-1)
+    checkpoint.set_tp(tp0.pk, True)
+    call_command('update_tmserver', '--rebuild')
+    out, err = capfd.readouterr()
+    assert "Resuming interrupted indexing" not in out
+    assert _get_indexed_unit_ids() == all_unit_ids
+    assert checkpoint.revision is None
+    assert checkpoint.get_tp(tp0.pk) is None
@@ -8,6 +8,9 @@
 
 import pytest
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from pootle.core.bulk import BulkCRUD
 from pootle_data.models import StoreChecksData
 from pootle_store.models import Unit
@@ -93,6 +96,36 @@ def test_bulk_crud_create_delete(store0):
             checkdata.refresh_from_db()
 
 
+@pytest.mark.django_db
+def test_bulk_crud_create_batches(store0):
+
+    class ExampleBulkCRUD(BulkCRUD):
+        model = StoreChecksData
+        batch_size = 2
+
+    checkdata_crud = ExampleBulkCRUD()
+    checkdata = [
+        StoreChecksData(store=store0, name="check%s" % i, category=2)
+        for i in range(5)]
+    assert checkdata_crud.get_batch_size(checkdata) == 2
+    with CaptureQueriesContext(connection) as queries:
+        checkdata_crud.create(objects=checkdata)
+    inserts = [
+        query for query in queries.captured_queries
+        if query["sql"].startswith("INSERT")]
+    assert len(inserts) == 3
+    assert StoreChecksData.objects.filter(
+        store=store0, name__startswith="check").count() == 5
+
+    # the batch size is kept within the backend's limits
+    ExampleBulkCRUD.batch_size = 100000
+    fields = StoreChecksData._meta.concrete_fields
+    assert (
+        checkdata_crud.get_batch_size(checkdata)
+        == min(100000,
+               connection.ops.bulk_batch_size(fields, checkdata)))
+
+
 @pytest.mark.django_db
 def test_bulk_crud_update_methods(store0):
     unit0, unit1, unit2 = store0.units[:3]
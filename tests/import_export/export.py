@@ -42,6 +42,21 @@ def test_view_tp_export_garbage(memusage, client,
         assert not usage["used"]
 
 
+@pytest.mark.django_db
+def test_view_store_export(client, store0):
+    url = (
+        "%s?path=%s"
+        % (reverse('pootle-export'),
+           store0.pootle_path))
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.streaming
+    assert (
+        response["Content-Disposition"]
+        == "attachment; filename=%s" % store0.name)
+    assert b"".join(response.streaming_content) == store0.serialize()
+
+
 @pytest.mark.django_db
 def test_download_exported_tmx(client, tp0):
     args = [tp0.language.code, tp0.project.code]
@@ -6,21 +6,26 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import json
 import os
 
 import pytest
 
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory
+from django.urls import reverse
 
 import pytest_pootle
 from pytest_pootle.utils import create_store
 
 from import_export.exceptions import UnsupportedFiletypeError
-from import_export.utils import import_file
+from import_export.utils import import_file, parse_header
+from import_export.views import handle_upload_form
 from pootle_app.models.permissions import check_user_permission
 from pootle_statistics.models import SubmissionTypes
 from pootle_store.constants import NEW, OBSOLETE, PARSED, TRANSLATED
 from pootle_store.models import Store, Unit
+from pootle_store.utils import STORE_UPDATE_JOB_TIMEOUT, get_store_update_job
 
 
 IMPORT_SUCCESS = "headers_correct.po"
@@ -67,6 +72,24 @@ def test_import_unsupported(po_directory, en_tutorial_ts,
                      user=member)
 
 
+def test_import_parse_header():
+    contents = (
+        b'# A comment\n'
+        b'msgid ""\n'
+        b'msgstr ""\n'
+        b'"X-Pootle-Path: /language0/project0/store0.po\\n"\n'
+        b'"X-Pootle-Revision: 23\\n"\n'
+        b'\r\n'
+        b'msgid "Not parsed"\n'
+        b'msgstr "Not parsed" "unterminated\n')
+    header = parse_header(
+        SimpleUploadedFile("store0.po", contents), contents)
+    assert header["X-Pootle-Path"] == "/language0/project0/store0.po"
+    assert header["X-Pootle-Revision"] == "23"
+    with pytest.raises(UnsupportedFiletypeError):
+        parse_header(SimpleUploadedFile("store0.ts", contents), contents)
+
+
 @pytest.mark.django_db
 def test_import_new_file(project0_nongnu, import_tps, site_users):
     tp = import_tps
@@ -146,3 +169,98 @@ def test_import_add_and_obsolete_units(project0_nongnu, import_tps,
         assert Unit.objects.filter(store=store).count() == 2
     else:
         assert store.units.all().count() == 1
+
+
+@pytest.mark.django_db
+def test_import_enqueued(project0_nongnu, tp0, admin, client):
+    store = tp0.stores.get(name="store0.po")
+    unit = store.units.filter(state=TRANSLATED).first()
+    filestore = create_store(
+        store.pootle_path,
+        str(store.data.max_unit_revision),
+        [(unit.source_f, unit.target_f + " UPDATED", False)])
+    # the job is run synchronously in tests
+    job_id = import_file(
+        SimpleUploadedFile(store.name,
+                           str(filestore),
+                           "text/x-gettext-translation"),
+        user=admin,
+        enqueue=True)
+    job = get_store_update_job(job_id)
+    assert job.is_finished
+    assert job.timeout == STORE_UPDATE_JOB_TIMEOUT
+    assert job.kwargs["user_pk"] == admin.pk
+    # the upload is queued as a temporary file, removed by the job
+    assert job.args[1] != str(filestore)
+    assert not os.path.exists(job.args[1])
+    assert job.result["changes"]["updated"] == 1
+    unit.refresh_from_db()
+    assert unit.target_f.endswith(" UPDATED")
+
+    url = reverse("pootle-import-job", kwargs=dict(job_id=job_id))
+    assert client.get(url).status_code == 404
+    client.login(username=admin.username, password="admin")
+    result = json.loads(client.get(url).content)
+    assert result["id"] == job_id
+    assert result["status"] == "finished"
+    assert result["store"] == store.pootle_path
+    assert result["revision"] == job.result["revision"]
+    assert result["changes"] == job.result["changes"]
+    assert client.get(
+        reverse("pootle-import-job",
+                kwargs=dict(job_id="DOES_NOT_EXIST"))).status_code == 404
+
+
+@pytest.mark.django_db
+def test_import_enqueued_upload_form(project0_nongnu, tp0, admin, settings):
+    settings.POOTLE_ASYNC_UPLOADS = True
+    store = tp0.stores.get(name="store0.po")
+    unit = store.units.filter(state=TRANSLATED).first()
+    filestore = create_store(
+        store.pootle_path,
+        str(store.data.max_unit_revision),
+        [(unit.source_f, unit.target_f + " UPDATED", False)])
+    request = RequestFactory().post(
+        reverse("pootle-tp-browse",
+                args=[tp0.language.code, tp0.project.code]),
+        dict(file=SimpleUploadedFile(store.name,
+                                     str(filestore),
+                                     "text/x-gettext-translation"),
+             user_id=""))
+    request.user = admin
+    ctx = handle_upload_form(request, tp0)
+    assert len(ctx["upload_jobs"]) == 1
+    job = ctx["upload_jobs"][0]
+    assert get_store_update_job(job["id"]) is not None
+    # each queued upload links to the status of its job
+    assert job["url"] == reverse(
+        "pootle-import-job", kwargs=dict(job_id=job["id"]))
+
+
+@pytest.mark.django_db
+def test_import_same_file(project0_nongnu, tp0, admin):
+    store = tp0.stores.get(name="store0.po")
+    unit = store.units.filter(state=TRANSLATED).first()
+    filestore = create_store(
+        store.pootle_path,
+        str(store.data.max_unit_revision),
+        [(unit.source_f, unit.target_f + " UPDATED", False)])
+
+    def _import():
+        job_id = import_file(
+            SimpleUploadedFile(store.name,
+                               str(filestore),
+                               "text/x-gettext-translation"),
+            user=admin,
+            enqueue=True)
+        return get_store_update_job(job_id).result
+
+    assert _import()["changes"]["updated"] == 1
+
+    # the same file is skipped while the store is unchanged
+    assert _import() == dict(revision=None, changes={})
+
+    unit.refresh_from_db()
+    unit.target_f = "Changed in Pootle"
+    unit.save()
+    assert _import()["revision"] is not None
@@ -6,8 +6,11 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import difflib
 import io
 import os
+import sys
+from collections import OrderedDict
 
 import six
 
@@ -16,8 +19,9 @@ import pytest
 from pytest_pootle.factories import (
     LanguageDBFactory, ProjectDBFactory, StoreDBFactory,
     TranslationProjectFactory)
-from pytest_pootle.utils import update_store
+from pytest_pootle.utils import create_store, update_store
 
+from translate.storage import pypo
 from translate.storage.factory import getclass
 
 from django.db.models import Max
@@ -43,8 +47,9 @@ from pootle_statistics.models import (
     SubmissionFields, SubmissionTypes)
 from pootle_store.constants import (
     NEW, OBSOLETE, PARSED, POOTLE_WINS, TRANSLATED)
-from pootle_store.diff import DiffableStore, StoreDiff
+from pootle_store.diff import DBUnit, DiffableStore, StoreDiff, get_opcodes
 from pootle_store.models import Store
+from pootle_store.store.serialize import StoreSerialization
 from pootle_store.util import parse_pootle_revision
 from pootle_translationproject.models import TranslationProject
 
@@ -770,22 +775,29 @@ def test_store_file_diff(store_diff_tests):
 
     assert diff.target_store == store
     assert diff.source_revision == store_revision
+    source_units = diff.diffable.get_source_units(diff.source_units.keys())
     assert (
         update_units
         == [(x.source, x.target, x.isfuzzy())
             for x in diff.source_store.units[1:]]
-        == [(v['source'], v['target'], v['state'] == 50)
-            for v in diff.source_units.values()])
+        == [(source_units[uid]['source'],
+             source_units[uid]['target'],
+             source_units[uid]['state'] == 50)
+            for uid in diff.source_units])
     assert diff.active_target_units == [x.source for x in store.units]
     assert diff.target_revision == store.get_max_unit_revision()
+    target_units = store.unit_set.values(
+        "source_f", "index", "target_f", "state", "unitid", "id", "revision",
+        "developer_comment", "translator_comment", "locations", "context")
+    diff_fields = diff.diffable.diff_fields + ("digest", )
     assert (
-        diff.target_units
-        == {unit["source_f"]: unit
+        {unitid: {k: unit[k] for k in diff_fields}
+         for unitid, unit in diff.target_units.items()}
+        == {unit["source_f"]: dict(
+            digest=diff.diffable.get_unit_digest(unit, DBUnit),
+            **{k: unit[k] for k in diff.diffable.diff_fields})
             for unit
-            in store.unit_set.values("source_f", "index", "target_f",
-                                     "state", "unitid", "id", "revision",
-                                     "developer_comment", "translator_comment",
-                                     "locations", "context")})
+            in target_units})
     diff_diff = diff.diff()
     if diff_diff is not None:
         assert (
@@ -836,6 +848,34 @@ def test_store_po_serializer(test_fs, store_po):
     assert len(store_ttk.units) == len(ttk_po.units)
 
 
+@pytest.mark.django_db
+def test_store_po_serializer_stream(test_fs, store_po):
+
+    with test_fs.open("data/po/complex.po") as test_file:
+        store_po.update(store_po.deserialize(test_file.read()))
+
+    assert StoreSerialization(store_po).streamable
+    for include_obsolete in [True, False]:
+        out = io.BytesIO()
+        store_po.serialize_to(out, include_obsolete=include_obsolete)
+        assert (
+            out.getvalue()
+            == store_po.serialize(include_obsolete=include_obsolete))
+        serialized = list(
+            store_po.iterate_serialized(include_obsolete=include_obsolete))
+        # the header, and then a chunk of units at a time
+        assert len(serialized) > 1
+        assert b"".join(serialized) == out.getvalue()
+
+    # units are converted in chunks
+    chunks = list(
+        store_po.syncer.convert_chunks(chunk_size=2))
+    assert len(chunks) == (store_po.units.count() + 1) // 2
+    assert (
+        [unit.getid() for chunk in chunks for unit in chunk.units]
+        == [unit.getid() for unit in store_po.units])
+
+
 @pytest.mark.django_db
 def test_store_po_serializer_custom(test_fs, store_po):
 
@@ -1467,6 +1507,142 @@ def test_store_diff_delete_obsoleted_source_unit(diffable_stores):
     assert not differ.diff()
 
 
+@pytest.mark.django_db
+def test_store_diff_unit_digests(diffable_stores):
+    target_store, source_store = diffable_stores
+    diffable = DiffableStore(target_store, source_store)
+    for unitid, unit in diffable.source_units.items():
+        assert unit["digest"] == diffable.target_units[unitid]["digest"]
+        assert "target_f" not in unit
+
+    update_unit = source_store.units.first()
+    update_unit.target_f = "Some other string"
+    update_unit.save()
+    diffable = DiffableStore(target_store, source_store)
+    assert (
+        [unitid for unitid, unit in diffable.source_units.items()
+         if unit["digest"] != diffable.target_units[unitid]["digest"]]
+        == [update_unit.unitid])
+    source_unit = diffable.get_source_units(
+        [update_unit.unitid])[update_unit.unitid]
+    assert source_unit["target_f"] == "Some other string"
+
+
+@pytest.mark.pootle_memusage
+def test_store_diff_benchmark_file_units():
+    """Benchmark for the memory used by the diff records of a synthetic
+    100k unit PO file.
+
+    The size of the records' containers is compared with the size of the
+    dictionaries per unit that the records replace. The file units, and
+    the strings that both share with them, stay referenced by the file, so
+    they are not counted.
+    """
+    po = pypo.pofile()
+    for i in range(100000):
+        unit = po.addsourceunit("Source string %s" % i)
+        unit.target = "Target string %s" % i
+        unit.addlocation("file.c:%s" % i)
+    units = [unit_ for unit_ in po.units if not unit_.isheader()]
+    diffable = DiffableStore(None, po)
+    diff_units = diffable.get_file_units(units)
+    records_size = (
+        sys.getsizeof(diff_units.unitids)
+        + sys.getsizeof(diff_units.positions)
+        + sum(sys.getsizeof(column)
+              for column in diff_units.columns.values())
+        + sum(sys.getsizeof(digest)
+              for digest in diff_units.columns["digest"]))
+    unit_dicts = OrderedDict(
+        (unit_.getid(), diffable.get_file_unit(unit_))
+        for unit_ in units)
+    dicts_size = (
+        sys.getsizeof(unit_dicts)
+        + sum(sys.getsizeof(unit_dict)
+              for unit_dict in unit_dicts.values()))
+    assert len(diff_units) == 100000
+    assert records_size * 2 < dicts_size
+
+
+@pytest.mark.parametrize(
+    "before, after",
+    [("", ""),
+     ("abc", "abc"),
+     ("abc", ""),
+     ("", "abc"),
+     ("abcdef", "aXbcYdef"),
+     ("abcdef", "abdef"),
+     ("abcdef", "aXYdef"),
+     ("abcdef", "fabcde"),
+     ("abcdef", "fedcba"),
+     ("abcdef", "bXadZfe")])
+def test_store_diff_get_opcodes(before, after):
+    before, after = list(before), list(after)
+    opcodes = get_opcodes(before, after)
+    result = []
+    i = j = 0
+    for tag, i1, i2, j1, j2 in opcodes:
+        assert (i1, j1) == (i, j)
+        if tag == "equal":
+            assert before[i1:i2] == after[j1:j2]
+        result += after[j1:j2]
+        i, j = i2, j2
+    assert (i, j) == (len(before), len(after))
+    assert result == after
+    # matches at least as many units as difflib
+    assert (
+        sum(i2 - i1 for tag, i1, i2, j1_, j2_ in opcodes if tag == "equal")
+        >= sum(size for i_, j_, size
+               in difflib.SequenceMatcher(
+                   None, before, after).get_matching_blocks()))
+
+
+@pytest.mark.django_db
+def test_store_diff_scattered_inserts(tp0):
+    store = StoreDBFactory(
+        translation_project=tp0,
+        parent=tp0.directory)
+    units = [("Unit %s" % i, "Unit %s" % i, False) for i in range(10)]
+    update_store(store, units=units, store_revision=0)
+    revision = store.data.max_unit_revision
+    new_units = []
+    for i, unit in enumerate(units):
+        if not i % 3:
+            new_units.append(("New unit %s" % i, "", False))
+        new_units.append(unit)
+    differ = StoreDiff(
+        store,
+        create_store(units=new_units),
+        revision)
+    # every unit is shifted along by the units inserted before it
+    assert (
+        differ.diff()["index"]
+        == {unit.pk: unit.index + (i // 3) + 1
+            for i, unit in enumerate(store.units)})
+
+    update_store(store, units=new_units, store_revision=revision)
+    assert (
+        [unit.source for unit in store.units]
+        == [source for source, target_, is_fuzzy_ in new_units])
+    indexes = list(store.unit_set.values_list("index", flat=True))
+    assert len(indexes) == len(set(indexes))
+
+
+@pytest.mark.django_db
+def test_store_reindex(store0):
+    units = list(store0.unit_set.order_by("index"))
+    store0.reindex(
+        {unit.pk: len(units) - i
+         for i, unit in enumerate(units)})
+    assert (
+        list(store0.unit_set.order_by("index"))
+        == list(reversed(units)))
+    store0.reindex({})
+    assert (
+        list(store0.unit_set.order_by("index"))
+        == list(reversed(units)))
+
+
 @pytest.mark.django_db
 def test_store_syncer(tp0):
     store = tp0.stores.live().first()
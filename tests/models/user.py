@@ -19,7 +19,7 @@ from pytest_pootle.fixtures.models.store import (_create_submission_and_suggesti
 
 import accounts
 
-from pootle.core.delegate import review
+from pootle.core.delegate import review, text_index
 from pootle_app.models.directory import Directory
 from pootle_app.models.permissions import PermissionSet, check_user_permission
 from pootle_language.models import Language
@@ -165,6 +165,12 @@ def _test_user_purging(store, member, evil_member, purge):
     # State is be back to how it was before evil user updated.
     _test_before_evil_user_updated(store, member)
 
+    # The search index has been updated for the reverted text
+    for unit in store.units:
+        assert (
+            set(unit.search_words.values_list("field", "word__text"))
+            == text_index.get().get_unit_words(unit))
+
 
 @pytest.mark.django_db
 def test_merge_user(en_tutorial_po, member, member2):
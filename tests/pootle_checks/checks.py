@@ -9,8 +9,9 @@
 import pytest
 
 from pootle.core.delegate import check_updater
-from pootle_checks.utils import TPQCUpdater, StoreQCUpdater
-from pootle_store.constants import OBSOLETE
+from pootle_checks.utils import (
+    CheckResultsCache, StoreQCUpdater, TPQCUpdater)
+from pootle_store.constants import OBSOLETE, UNTRANSLATED
 from pootle_store.models import QualityCheck
 
 
@@ -96,3 +97,80 @@ def test_store_qualitycheck_updater(tp0, store0):
     newest_revision = tp0.directory.revisions.filter(
         key="stats").values_list("value", flat=True).first()
     assert newest_revision == new_revision
+
+
+@pytest.mark.django_db
+def test_tp_qualitycheck_updater_chunks(tp0):
+    chunks = []
+
+    class ChunkedQCUpdater(TPQCUpdater):
+        chunk_size = 3
+
+        def update_translated_units(self, units):
+            chunks.append(len(units))
+            return super(
+                ChunkedQCUpdater, self).update_translated_units(units)
+
+    checks = QualityCheck.objects.filter(unit__store__translation_project=tp0)
+    original_checks = set(checks.values_list("unit_id", "name"))
+    assert original_checks
+    checks.delete()
+    updater = ChunkedQCUpdater(translation_project=tp0)
+    updater.update()
+    assert set(checks.values_list("unit_id", "name")) == original_checks
+    translated = updater.units.filter(state__gt=UNTRANSLATED)
+    assert sum(chunks) == translated.count()
+    assert max(chunks) == 3
+
+    # fix a check, and add one that doesnt fail
+    check = checks.filter(name="printf")[0]
+    unit = check.unit
+    unit.__class__.objects.filter(pk=unit.pk).update(target_f=unit.source_f)
+    other = checks.exclude(unit__qualitycheck__name="printf")[0]
+    passing = QualityCheck.objects.create(
+        unit=other.unit, name="printf", category=other.category)
+    updater.update()
+    assert not checks.filter(pk__in=[check.pk, passing.pk]).exists()
+    assert checks.filter(pk=other.pk).exists()
+
+
+@pytest.mark.django_db
+def test_check_results_cache(tp0, store0):
+    ran = []
+
+    class CountingCheckResultsCache(CheckResultsCache):
+
+        def run_checks(self, checker, unit, check_names=None):
+            ran.append(unit.id)
+            return super(
+                CountingCheckResultsCache, self).run_checks(
+                    checker, unit, check_names)
+
+    cache = CountingCheckResultsCache(maxsize=2)
+    checker = tp0.checker
+    unit0, unit1, unit2 = store0.units.filter(state__gt=UNTRANSLATED)[:3]
+    failures = cache.get_failures(checker, unit0)
+    assert failures == checker.run_filters(unit0, categorised=True)
+    assert cache.get_failures(checker, unit0) == failures
+    assert ran == [unit0.id]
+
+    # a different check list, and content, are cached separately
+    cache.get_failures(checker, unit0, ["printf"])
+    assert ran == [unit0.id, unit0.id]
+    assert len(cache) == 2
+    cache.get_failures(checker, unit1)
+    assert len(cache) == 2
+    assert ran == [unit0.id, unit0.id, unit1.id]
+
+    # least recently used results are evicted
+    cache.get_failures(checker, unit0)
+    assert ran == [unit0.id, unit0.id, unit1.id, unit0.id]
+
+    # units with the same content share results
+    unit2.source_f = unit1.source_f
+    unit2.target_f = unit1.target_f
+    unit2.locations = unit1.locations
+    cache.get_failures(checker, unit2)
+    assert ran == [unit0.id, unit0.id, unit1.id, unit0.id]
+    cache.clear()
+    assert not len(cache)
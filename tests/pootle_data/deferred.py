@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import pytest
+
+from pytest_pootle.factories import UnitDBFactory
+
+from pootle_data.deferred import (
+    DEFERRED_JOB_KEY, DEFERRED_STORES_KEY, DeferredStoreData)
+from pootle_store.constants import FUZZY, OBSOLETE, TRANSLATED, UNTRANSLATED
+
+
+def _calc_word_counts(units):
+    expected = dict(
+        total_words=0, translated_words=0, fuzzy_words=0)
+    for unit in units:
+        expected["total_words"] += unit.unit_source.source_wordcount
+        if unit.state == TRANSLATED:
+            expected["translated_words"] += unit.unit_source.source_wordcount
+        elif unit.state == FUZZY:
+            expected["fuzzy_words"] += unit.unit_source.source_wordcount
+    return expected
+
+
+def _get_word_counts(store):
+    store.data.refresh_from_db()
+    return dict(
+        total_words=store.data.total_words,
+        translated_words=store.data.translated_words,
+        fuzzy_words=store.data.fuzzy_words)
+
+
+class _Connection(object):
+    """Collects on commit callbacks, as tests run in a transaction that is
+    never committed
+    """
+
+    def __init__(self):
+        self.callbacks = []
+
+    def on_commit(self, func):
+        self.callbacks.append(func)
+
+    def commit(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+@pytest.mark.django_db
+def test_data_deferred_store_data(store0, settings, monkeypatch):
+    settings.POOTLE_DEFER_STORE_DATA = True
+    connection = _Connection()
+    monkeypatch.setattr("pootle_data.deferred.connection", connection)
+    deferred = DeferredStoreData()
+    deferred.update()
+    checks = store0.data.critical_checks
+    unit = store0.units.filter(
+        state=TRANSLATED,
+        unit_source__source_wordcount__gt=0).first()
+
+    # word counts are adjusted from the unit states
+    unit.state = FUZZY
+    unit.save()
+    assert _get_word_counts(store0) == _calc_word_counts(store0.units)
+    unit.state = OBSOLETE
+    unit.save()
+    assert _get_word_counts(store0) == _calc_word_counts(store0.units)
+
+    # stores are only queued once the transaction is committed
+    assert not deferred.redis.smembers(DEFERRED_STORES_KEY)
+    # a job is already queued
+    deferred.redis.set(DEFERRED_JOB_KEY, 1)
+    connection.commit()
+    assert (
+        str(store0.pk)
+        in deferred.redis.smembers(DEFERRED_STORES_KEY))
+
+    # the rest of the data is updated by the deferred update
+    store0.data.critical_checks = checks + 7
+    store0.data.save()
+    assert deferred.update() >= 1
+    assert not deferred.redis.smembers(DEFERRED_STORES_KEY)
+    store0.data.refresh_from_db()
+    assert store0.data.critical_checks == checks
+    assert _get_word_counts(store0) == _calc_word_counts(store0.units)
+
+    # a job is queued on commit if there isn't one already
+    store0.data.critical_checks = checks + 7
+    store0.data.save()
+    deferred.add(store0)
+    connection.commit()
+    assert not deferred.redis.smembers(DEFERRED_STORES_KEY)
+    store0.data.refresh_from_db()
+    assert store0.data.critical_checks == checks
+
+
+@pytest.mark.django_db
+def test_data_deferred_store_data_saved_twice(store0, settings, monkeypatch):
+    settings.POOTLE_DEFER_STORE_DATA = True
+    monkeypatch.setattr("pootle_data.deferred.connection", _Connection())
+    DeferredStoreData().update()
+    unit = store0.units.filter(
+        state=TRANSLATED,
+        unit_source__source_wordcount__gt=0).first()
+
+    # saving the same instance again only counts the new changes
+    unit.state = FUZZY
+    unit.save()
+    unit.save()
+    assert _get_word_counts(store0) == _calc_word_counts(store0.units)
+    unit.state = TRANSLATED
+    unit.save()
+    unit.save()
+    assert _get_word_counts(store0) == _calc_word_counts(store0.units)
+
+    # and new units are only counted once
+    new_unit = UnitDBFactory(store=store0, state=UNTRANSLATED)
+    assert _get_word_counts(store0) == _calc_word_counts(store0.units)
+    new_unit.target = "Some new translated words"
+    new_unit.save()
+    assert _get_word_counts(store0) == _calc_word_counts(store0.units)
+
+
+@pytest.mark.django_db
+def test_data_deferred_store_data_source_updated(store0, settings,
+                                                 monkeypatch):
+    settings.POOTLE_DEFER_STORE_DATA = True
+    connection = _Connection()
+    monkeypatch.setattr("pootle_data.deferred.connection", connection)
+    deferred = DeferredStoreData()
+    deferred.update()
+    unit = store0.units.filter(state=TRANSLATED).first()
+    unit.source = "%s and then some more words" % unit.source
+    assert deferred.get_unit_word_changes(unit) is None
+    unit.save()
+    deferred.redis.set(DEFERRED_JOB_KEY, 1)
+    connection.commit()
+    assert deferred.update() >= 1
+    assert _get_word_counts(store0) == _calc_word_counts(store0.units)
@@ -7,6 +7,7 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import hashlib
 import os
 
 import pytest
@@ -112,7 +113,7 @@ def test_wrap_store_fs_with_file(settings, tmpdir, tp0_store, test_fs):
     assert fs_file.pootle_changed is False
     assert fs_file.fs_changed is True
     assert fs_file.file_exists is True
-    assert fs_file.latest_hash == str(os.stat(fs_file.file_path).st_mtime)
+    assert fs_file.latest_hash == hashlib.sha1(data).hexdigest()
     assert isinstance(fs_file.deserialize(), pofile)
     assert str(fs_file.deserialize()) == data
 
@@ -159,6 +160,29 @@ def test_wrap_store_fs_pull(store_fs_file):
     assert unit_count == len(fs_file.deserialize().units) - 1
 
 
+@pytest.mark.django_db
+def test_wrap_store_fs_pull_unchanged(store_fs_file, monkeypatch):
+    fs_file = store_fs_file
+    fs_file.pull()
+    revision = fs_file.store.data.max_unit_revision
+    updates = []
+    monkeypatch.setattr(
+        "pootle_store.models.Store.update",
+        lambda store, *args, **kwargs: updates.append(store) or (None, {}))
+    # the same file is skipped while the store is unchanged
+    assert fs_file._sync_to_pootle() is None
+    assert updates == []
+    assert fs_file.store.data.max_unit_revision == revision
+    # pulling with other options updates the store
+    fs_file._sync_to_pootle(merge=True)
+    assert updates == [fs_file.store]
+    # as does changing the file
+    with open(fs_file.file_path, "a") as target:
+        target.write("\n")
+    fs_file._sync_to_pootle()
+    assert len(updates) == 2
+
+
 @pytest.mark.django_db
 def test_wrap_store_fs_read(store_fs_file):
     fs_file = store_fs_file
@@ -385,3 +409,33 @@ def test_fs_file_latest_author(system, member2):
     assert myfile.latest_user == member2
     myfile._author_name = "DOES NOT EXIST"
     assert myfile.latest_user == system
+
+
+@pytest.mark.django_db
+def test_wrap_store_fs_fs_changed_content(store_fs_file_store):
+    fs_file = store_fs_file_store
+    fs_file.push()
+    fs_file.on_sync(
+        fs_file.latest_hash, fs_file.store.data.max_unit_revision)
+    assert fs_file.fs_changed is False
+    # touching the file doesn't change it
+    stat = os.stat(fs_file.file_path)
+    os.utime(fs_file.file_path, (stat.st_atime, stat.st_mtime + 10))
+    assert fs_file.fs_changed is False
+    with open(fs_file.file_path, "a") as target:
+        target.write("\n")
+    assert fs_file.fs_changed is True
+
+
+@pytest.mark.django_db
+def test_wrap_store_fs_fs_changed_mtime(store_fs_file_store):
+    fs_file = store_fs_file_store
+    fs_file.push()
+    # files synced before content hashes were used
+    fs_file.on_sync(
+        str(os.stat(fs_file.file_path).st_mtime),
+        fs_file.store.data.max_unit_revision)
+    assert fs_file.fs_changed is False
+    stat = os.stat(fs_file.file_path)
+    os.utime(fs_file.file_path, (stat.st_atime, stat.st_mtime + 10))
+    assert fs_file.fs_changed is True
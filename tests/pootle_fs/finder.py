@@ -267,3 +267,57 @@ def test_finder_lang_codes():
         "/path/to/<dir_path>/<language_code>.<ext>")
     match = finder.match("/path/to/foo/bar@baz.po")
     assert match[1]["language_code"] == "bar@baz"
+
+
+@pytest.mark.django_db
+@pytest.mark.xfail(sys.platform == 'win32',
+                   reason="path mangling broken on windows")
+def test_finder_scan(tmpdir):
+    file_root = os.path.join(str(tmpdir), "scan_root")
+    dirs = [
+        os.path.join(file_root, "foo"),
+        os.path.join(file_root, "foo", "bar"),
+        os.path.join(file_root, "baz")]
+    for dir_path in dirs:
+        os.makedirs(dir_path)
+        for filename in ["language0.po", "not_translation.txt"]:
+            with open(os.path.join(dir_path, filename), "w") as f:
+                f.write("")
+
+    def _set_mtimes(mtime):
+        for dir_path in [file_root] + dirs:
+            os.utime(dir_path, (mtime, mtime))
+
+    # directories modified just now are always listed again
+    _set_mtimes(1000)
+    finder = TranslationFileFinder(
+        os.path.join(file_root, "<dir_path>/<language_code>.<ext>"))
+    scanned = []
+    scan_dir = finder.scan_dir
+
+    def _scan_dir(path):
+        scanned.append(path)
+        return scan_dir(path)
+
+    finder.scan_dir = _scan_dir
+    expected = sorted(
+        finder.match(os.path.join(dir_path, "language0.po"))
+        for dir_path in dirs)
+    assert sorted(finder.find()) == expected
+    assert sorted(scanned) == sorted([file_root] + dirs)
+
+    # unchanged directories are not listed again
+    scanned[:] = []
+    assert sorted(finder.find()) == expected
+    assert scanned == []
+
+    # only changed directories are listed again
+    with open(os.path.join(dirs[1], "language1.po"), "w") as f:
+        f.write("")
+    os.utime(dirs[1], (2000, 2000))
+    assert (
+        sorted(finder.find())
+        == sorted(
+            expected
+            + [finder.match(os.path.join(dirs[1], "language1.po"))]))
+    assert scanned == [dirs[1]]
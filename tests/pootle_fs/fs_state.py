@@ -334,3 +334,101 @@ def test_fs_state_fs_unchanged(fs_path_qs, no_complex_po_, dummyfs):
     StoreFS.objects.filter(pk__in=stores_fs).update(staged_for_removal=True)
     state = UnchangedFSState(plugin, fs_path=fs_path, pootle_path=pootle_path)
     assert len(list(state.state_unchanged)) == 0
+
+
+class _SyntheticStore(object):
+
+    def __init__(self, pootle_path):
+        self.pootle_path = pootle_path
+
+
+class _PathList(list):
+    """List that counts the items visited when it is iterated or searched"""
+
+    def __init__(self, items, lookups):
+        super(_PathList, self).__init__(items)
+        self.lookups = lookups
+
+    def __iter__(self):
+        for item in super(_PathList, self).__iter__():
+            self.lookups["visited"] += 1
+            yield item
+
+    def __contains__(self, item):
+        self.lookups["visited"] += len(self)
+        return super(_PathList, self).__contains__(item)
+
+
+class _PathDict(dict):
+    """Dictionary that counts the items visited when it is iterated"""
+
+    def __init__(self, items, lookups):
+        super(_PathDict, self).__init__(items)
+        self.lookups = lookups
+
+    def __iter__(self):
+        for item in super(_PathDict, self).__iter__():
+            self.lookups["visited"] += 1
+            yield item
+
+    def keys(self):
+        return _PathList(super(_PathDict, self).keys(), self.lookups)
+
+    def values(self):
+        return _PathList(super(_PathDict, self).values(), self.lookups)
+
+
+class _SyntheticStateResources(FSProjectStateResources):
+    """State resources for a synthetic project, that don't hit the DB or
+    the filesystem
+    """
+    cache_key = None
+    fs_cache_key = None
+    sync_cache_key = None
+
+    def __init__(self, found, tracked, trackable):
+        super(_SyntheticStateResources, self).__init__(None)
+        self.lookups = dict(visited=0)
+        self.__dict__.update(
+            found_file_matches=_PathList(found, self.lookups),
+            found_file_paths=_PathList(
+                [fs_path for pootle_path, fs_path in found],
+                self.lookups),
+            tracked_paths=_PathDict(tracked, self.lookups),
+            trackable_stores=_PathList(trackable, self.lookups))
+
+
+def _synthetic_paths(start, end):
+    return [
+        ("/language0/project0/%s.po" % i, "/language0/%s.po" % i)
+        for i in range(start, end)]
+
+
+def test_fs_state_benchmark_paths():
+    """Benchmark for the path lookups of `pootle fs state` in a synthetic
+    50k file project.
+
+    Of the 50k files, 25k are tracked and 5k match trackable Stores. A
+    further 5k tracked files are missing, and another 5k trackable Stores
+    don't have a file.
+    """
+    found = _synthetic_paths(0, 50000)
+    tracked = {
+        fs_path: pootle_path
+        for pootle_path, fs_path
+        in _synthetic_paths(0, 25000) + _synthetic_paths(50000, 55000)}
+    trackable = [
+        (_SyntheticStore(pootle_path), fs_path)
+        for pootle_path, fs_path
+        in _synthetic_paths(25000, 30000) + _synthetic_paths(55000, 60000)]
+    state = ProjectFSState(None, load=False)
+    resources = _SyntheticStateResources(found, tracked, trackable)
+    state.__dict__["resources"] = resources
+    assert len(list(state.state_fs_untracked)) == 20000
+    assert len(list(state.state_conflict_untracked)) == 5000
+    assert len(list(state.state_pootle_untracked)) == 5000
+    assert len(resources.missing_file_paths) == 5000
+    # each path is only visited a few times - if the lookups scan the path
+    # lists for every file, billions of paths are visited
+    paths = len(found) + len(tracked) + len(trackable)
+    assert resources.lookups["visited"] <= 5 * paths
@@ -13,13 +13,14 @@ import pytest
 
 from pootle.core.delegate import revision
 from pootle.core.response import Response
+from pootle.core.signals import update_data, update_revisions
 from pootle.core.state import State
 from pootle_app.models import Directory
 from pootle_fs.apps import PootleFSConfig
-from pootle_fs.exceptions import FSStateError
+from pootle_fs.exceptions import FSStateError, FSSyncError
 from pootle_fs.matcher import FSPathMatcher
 from pootle_fs.models import StoreFS
-from pootle_fs.plugin import Plugin
+from pootle_fs.plugin import Plugin, sync_store_fs, sync_store_fs_file
 from pootle_fs.utils import FSPlugin
 from pootle_project.models import Project
 from pootle_store.constants import POOTLE_WINS, SOURCE_WINS
@@ -350,6 +351,135 @@ def test_fs_plugin_localfs_push(localfs_pootle_staged_real):
                 assert src.read() == target.read()
 
 
+@pytest.mark.django_db
+@pytest.mark.xfail(
+    sys.platform == 'win32',
+    reason="path mangling broken on windows")
+def test_fs_plugin_localfs_push_jobs(localfs_pootle_staged_real, monkeypatch):
+    plugin = localfs_pootle_staged_real
+    jobs = []
+
+    class DummyPool(object):
+
+        def __init__(self, processes):
+            self.processes = processes
+
+        def imap_unordered(self, func, iterable):
+            for job in iterable:
+                jobs.append(job)
+                yield func(job)
+
+        def close(self):
+            pass
+
+        def join(self):
+            pass
+
+    class DummyConnections(object):
+
+        def all(self):
+            return []
+
+    monkeypatch.setattr("pootle_fs.plugin.Pool", DummyPool)
+    monkeypatch.setattr("pootle_fs.plugin.connections", DummyConnections())
+    tracked = plugin.resources.tracked.count()
+    response = plugin.sync(jobs=2)
+    assert len(jobs) == 2
+    assert all(job[0] == "push" for job in jobs)
+    assert sum(len(job[1]) for job in jobs) == tracked
+    assert len(response["pushed_to_fs"]) == tracked
+    for response_item in response["pushed_to_fs"]:
+        store_fs = StoreFS.objects.get(pk=response_item.store_fs.pk)
+        assert store_fs.last_sync_hash == store_fs.file.latest_hash
+        assert (
+            store_fs.last_sync_revision
+            == store_fs.store.data.max_unit_revision)
+
+
+@pytest.mark.django_db
+@pytest.mark.xfail(
+    sys.platform == 'win32',
+    reason="path mangling broken on windows")
+def test_fs_plugin_localfs_push_jobs_failed(localfs_pootle_staged_real,
+                                            monkeypatch):
+    plugin = localfs_pootle_staged_real
+
+    class DummyPool(object):
+
+        def __init__(self, processes):
+            self.processes = processes
+
+        def imap_unordered(self, func, iterable):
+            for job in iterable:
+                yield func(job)
+
+        def close(self):
+            pass
+
+        def join(self):
+            pass
+
+    class DummyConnections(object):
+
+        def all(self):
+            return []
+
+    failing = plugin.resources.tracked.first()
+    synced = []
+
+    def _sync_store_fs_file(action, store_fs, user=None):
+        if store_fs.pk == failing.pk:
+            raise ValueError("Sync failed")
+        result = sync_store_fs_file(action, store_fs, user)
+        synced.append(store_fs.pk)
+        return result
+
+    monkeypatch.setattr("pootle_fs.plugin.Pool", DummyPool)
+    monkeypatch.setattr("pootle_fs.plugin.connections", DummyConnections())
+    monkeypatch.setattr(
+        "pootle_fs.plugin.sync_store_fs_file", _sync_store_fs_file)
+    with pytest.raises(FSSyncError):
+        plugin.sync(jobs=2)
+    # files synced before the failure are still recorded as synced
+    assert synced
+    for store_fs in StoreFS.objects.filter(pk__in=synced):
+        assert store_fs.last_sync_hash == store_fs.file.latest_hash
+        assert (
+            store_fs.last_sync_revision
+            == store_fs.store.data.max_unit_revision)
+    assert (
+        StoreFS.objects.get(pk=failing.pk).last_sync_hash
+        == failing.last_sync_hash)
+
+
+@pytest.mark.django_db
+def test_fs_plugin_sync_store_fs_job(localfs_pootle_staged_real, monkeypatch):
+    plugin = localfs_pootle_staged_real
+    store_fs = plugin.resources.tracked.first()
+    store = store_fs.store
+    tp = store.translation_project
+
+    def _sync_store_fs_file(action, store_fs, user=None):
+        update_data.send(tp.__class__, instance=tp)
+        update_revisions.send(store.__class__, instance=store, keys=["stats"])
+        return None, "HASH"
+
+    monkeypatch.setattr(
+        "pootle_fs.plugin.sync_store_fs_file", _sync_store_fs_file)
+    tp_revision = revision.get(Directory)(tp.directory).get(key="stats")
+    synced, error, tp_ids, revisions = sync_store_fs(
+        ("push", [store_fs.pk], None))
+    assert synced == {store_fs.pk: (None, "HASH")}
+    assert error is None
+    # tp data and revision updates are returned to be made in the parent
+    assert tp_ids == set([tp.pk])
+    assert revisions.keys() == [("stats", )]
+    assert store.parent.pootle_path in revisions[("stats", )]
+    assert (
+        revision.get(Directory)(tp.directory).get(key="stats")
+        == tp_revision)
+
+
 @pytest.mark.django_db
 def test_fs_plugin_cache_key(project_fs):
     plugin = project_fs
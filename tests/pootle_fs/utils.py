@@ -7,6 +7,8 @@
 # or later license. See the LICENSE file for a copy of the license and the
 # AUTHORS file for copyright and authorship information.
 
+import hashlib
+import os
 from fnmatch import translate
 
 import pytest
@@ -20,7 +22,8 @@ from pootle.core.plugin import provider
 from pootle_fs.delegate import fs_plugins
 from pootle_fs.models import StoreFS
 from pootle_fs.utils import (
-    PathFilter, StoreFSPathFilter, StorePathFilter, FSPlugin, parse_fs_url)
+    FileHasher, PathFilter, StoreFSPathFilter, StorePathFilter, FSPlugin,
+    parse_fs_url)
 from pootle_project.models import Project
 from pootle_store.models import Store
 
@@ -195,3 +198,29 @@ def test_project_fs_instance_bad(english):
     ])
 def test_parse_fs_url(fs, fs_type, fs_url):
     assert (fs_type, fs_url) == parse_fs_url(fs)
+
+
+def test_fs_file_hasher(tmpdir):
+    hasher = FileHasher()
+    paths = []
+    for i in range(3):
+        path = os.path.join(str(tmpdir), "file%s.po" % i)
+        with open(path, "w") as f:
+            f.write("content %s" % i)
+        paths.append(path)
+    missing = os.path.join(str(tmpdir), "missing.po")
+    hashes = hasher.hashes(paths + [missing])
+    assert sorted(hashes.keys()) == sorted(paths)
+    for i, path in enumerate(paths):
+        assert hashes[path] == hashlib.sha1("content %s" % i).hexdigest()
+        assert hasher.hash(path) == hashes[path]
+    assert hasher.hash(missing) is None
+
+    # unmodified files are not read again
+    hasher.digest = lambda path: "NOT CACHED"
+    assert hasher.hashes(paths) == hashes
+    with open(paths[0], "w") as f:
+        f.write("changed content")
+    os.utime(paths[0], (0, 0))
+    assert hasher.hash(paths[0]) == "NOT CACHED"
+    assert hasher.hash(paths[1]) == hashes[paths[1]]
@@ -17,6 +17,8 @@ from pytest_pootle.utils import create_store
 
 from pootle.core.delegate import (comparable_event, grouped_events,
                                   lifecycle, log, review)
+from pootle_log.models import Event
+from pootle_log.updater import EventLogUpdater
 from pootle_log.utils import (ComparableLogEvent, GroupedEvents, Log,
                               LogEvent, StoreLog, UnitLog)
 from pootle_statistics.models import (
@@ -577,6 +579,132 @@ def test_log_get_events(site_users, store0):
             for x in expected])
 
 
+def _count_source_events():
+    reviewed = Suggestion.objects.filter(
+        review_time__isnull=False).exclude(state__name="pending")
+    return (
+        UnitSource.objects.count()
+        + Submission.objects.count()
+        + Suggestion.objects.filter(creation_time__isnull=False).count()
+        + reviewed.count())
+
+
+@pytest.mark.django_db
+def test_log_event_updater(member, store0):
+    assert Event.objects.count() == _count_source_events()
+
+    # events are logged as their sources are created
+    unit = store0.units.first()
+    unit.target = "changed target"
+    unit.save(user=member)
+    lifecycle.get(unit.__class__)(unit).change()
+    submissions = unit.submission_set.filter(revision=unit.revision)
+    assert submissions.exists()
+    assert (
+        sorted(
+            Event.objects.filter(
+                submission__in=submissions).values_list(
+                    "submission_id", "user_id"))
+        == sorted(
+            (submission.id, member.id)
+            for submission
+            in submissions))
+    suggestion, created_ = review.get(Suggestion)().add(
+        unit, "new suggestion", user=member)
+    assert Event.objects.filter(
+        suggestion=suggestion, action="suggestion_created").exists()
+    pending = Suggestion.objects.filter(state__name="pending").first()
+    review.get(Suggestion)([pending], member).reject()
+    event = Event.objects.get(
+        suggestion=pending, action="suggestion_rejected")
+    assert event.user == member
+    assert event.store == pending.unit.store
+    assert Event.objects.count() == _count_source_events()
+
+    # reading the log doesn't add events
+    event.delete()
+    list(Log().get_logged_events())
+    assert not Event.objects.filter(pk=event.pk).exists()
+
+    updater = EventLogUpdater()
+    assert updater.rebuild() == _count_source_events()
+    assert Event.objects.count() == _count_source_events()
+
+
+@pytest.mark.django_db
+def test_log_event_updater_timestamps(store0):
+    unit = store0.units.first()
+    timestamp = unit.creation_time - timedelta(days=1)
+    unit.creation_time = timestamp
+    unit.save()
+    assert (
+        Event.objects.get(unit=unit, action="unit_created").timestamp
+        == timestamp)
+    submission = Submission.objects.filter(unit__store=store0).first()
+    submission.creation_time = timestamp
+    submission.save()
+    assert Event.objects.get(submission=submission).timestamp == timestamp
+    suggestion = Suggestion.objects.filter(
+        creation_time__isnull=False).first()
+    suggestion.creation_time = timestamp
+    suggestion.save()
+    assert (
+        Event.objects.get(
+            suggestion=suggestion,
+            action="suggestion_created").timestamp
+        == timestamp)
+
+
+@pytest.mark.django_db
+def test_log_event_updater_bulk_submissions(member, store0):
+    unit = store0.units.first()
+    unit_lifecycle = lifecycle.get(unit.__class__)(unit)
+    subs = [
+        unit_lifecycle.create_submission(
+            creation_time=unit.mtime,
+            submitter=member,
+            field=SubmissionFields.COMMENT,
+            type=SubmissionTypes.WEB,
+            old_value="",
+            new_value="comment %s" % i)
+        for i in range(3)]
+    unit_lifecycle.save_subs(subs)
+    assert (
+        Event.objects.filter(
+            unit=unit,
+            user=member,
+            action="comment_updated").count()
+        == 3)
+    assert Event.objects.count() == _count_source_events()
+
+
+@pytest.mark.django_db
+def test_log_get_logged_events(site_users, tp0, store0):
+    user = site_users["user"]
+    event_log = Log()
+    for kwargs in [dict(users=[user], store=store0.pk),
+                   dict(users=[user], path=tp0.pootle_path),
+                   dict(users=[user], event_sources=("submission", ))]:
+        result = list(event_log.get_logged_events(**kwargs))
+        timestamps = [ev.timestamp for ev in result if ev.timestamp]
+        assert timestamps == sorted(timestamps)
+        expected = event_log.get_events(**kwargs)
+        assert (
+            sorted((x.timestamp, x.unit.pk, x.action, x.value.pk)
+                   for x in result
+                   if x.timestamp)
+            == sorted((x.timestamp, x.unit.pk, x.action, x.value.pk)
+                      for x in expected
+                      if x.timestamp))
+    store_log = log.get(store0.__class__)(store0)
+    assert (
+        [(x.action, x.value.pk)
+         for x in store_log.get_logged_events(users=[user])]
+        == [(x.action, x.value.pk)
+            for x in event_log.get_logged_events(
+                users=[user], store=store0.pk)])
+
+
 @pytest.mark.django_db
 def test_log_store(store0):
     store_log = log.get(store0.__class__)(store0)
@@ -21,7 +21,8 @@ from pootle_score.models import UserStoreScore
 from pootle_score.updater import (
     StoreScoreUpdater, TPScoreUpdater, UserScoreUpdater)
 from pootle_score.utils import to_datetime
-from pootle_store.models import Store
+from pootle_statistics.models import Submission, SubmissionFields
+from pootle_store.models import Store, Suggestion
 from pootle_translationproject.models import TranslationProject
 
 
@@ -57,7 +58,7 @@ def test_score_store_updater_event(store0, admin, member):
                 LogEvent(unit0, admin, yesterday, "action1", 1),
                 LogEvent(unit1, member, today, "action2", 2)]
 
-        def get_events(self, start=None, end=None, users=None, **kwargs):
+        def get_logged_events(self, start=None, end=None, users=None, **kwargs):
             self._start = start
             self._end = end
             self._users = users
@@ -121,7 +122,7 @@ def test_score_store_updater_event_score(store0, admin, member, member2):
                 LogEvent(unit0, member, dt_today, "action2", 2),
                 LogEvent(unit1, member, dt_today, "action2", 3)]
 
-        def get_events(self, start=None, end=None, **kwargs):
+        def get_logged_events(self, start=None, end=None, **kwargs):
             self._start = start
             self._end = end
             for event in self._events:
@@ -313,3 +314,70 @@ def test_score_user_updater(tp0, admin, member):
     updater.set_scores(result)
     admin.refresh_from_db()
     assert round(admin.score, 2) == admin_score
+
+
+def _round_scores(scores):
+    return {
+        date: {
+            user: {k: round(v, 2) for k, v in user_scores.items()}
+            for user, user_scores in date_scores.items()}
+        for date, date_scores in scores.items()}
+
+
+@pytest.mark.django_db
+def test_score_tp_updater_calculate_store_scores(tp0, member):
+    updater = score_updater.get(TranslationProject)(tp0)
+    calculated = updater.calculate_store_scores()
+    assert calculated
+    for store in tp0.stores.all():
+        assert (
+            _round_scores(calculated.get(store.id, {}))
+            == _round_scores(
+                score_updater.get(Store)(store).calculate()))
+    calculated = updater.calculate_store_scores(users=[member.id])
+    for store in tp0.stores.all():
+        assert (
+            _round_scores(calculated.get(store.id, {}))
+            == _round_scores(
+                score_updater.get(Store)(store).calculate(
+                    users=[member.id])))
+
+
+@pytest.mark.django_db
+def test_score_tp_updater_calculate_store_scores_meta_users(tp0, system):
+    updater = score_updater.get(TranslationProject)(tp0)
+    submissions = Submission.objects.filter(
+        unit__store__translation_project=tp0,
+        field=SubmissionFields.TARGET)
+    suggestions = Suggestion.objects.filter(
+        unit__store__translation_project=tp0)
+    assert submissions.exists()
+    assert suggestions.exists()
+    submissions.update(submitter=system)
+    suggestions.update(user=system, reviewer=system)
+    calculated = updater.calculate_store_scores()
+    for store_scores in calculated.values():
+        for date_scores in store_scores.values():
+            assert system.id not in date_scores
+
+
+@pytest.mark.django_db
+def test_score_tp_updater_event_score(tp0, settings):
+    updater = score_updater.get(TranslationProject)(tp0)
+    assert (
+        updater.get_event_score("target_updated", 3)
+        == dict(
+            score=settings.POOTLE_SCORES["target_updated"] * 3,
+            translated=3,
+            reviewed=0,
+            suggested=0))
+    assert (
+        updater.get_event_score("suggestion_accepted", 2)
+        == dict(
+            score=settings.POOTLE_SCORES["suggestion_accept"] * 2,
+            translated=0,
+            reviewed=2,
+            suggested=0))
+    # scores are only calculated once for each action and wordcount
+    assert ("target_updated", 3) in updater.event_scores
+    assert len(updater.event_scores) == 2
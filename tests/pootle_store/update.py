@@ -119,3 +119,33 @@ def test_store_update_conflict_pootle_wins(store0, caplog):
     assert unit0.target == "bar0"
     assert unit1.target == "foo1"
     assert unit2.target == "baz2"
+
+
+@pytest.mark.django_db
+def test_store_update_add_units(store_po, member):
+    units = [
+        ('source1', 'target1', False),
+        ('source2', '', False),
+        ('source3', 'target3', True)]
+    file_store = create_store(store_po.pootle_path, units=units)
+    store_po.update(file_store, user=member)
+    added = store_po.units
+    assert added.count() == 3
+    assert (
+        list(added.values_list("source_f", flat=True))
+        == ["source1", "source2", "source3"])
+    revision = added[0].revision
+    for unit in added:
+        assert unit.revision == revision
+        assert unit.unit_source.created_by == member
+        assert unit.unit_source.creation_revision == revision
+        assert unit.unit_source.source_wordcount == 1
+        if unit.target:
+            assert unit.change.submitted_by == member
+            assert unit.change.submitted_on == unit.creation_time
+        else:
+            assert not unit.changed
+    store_po.data.refresh_from_db()
+    assert store_po.data.total_words == 3
+    assert store_po.data.translated_words == 1
+    assert store_po.data.fuzzy_words == 1
@@ -16,8 +16,9 @@ import translate
 
 import pytest
 
-from pootle.core.delegate import stemmer, stopwords, text_comparison
-from pootle_word.utils import TextComparison
+from pootle.core.delegate import (
+    stemmer, stopwords, text_comparison, text_index)
+from pootle_word.utils import TextComparison, UnitTextIndex
 
 
 def test_stemmer():
@@ -77,3 +78,45 @@ def test_text_comparer():
              + comparer.tokens_present(other)
              + comparer.stems_present(other))
             / 4))
+
+
+def test_text_index_words():
+    index = text_index.get()
+    assert isinstance(index, UnitTextIndex)
+    assert index.get_words(None) == set()
+    assert (
+        index.get_words(u"Café, the CAFÉ's\nmenu")
+        == set([u"cafe", u"afe", u"the", u"menu", u"enu"]))
+    # long words are indexed as truncated suffixes
+    long_word = u"".join(chr(ord("a") + i % 26) for i in range(300))
+    suffixes = index.get_words(long_word)
+    assert all(len(suffix) <= index.max_length for suffix in suffixes)
+    for start in range(len(long_word) - index.max_length):
+        search_word = long_word[start:start + index.max_length]
+        assert any(suffix.startswith(search_word) for suffix in suffixes)
+    assert (
+        index.get_search_words([u"Café's", u"%", u"is", long_word])
+        == set([u"cafe"]))
+
+
+@pytest.mark.django_db
+def test_text_index_units(store0):
+    index = text_index.get()
+    unit = store0.units.first()
+    unit.search_words.all().delete()
+    assert index.index_units([unit]) == 1
+    assert (
+        set(unit.search_words.values_list("field", "word__text"))
+        == index.get_unit_words(unit))
+    assert index.index_units([unit]) == 0
+    unit.target = u"Another TRANSLATION"
+    unit.save()
+    assert (
+        set(unit.search_words.filter(field="target_f")
+                             .values_list("word__text", flat=True))
+        == index.get_words(u"another translation"))
+    assert u"nslation" in index.get_words(u"another translation")
+    index.set_ready()
+    assert (
+        list(index.filter(store0.units, [u"NSLAT"], ["target_f"]))
+        == [unit])
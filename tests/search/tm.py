@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Pootle contributors.
+#
+# This file is a part of the Pootle project. It is distributed under the GPL3
+# or later license. See the LICENSE file for a copy of the license and the
+# AUTHORS file for copyright and authorship information.
+
+import threading
+import time
+
+import pytest
+
+from pootle.core.search import SearchBackend, SearchBroker
+from pootle.core.search.backends.local import (
+    LocalTMBackend, get_query_trigrams, get_trigrams)
+from pootle.core.search.cache import TMRevision
+
+
+def _local_tm_settings(settings, tmpdir):
+    settings.POOTLE_TM_SERVER = {
+        'local': {
+            'ENGINE': 'pootle.core.search.backends.LocalTMBackend',
+            'PATH': str(tmpdir),
+            'INDEX_NAME': 'translations',
+        }
+    }
+
+
+def _tm_obj(unit, **kwargs):
+    obj = {
+        'id': unit.id,
+        'revision': unit.revision,
+        'project': unit.store.translation_project.project.fullname,
+        'path': unit.store.pootle_path,
+        'source': unit.source,
+        'target': unit.target,
+        'username': '',
+        'fullname': '',
+        'email_md5': ''}
+    obj.update(kwargs)
+    return obj
+
+
+def test_local_tm_trigrams():
+    assert get_trigrams("") == set([u"   "])
+    assert get_trigrams("Ab") == set([u"  a", u" ab", u"ab "])
+    assert get_trigrams("ab") == get_trigrams("AB")
+
+
+def test_local_tm_query_trigrams():
+    text = u" ".join(u"word%s" % i for i in range(1000))
+    assert len(get_trigrams(text)) > 900
+    grams = get_query_trigrams(text)
+    assert len(grams) == 900
+    assert len(set(grams)) == 900
+    assert set(grams) <= get_trigrams(text)
+    assert get_query_trigrams("Ab") == sorted(get_trigrams("Ab"))
+
+
+@pytest.mark.django_db
+def test_local_tm_search(settings, tmpdir, store0):
+    _local_tm_settings(settings, tmpdir)
+    tm = LocalTMBackend('local')
+    assert tm.index_exists()
+    assert tm.is_auto_updatable
+    language = store0.translation_project.language.code
+    unit, other = store0.units[:2]
+    assert tm.search(unit) == []
+
+    tm.update(language, _tm_obj(unit))
+    # the unit itself is never a result
+    assert tm.search(unit) == []
+    tm.update(language, _tm_obj(other, id=-1, source=unit.source))
+    results = tm.search(unit)
+    assert len(results) == 1
+    assert results[0]['unit_id'] == u"-1"
+    assert results[0]['source'] == unit.source
+    assert results[0]['target'] == other.target
+    assert results[0]['score'] == 1.0
+    assert results[0]['count'] == 1
+    assert tm.get_latest_revision() == max(unit.revision, other.revision)
+
+    # reindexing a unit replaces it
+    tm.update(
+        language,
+        _tm_obj(other, id=-1, source=u"Something completely different"))
+    assert tm.search(unit) == []
+
+    # long sources don't exceed the limit on query parameters
+    long_source = u" ".join(u"word%s" % i for i in range(1000))
+    tm.update(language, _tm_obj(other, id=-2, source=long_source))
+    unit.source = long_source
+    results = tm.search(unit)
+    assert len(results) == 1
+    assert results[0]['unit_id'] == u"-2"
+
+    tm.delete_index()
+    assert not tm.index_exists()
+
+
+@pytest.mark.django_db
+def test_local_tm_bulk_update(settings, tmpdir, store0):
+    _local_tm_settings(settings, tmpdir)
+    tm = LocalTMBackend('local')
+    language = store0.translation_project.language.code
+    unit = store0.units[0]
+    docs = []
+    for i in range(3):
+        doc = _tm_obj(unit)
+        doc.update({'_type': language, '_id': -(i + 1)})
+        docs.append(doc)
+    assert tm.bulk_update(docs) == 3
+    results = tm.search(unit)
+    assert len(results) == 1
+    assert results[0]['count'] == 3
+
+
+class DummyTMBackend(SearchBackend):
+
+    def search(self, unit):
+        time.sleep(self._settings.get('DELAY', 0))
+        return [
+            dict(source=unit.source,
+                 target=self._settings['TARGET'],
+                 count=1,
+                 score=self._settings['SCORE'])]
+
+
+@pytest.mark.django_db
+def test_search_broker_timeout(settings, store0):
+    settings.POOTLE_TM_SERVER = {
+        'fast': {
+            'ENGINE': 'tests.search.tm.DummyTMBackend',
+            'INDEX_NAME': 'fast',
+            'TARGET': 'Fast',
+            'SCORE': 1},
+        'slow': {
+            'ENGINE': 'tests.search.tm.DummyTMBackend',
+            'INDEX_NAME': 'slow',
+            'TARGET': 'Slow',
+            'SCORE': 2,
+            'DELAY': 1,
+            'TIMEOUT': .1}}
+    TMRevision.advance()
+    broker = SearchBroker()
+    unit = store0.units[0]
+    results = broker.search(unit)
+    assert [result['target'] for result in results] == ['Fast']
+    assert broker.stats['fast']['searches'] == 1
+    assert broker.stats['fast']['timeouts'] == 0
+    assert broker.stats['slow']['searches'] == 1
+    assert broker.stats['slow']['timeouts'] == 1
+
+    settings.POOTLE_TM_SERVER['slow']['TIMEOUT'] = 5
+    results = broker.search(unit)
+    assert [result['target'] for result in results] == ['Slow', 'Fast']
+    assert broker.stats['slow']['searches'] == 2
+    assert broker.stats['slow']['timeouts'] == 1
+    assert broker.stats['slow']['latency'] >= 1
+    server_stats = broker.get_server_stats()
+    assert sorted(server_stats.keys()) == ['fast', 'slow']
+    assert server_stats['slow']['searches'] == 2
+    assert server_stats['slow']['mean_latency'] >= 1
+    assert server_stats['fast']['mean_latency'] is not None
+
+
+@pytest.mark.django_db
+def test_search_broker_hung_server(settings, store0):
+    settings.POOTLE_TM_SERVER = {
+        'fast': {
+            'ENGINE': 'tests.search.tm.DummyTMBackend',
+            'INDEX_NAME': 'fast',
+            'TARGET': 'Fast',
+            'SCORE': 1,
+            'TIMEOUT': .5},
+        'hung': {
+            'ENGINE': 'tests.search.tm.DummyTMBackend',
+            'INDEX_NAME': 'hung',
+            'TARGET': 'Hung',
+            'SCORE': 2,
+            'DELAY': 3,
+            'TIMEOUT': .1}}
+    TMRevision.advance()
+    broker = SearchBroker()
+    unit = store0.units[0]
+    # searches still waiting on the hung server don't hold up later ones
+    for i in range(3):
+        results = broker.search(unit)
+        assert [result['target'] for result in results] == ['Fast']
+    assert broker.stats['fast']['timeouts'] == 0
+    assert broker.stats['hung']['timeouts'] == 3
+    assert broker.stats['hung']['skipped'] == 0
+
+
+@pytest.mark.django_db
+def test_search_broker_hung_server_workers(settings, store0):
+    settings.POOTLE_TM_SERVER = {
+        'fast': {
+            'ENGINE': 'tests.search.tm.DummyTMBackend',
+            'INDEX_NAME': 'fast',
+            'TARGET': 'Fast',
+            'SCORE': 1,
+            'TIMEOUT': .5},
+        'hung_workers': {
+            'ENGINE': 'tests.search.tm.DummyTMBackend',
+            'INDEX_NAME': 'hung_workers',
+            'TARGET': 'Hung',
+            'SCORE': 2,
+            'DELAY': 3,
+            'TIMEOUT': .1,
+            'WORKERS': 1}}
+    TMRevision.advance()
+    broker = SearchBroker()
+    unit = store0.units[0]
+    results = broker.search(unit)
+    assert [result['target'] for result in results] == ['Fast']
+    threads = threading.active_count()
+    # once all of its workers are busy the hung server is skipped, rather
+    # than starting more threads
+    for i in range(2):
+        results = broker.search(unit)
+        assert [result['target'] for result in results] == ['Fast']
+    assert broker.stats['hung_workers']['searches'] == 3
+    assert broker.stats['hung_workers']['timeouts'] == 1
+    assert broker.stats['hung_workers']['skipped'] == 2
+    assert threading.active_count() == threads
+    server_stats = broker.get_server_stats()
+    assert server_stats['hung_workers']['mean_latency'] is None
+
+
+@pytest.mark.django_db
+def test_search_broker_search_many(settings, monkeypatch, store0):
+    settings.POOTLE_TM_SERVER = {
+        'tm0': {
+            'ENGINE': 'tests.search.tm.DummyTMBackend',
+            'INDEX_NAME': 'tm0',
+            'TARGET': 'Target 0',
+            'SCORE': 1},
+        'tm1': {
+            'ENGINE': 'tests.search.tm.DummyTMBackend',
+            'INDEX_NAME': 'tm1',
+            'TARGET': 'Target 1',
+            'SCORE': 2}}
+    TMRevision.advance()
+    broker = SearchBroker()
+    units = list(store0.units[:3])
+    revision_reads = []
+    get_revision = TMRevision.get
+    monkeypatch.setattr(
+        TMRevision,
+        "get",
+        staticmethod(
+            lambda: revision_reads.append(1) or get_revision()))
+    results = broker.search_many(units)
+    # the TM revision is read once for all of the units
+    assert len(revision_reads) == 1
+    monkeypatch.undo()
+    assert sorted(results.keys()) == sorted(unit.id for unit in units)
+    for unit in units:
+        assert results[unit.id] == broker.search(unit)
+    assert broker.search_many([]) == {}
+
+
+class CountingTMBackend(SearchBackend):
+    searches = 0
+
+    def search(self, unit):
+        CountingTMBackend.searches += 1
+        return [
+            dict(unit_id=unit_id,
+                 source=unit.source,
+                 target=u"Target %s" % unit_id,
+                 count=1,
+                 score=1)
+            for unit_id in self._settings['UNIT_IDS']]
+
+
+@pytest.mark.django_db
+def test_search_broker_cache(settings, store0):
+    unit, other = store0.units[:2]
+    settings.POOTLE_TM_SERVER = {
+        'tm0': {
+            'ENGINE': 'tests.search.tm.CountingTMBackend',
+            'INDEX_NAME': 'tm0',
+            'UNIT_IDS': [str(unit.id), str(other.id)]}}
+    TMRevision.advance()
+    CountingTMBackend.searches = 0
+    broker = SearchBroker()
+
+    results = broker.search(unit)
+    assert CountingTMBackend.searches == 1
+    # the unit is excluded from its own results
+    assert len(results) == 1
+    assert results[0]['unit_id'] == str(other.id)
+    assert results[0]['count'] == 1
+    assert broker.search(unit) == results
+    assert CountingTMBackend.searches == 1
+
+    # other units with the same source share the cached results
+    other.source = unit.source
+    other_results = broker.search(other)
+    assert CountingTMBackend.searches == 1
+    assert len(other_results) == 1
+    assert other_results[0]['unit_id'] == str(unit.id)
+    assert broker.search_many([unit, other]) == {
+        unit.id: results,
+        other.id: other_results}
+    assert CountingTMBackend.searches == 1
+
+    TMRevision.advance()
+    assert broker.search(unit) == results
+    assert CountingTMBackend.searches == 2
+
+    broker.update(
+        store0.translation_project.language.code,
+        dict(id=unit.id, source=unit.source, target=unit.target))
+    assert broker.search(unit) == results
+    assert CountingTMBackend.searches == 3
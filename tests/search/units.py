@@ -8,7 +8,9 @@
 
 import pytest
 
-from pootle.core.delegate import search_backend
+from django.core.management import call_command
+
+from pootle.core.delegate import search_backend, text_index
 from pootle.core.plugin import getter
 from pootle_project.models import Project
 from pootle_statistics.models import Submission, SubmissionTypes
@@ -225,6 +227,21 @@ def test_get_units_text_search(units_text_searches):
             qs, search["text"], search["sfields"], search["exact"], search["case"])
 
 
+@pytest.mark.django_db
+def test_get_units_text_search_indexed(units_text_searches):
+    search = units_text_searches
+    call_command("update_search_index")
+    assert text_index.get().is_ready
+
+    _test_unit_text_search(
+        Unit.objects.all(),
+        search["text"], search["sfields"], search["exact"], search["case"],
+        search["empty"])
+    _test_unit_text_search(
+        Unit.objects.live(),
+        search["text"], search["sfields"], search["exact"], search["case"])
+
+
 @pytest.mark.django_db
 def test_units_contribution_filter_none(units_contributor_searches):
     unit_filter = units_contributor_searches
@@ -334,3 +351,105 @@ def test_unit_search_backend_custom():
     search_backend.connect(get_search_backend, sender=Unit)
 
     assert search_backend.get(Unit) is CustomSearchBackend
+
+
+def _search_backend_kwargs(user, **kwargs):
+    search_kwargs = {
+        "category": None,
+        "checks": None,
+        "count": 5,
+        "filter": "all",
+        "modified-since": None,
+        "month": None,
+        "offset": 0,
+        "search": None,
+        "sfields": None,
+        "soptions": [],
+        "user": user}
+    search_kwargs.update(kwargs)
+    return search_kwargs
+
+
+@pytest.mark.django_db
+def test_unit_search_backend_keyset(admin, tp0, store0, monkeypatch):
+    # dont cache the uids, so the results are paginated using unit keys
+    monkeypatch.setattr(DBSearchBackend, "max_cached_uids", 0)
+    path_kwargs = dict(
+        language_code=tp0.language.code,
+        project_code=tp0.project.code)
+    expected = list(
+        Unit.objects.get_translatable(user=admin, **path_kwargs)
+                    .order_by("store__pootle_path", "index", "pk")
+                    .values_list("pk", flat=True))
+    backend = DBSearchBackend(
+        admin, **_search_backend_kwargs(admin, **path_kwargs))
+    total, start, end, uids = backend.search()
+    assert (total, start, end) == (len(expected), 0, 10)
+    assert uids == expected[:10]
+    # the total is cached for the current stats revision
+    assert backend.cache_key
+    assert (
+        backend.cache.get("%s:total" % backend.cache_key)
+        == len(expected))
+
+    # the next chunk starts after the last unit already fetched
+    total, start, end, uids = DBSearchBackend(
+        admin,
+        **_search_backend_kwargs(
+            admin, offset=10, previous_uids=uids, **path_kwargs)).search()
+    assert (start, end) == (10, 20)
+    assert uids == expected[10:20]
+
+    # the chunk of a unit is found by counting the units before it
+    store_kwargs = dict(
+        filename=store0.name,
+        dir_path="",
+        **path_kwargs)
+    store_expected = list(
+        Unit.objects.get_translatable(user=admin, **store_kwargs)
+                    .order_by("store__pootle_path", "index", "pk")
+                    .values_list("pk", flat=True))
+    total, start, end, uids = DBSearchBackend(
+        admin,
+        **_search_backend_kwargs(
+            admin, uids=[store_expected[-1]], **store_kwargs)).search()
+    assert total == len(store_expected)
+    assert start == ((len(store_expected) - 1) // 10) * 10
+    assert uids == store_expected[start:start + 10]
+
+
+@pytest.mark.django_db
+def test_unit_search_backend_cached_uids(admin, tp0, store0):
+    path_kwargs = dict(
+        language_code=tp0.language.code,
+        project_code=tp0.project.code)
+    expected = list(
+        Unit.objects.get_translatable(user=admin, **path_kwargs)
+                    .order_by("store__pootle_path", "index", "pk")
+                    .values_list("pk", flat=True))
+    backend = DBSearchBackend(
+        admin, **_search_backend_kwargs(admin, **path_kwargs))
+    total, start, end, uids = backend.search()
+    assert (total, start, end) == (len(expected), 0, 10)
+    assert uids == expected[:10]
+    cache_key = backend.cache_key
+    assert backend.cache.get("%s:uids" % cache_key).tolist() == expected
+
+    # following chunks are sliced from the cached uids
+    backend = DBSearchBackend(
+        admin,
+        **_search_backend_kwargs(
+            admin, offset=10, previous_uids=uids, **path_kwargs))
+    assert backend.cache_key == cache_key
+    total, start, end, uids = backend.search()
+    assert (start, end) == (10, 20)
+    assert uids == expected[10:20]
+
+    # changing the units changes the stats revision, and so the cache key
+    unit = store0.units.first()
+    unit.makeobsolete()
+    unit.save()
+    backend = DBSearchBackend(
+        admin, **_search_backend_kwargs(admin, **path_kwargs))
+    assert backend.cache_key != cache_key
+    assert backend.search()[0] == len(expected) - 1
@@ -17,6 +17,7 @@ from pytest_pootle.factories import LanguageDBFactory, TranslationProjectFactory
 
 from pootle.core.delegate import formats
 from pootle.core.paginator import paginate
+from pootle.core.search import SearchBroker
 from pootle.core.url_helpers import split_pootle_path
 from pootle.core.views.admin import PootleAdminFormView, PootleAdminView
 from pootle_app.models import PermissionSet
@@ -141,6 +142,26 @@ def test_admin_access(client):
     assert response.status_code == 200
 
 
+@pytest.mark.django_db
+def test_admin_dashboard_tm_stats(client, settings, monkeypatch):
+    settings.POOTLE_TM_SERVER = {
+        'local': {
+            'ENGINE': 'tests.search.tm.DummyTMBackend',
+            'INDEX_NAME': 'translations'}}
+    broker = SearchBroker()
+    broker._update_stats("local", latency=.25, searches=2, timeouts=1)
+    monkeypatch.setattr(
+        "pootle_app.views.admin.dashboard.get_tm_broker", lambda: broker)
+    client.login(username="admin", password="admin")
+    response = client.get(ADMIN_URL)
+    assert response.status_code == 200
+    tm_stats = response.context["tm_stats"]
+    assert [stats["server"] for stats in tm_stats] == ["local"]
+    assert tm_stats[0]["searches"] == "2"
+    assert tm_stats[0]["timeouts"] == "1"
+    assert tm_stats[0]["mean_latency"] == "250 ms"
+
+
 @pytest.mark.django_db
 def test_admin_view_project(client, request_users):
     user = request_users["user"]
@@ -13,6 +13,7 @@ import pytest
 
 from pytest_pootle.search import calculate_search_results
 
+from pootle.core.search.cache import TMRevision
 from pootle_app.models import Directory
 from pootle_app.models.permissions import check_user_permission
 from pootle_project.models import Project
@@ -245,3 +246,31 @@ def test_get_next_slice(client, request_users):
 
     assert uids3 == list(
         qs[start:end].values_list("pk", flat=True))
+
+
+@pytest.mark.django_db
+def test_get_units_tm(client, admin, settings, monkeypatch):
+    settings.POOTLE_TM_SERVER = {
+        'tm0': {
+            'ENGINE': 'tests.search.tm.DummyTMBackend',
+            'INDEX_NAME': 'tm0',
+            'TARGET': 'Target 0',
+            'SCORE': 1}}
+    monkeypatch.setattr("pootle_store.models.TM_BROKER", None)
+    TMRevision.advance()
+    client.force_login(admin)
+    resp = client.get(
+        "/xhr/units/?filter=all&path=/language0/",
+        HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+    uids = [
+        unit["id"]
+        for group in json.loads(resp.content)["unitGroups"]
+        for group_data in group.values()
+        for unit in group_data["units"]]
+    resp = client.get(
+        "/xhr/units/tm/?filter=all&path=/language0/",
+        HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+    result = json.loads(resp.content)["tm_suggestions"]
+    assert sorted(int(uid) for uid in result) == sorted(uids)
+    for uid, suggestions in result.items():
+        assert [s["target"] for s in suggestions] == ["Target 0"]